@@ -6,12 +6,15 @@ Für echtes Production-Monitoring mit SNMP, SSH, APIs
 
 import subprocess
 import json
-import socket
 import time
 from datetime import datetime
 from typing import Dict, List, Optional
 import re
 
+from snmp_session import SnmpError, get_snmp_pool
+from dns_resolver import get_resolver
+from export_writer import write_snapshot
+
 class AdvancedNetworkScanner:
     """
     Erweiterte Version mit echten Monitoring-Capabilities
@@ -71,24 +74,9 @@ class AdvancedNetworkScanner:
             return None
             
         try:
-            from pysnmp.hlapi import *
-            
-            iterator = getCmd(
-                SnmpEngine(),
-                CommunityData(self.config['snmp']['community']),
-                UdpTransportTarget((host, 161)),
-                ContextData(),
-                ObjectType(ObjectIdentity(oid))
-            )
-            
-            errorIndication, errorStatus, errorIndex, varBinds = next(iterator)
-            
-            if errorIndication or errorStatus:
-                return None
-            
-            for varBind in varBinds:
-                return str(varBind[1])
-                
+            return get_snmp_pool().get(host, oid, self.config['snmp']['community'], timeout=1)
+        except SnmpError:
+            return None
         except ImportError:
             print("⚠️  pysnmp nicht installiert. Installiere mit: pip install pysnmp")
             return None
@@ -179,11 +167,8 @@ class AdvancedNetworkScanner:
                     parts = line.split()
                     ip = parts[1]
                     
-                    # Versuche Hostname zu resolven
-                    try:
-                        hostname = socket.gethostbyaddr(ip)[0]
-                    except:
-                        hostname = f"Host-{ip.split('.')[-1]}"
+                    # Hostname via PTR (gemeinsamer Resolver mit Cache)
+                    hostname = get_resolver().resolve(ip) or f"Host-{ip.split('.')[-1]}"
                     
                     devices[ip] = {
                         'hostname': hostname,
@@ -270,10 +255,10 @@ class AdvancedNetworkScanner:
             'summary': self._generate_summary()
         }
         
-        with open(filename, 'w') as f:
-            json.dump(output, f, indent=2)
-        
-        print(f"\n💾 Daten exportiert nach: {filename}")
+        if write_snapshot(filename, output):
+            print(f"\n💾 Daten exportiert nach: {filename}")
+        else:
+            print(f"\n💾 Unverändert: {filename}")
         return filename
     
     def _generate_summary(self) -> Dict:
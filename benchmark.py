@@ -0,0 +1,1013 @@
+#!/usr/bin/env python3
+"""
+Benchmark - offline scanner benchmarks on a simulated loopback network
+
+The whole 127.0.0.0/8 block is local on Linux, so thousands of fake
+targets need no LAN and the numbers are repeatable:
+
+- asyncio listeners on 127.10.x.y with configurable open ports
+- a PTR responder for the shared DNS resolver (answers after --latency-ms)
+- an SNMPv2c agent with a synthetic switch MIB (system group, ifTable)
+- connect latency via `tc netem` on lo when available (root)
+
+    python3 benchmark.py engines                 # connect vs SYN engine
+    python3 benchmark.py suite                   # 100 / 1k / 10k hosts
+    python3 benchmark.py suite --sizes 100,1000 --latency-ms 2
+    python3 benchmark.py compare old.json new.json
+    python3 benchmark.py snapshot                # JSON vs binary snapshot load
+    python3 benchmark.py snmp                    # SNMP engine per GET vs pool vs multi-OID GETs
+    python3 benchmark.py snmp-walk               # ifTable: GETNEXT vs GETBULK, 48 / 400 ports
+    python3 benchmark.py snmp-poll               # device polls one by one vs SnmpPoller (root)
+
+Suite results go to benchmarks/suite-<time>.json (commit them per release,
+`compare` shows the regressions). Scan results must match the simulated
+network, a mismatch fails the run (exit 1).
+"""
+
+import asyncio
+import contextlib
+import io
+import ipaddress
+import json
+import os
+import platform
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+BENCH_NETWORK = '127.10.0.0/24'
+BENCH_PORTS = [21, 22, 23, 53, 80, 139, 443, 445, 554, 3389, 8080, 9100]
+OPEN_PORTS = [22, 80, 443]
+SUITE_SIZES = [100, 1000, 10000]
+RESULTS_DIR = 'benchmarks'
+
+
+def bench_hosts(count: int, network: str = BENCH_NETWORK) -> List[str]:
+    """First `count` addresses from network (grows past /24 for large counts)"""
+    net = ipaddress.ip_network(network)
+    while net.num_addresses - 2 < count:
+        net = net.supernet()
+    hosts = []
+    for host in net.hosts():
+        if len(hosts) == count:
+            break
+        hosts.append(str(host))
+    return hosts
+
+
+@contextmanager
+def loopback_listeners(hosts: List[str], ports: List[int] = OPEN_PORTS, every: int = 4):
+    """Listening sockets on every n-th host -> {ip: [open ports]} (expected result)"""
+    sockets = []
+    expected = {ip: [] for ip in hosts}
+    try:
+        for ip in hosts[::every]:
+            for port in ports:
+                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                s.bind((ip, port))
+                s.listen(64)
+                sockets.append(s)
+                expected[ip].append(port)
+        yield expected
+    finally:
+        for s in sockets:
+            s.close()
+
+
+class _PtrResponder(asyncio.DatagramProtocol):
+    """Answers every PTR query with h-<ip>.bench after `latency` seconds"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        from dns_resolver import _read_name
+
+        try:
+            qname, end = _read_name(data, 12)
+        except (ValueError, IndexError):
+            return
+        octets = qname.split('.')[:4][::-1]
+        rdata = b''.join(bytes([len(l)]) + l.encode('ascii')
+                         for l in (f"h-{'-'.join(octets)}", 'bench')) + b'\x00'
+        reply = (struct.pack('>HHHHHH', struct.unpack('>H', data[:2])[0], 0x8180, 1, 1, 0, 0)
+                 + data[12:end + 4]
+                 + struct.pack('>HHHIH', 0xC00C, 12, 1, 300, len(rdata)) + rdata)
+        asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, reply, addr)
+
+
+class SimulatedNetwork:
+    """
+    asyncio listeners + PTR responder on a background event loop
+    Usage:
+        with SimulatedNetwork(hosts) as net:
+            net.expected        # {ip: [open ports]}
+            net.dns_port        # PtrResolver(nameservers=['127.0.0.1'], port=net.dns_port)
+    """
+
+    def __init__(self, hosts: List[str], open_ports: List[int] = OPEN_PORTS,
+                 every: int = 4, latency_ms: float = 0.0):
+        self.hosts = hosts
+        self.open_ports = open_ports
+        self.every = max(1, every)
+        self.latency = latency_ms / 1000
+        self.expected = {ip: [] for ip in hosts}
+        self.dns_port = None
+        self.connections = 0
+        self._servers = []
+        self._dns = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    async def _on_connect(self, reader, writer):
+        self.connections += 1
+        writer.close()
+
+    async def _start(self):
+        for ip in self.hosts[::self.every]:
+            for port in self.open_ports:
+                server = await asyncio.start_server(self._on_connect, ip, port,
+                                                    reuse_address=True, backlog=128)
+                self._servers.append(server)
+                self.expected[ip].append(port)
+        self._dns, _ = await self._loop.create_datagram_endpoint(
+            lambda: _PtrResponder(self.latency), local_addr=('127.0.0.1', 0))
+        self.dns_port = self._dns.get_extra_info('sockname')[1]
+        # A scan bursts one query per host - a real server would not drop them
+        sock = self._dns.get_extra_info('socket')
+        for option in (getattr(socket, 'SO_RCVBUFFORCE', None), socket.SO_RCVBUF):
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, option, 8 << 20)
+                break
+            except (OSError, TypeError):
+                continue
+
+    async def _stop(self):
+        for server in self._servers:
+            server.close()
+        if self._dns:
+            self._dns.close()
+
+    def __enter__(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(2)
+
+
+# ---- simulated SNMP agent ----
+
+SYSTEM_OID = (1, 3, 6, 1, 2, 1, 1)
+IF_ENTRY_OID = (1, 3, 6, 1, 2, 1, 2, 2, 1)
+IF_COLUMNS = (1, 2, 3, 5, 7, 8, 10, 14, 16, 20)   # ifIndex ... ifOutErrors
+NO_SUCH_OBJECT, END_OF_MIB_VIEW = b'\x80\x00', b'\x82\x00'
+
+
+def _oid_bytes(oid) -> bytes:
+    body = bytes([oid[0] * 40 + oid[1]])
+    for arc in oid[2:]:
+        chunk = [arc & 0x7F]
+        arc >>= 7
+        while arc:
+            chunk.append(0x80 | (arc & 0x7F))
+            arc >>= 7
+        body += bytes(reversed(chunk))
+    return body
+
+
+def _oid_tuple(raw: bytes) -> tuple:
+    arcs, arc = [raw[0] // 40, raw[0] % 40], 0
+    for byte in raw[1:]:
+        arc = (arc << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            arcs.append(arc)
+            arc = 0
+    return tuple(arcs)
+
+
+def synthetic_mib(interfaces: int = 48) -> Dict[tuple, bytes]:
+    """System group + ifNumber + ifTable of a switch, values as BER TLVs"""
+    from udp_engine import _ber, _ber_int
+
+    def text(value: str) -> bytes:
+        return _ber(0x04, value.encode())
+
+    def unsigned(tag: int, value: int) -> bytes:
+        return _ber(tag, value.to_bytes(max(1, (value.bit_length() + 8) // 8), 'big'))
+
+    mib = {
+        SYSTEM_OID + (1, 0): text('Bench Switch, simulated agent'),
+        SYSTEM_OID + (2, 0): _ber(0x06, _oid_bytes((1, 3, 6, 1, 4, 1, 8072, 3, 2, 10))),
+        SYSTEM_OID + (3, 0): unsigned(0x43, 123456),
+        SYSTEM_OID + (4, 0): text('admin@bench'),
+        SYSTEM_OID + (5, 0): text('bench-switch'),
+        SYSTEM_OID + (6, 0): text('loopback'),
+        (1, 3, 6, 1, 2, 1, 2, 1, 0): _ber_int(interfaces),
+    }
+    for index in range(1, interfaces + 1):
+        speed = 10_000_000_000 if index > interfaces - 2 else 1_000_000_000
+        row = {1: _ber_int(index), 2: text(f'port{index}'), 3: _ber_int(6),
+               5: unsigned(0x42, min(speed, 0xFFFFFFFF)), 7: _ber_int(1),
+               8: _ber_int(1 if index % 3 else 2), 10: unsigned(0x41, index * 1000),
+               14: unsigned(0x41, 0), 16: unsigned(0x41, index * 2000), 20: unsigned(0x41, 0)}
+        for column in IF_COLUMNS:
+            mib[IF_ENTRY_OID + (column, index)] = row[column]
+    return mib
+
+
+class _SnmpAgent(asyncio.DatagramProtocol):
+    """
+    SNMPv2c GET / GETNEXT / GETBULK over a static MIB, answers after `latency` seconds
+    Responses larger than `max_size` bytes become tooBig (GET, GETNEXT) or
+    are trimmed to fit (GETBULK, RFC 3416 4.2.3) - like a real agent's PDU limit
+    """
+
+    def __init__(self, mib: Dict[tuple, bytes], community: str, latency: float,
+                 max_size: int = 65507):
+        self.mib = mib
+        self.max_size = max_size
+        self.order = sorted(mib)
+        self.community = community.encode()
+        self.latency = latency
+        self.requests = 0
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def _next_varbind(self, oid: tuple):
+        import bisect
+
+        position = bisect.bisect_right(self.order, oid)
+        if position == len(self.order):
+            return oid, END_OF_MIB_VIEW
+        oid = self.order[position]
+        return oid, self.mib[oid]
+
+    def _bulk(self, request_id: int, oids: List[tuple], non_repeaters: int,
+              repetitions: int) -> bytes:
+        """GETBULK response: varbinds are added while the message still fits"""
+        from udp_engine import _ber
+
+        non_repeaters = min(non_repeaters, len(oids))
+        current = list(oids)
+        plan = [[i] for i in range(non_repeaters)]
+        plan += [list(range(non_repeaters, len(oids)))] * repetitions
+        overhead = len(self._reply(request_id, 0, b'')) + 4       # + varbind list length
+        varbinds, size = [], overhead
+        for row in plan:
+            for column in row:
+                oid, value = self._next_varbind(current[column])
+                current[column] = oid
+                varbind = _ber(0x30, _ber(0x06, _oid_bytes(oid)) + value)
+                if size + len(varbind) > self.max_size:
+                    return self._reply(request_id, 0, b''.join(varbinds))
+                varbinds.append(varbind)
+                size += len(varbind)
+        return self._reply(request_id, 0, b''.join(varbinds))
+
+    def _reply(self, request_id: int, error_status: int, varbinds: bytes) -> bytes:
+        from udp_engine import _ber, _ber_int
+
+        response = _ber(0xA2, _ber_int(request_id) + _ber_int(error_status) + _ber_int(0)
+                        + _ber(0x30, varbinds))
+        return _ber(0x30, _ber_int(1) + _ber(0x04, self.community) + response)
+
+    def datagram_received(self, data, addr):
+        from udp_engine import _ber, _ber_read
+
+        try:
+            _, offset, _ = _ber_read(data, 0)
+            _, _, offset = _ber_read(data, offset)                  # version
+            _, start, offset = _ber_read(data, offset)              # community
+            if data[start:offset] != self.community:
+                return
+            pdu, offset, _ = _ber_read(data, offset)
+            _, start, offset = _ber_read(data, offset)              # request-id
+            request_id = int.from_bytes(data[start:offset], 'big', signed=True)
+            _, start, offset = _ber_read(data, offset)              # non-repeaters (GETBULK)
+            non_repeaters = int.from_bytes(data[start:offset], 'big')
+            _, start, offset = _ber_read(data, offset)              # max-repetitions (GETBULK)
+            repetitions = int.from_bytes(data[start:offset], 'big')
+            _, offset, end = _ber_read(data, offset)                # varbind list
+            oids = []
+            while offset < end:
+                _, inner, offset = _ber_read(data, offset)
+                _, start, stop = _ber_read(data, inner)
+                oids.append(_oid_tuple(data[start:stop]))
+        except (IndexError, ValueError):
+            return
+
+        self.requests += 1
+        if pdu == 0xA5:
+            reply = self._bulk(request_id, oids, non_repeaters, repetitions)
+        else:
+            varbinds = b''
+            for oid in oids:
+                if pdu == 0xA1:                                     # GETNEXT
+                    oid, value = self._next_varbind(oid)
+                else:
+                    value = self.mib.get(oid, NO_SUCH_OBJECT)
+                varbinds += _ber(0x30, _ber(0x06, _oid_bytes(oid)) + value)
+            reply = self._reply(request_id, 0, varbinds)
+            if len(reply) > self.max_size:
+                reply = self._reply(request_id, 1, b'')             # tooBig, no varbinds
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self.transport.sendto, reply, addr)
+        else:
+            self.transport.sendto(reply, addr)
+
+
+class SimulatedAgent:
+    """
+    SNMP agent on host:port (default 127.0.0.1, random port) on a background event loop
+    Usage:
+        with SimulatedAgent(interfaces=48) as agent:
+            pool.get('127.0.0.1', oid, port=agent.port)
+            agent.requests      # PDUs answered
+    """
+
+    def __init__(self, interfaces: int = 48, community: str = 'public', latency_ms: float = 0.0,
+                 max_size: int = 65507, host: str = '127.0.0.1', port: int = 0):
+        self.mib = synthetic_mib(interfaces)
+        self.community = community
+        self.latency = latency_ms / 1000
+        self.max_size = max_size
+        self.host = host
+        self.port = port
+        self._protocol = None
+        self._transport = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    @property
+    def requests(self) -> int:
+        return self._protocol.requests
+
+    def values(self, oids: List[tuple]) -> List[str]:
+        """Expected string values (what pysnmp prints) - for correctness checks"""
+        from udp_engine import _ber_read
+
+        values = []
+        for oid in oids:
+            raw = self.mib[oid]
+            tag, start, end = _ber_read(raw, 0)
+            values.append(raw[start:end].decode() if tag == 0x04
+                          else str(int.from_bytes(raw[start:end], 'big', signed=tag == 0x02)))
+        return values
+
+    async def _start(self):
+        self._transport, self._protocol = await self._loop.create_datagram_endpoint(
+            lambda: _SnmpAgent(self.mib, self.community, self.latency, self.max_size),
+            local_addr=(self.host, self.port))
+        self.port = self._transport.get_extra_info('sockname')[1]
+
+    def __enter__(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def __exit__(self, *exc):
+        self._loop.call_soon_threadsafe(self._transport.close)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(2)
+
+
+@contextmanager
+def netem_delay(latency_ms: float):
+    """One-way delay on lo via tc netem -> yields True if applied"""
+    if latency_ms <= 0:
+        yield False
+        return
+    cmd = ['tc', 'qdisc', 'add', 'dev', 'lo', 'root', 'netem', 'delay', f'{latency_ms / 2:g}ms']
+    try:
+        applied = subprocess.run(cmd, capture_output=True, timeout=5).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        applied = False
+    try:
+        yield applied
+    finally:
+        if applied:
+            subprocess.run(['tc', 'qdisc', 'del', 'dev', 'lo', 'root'],
+                           capture_output=True, timeout=5)
+
+
+def _timed(fn, *args):
+    """-> (result, seconds), scanner output suppressed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = fn(*args)
+        return result, time.perf_counter() - start
+
+
+def _environment() -> Dict:
+    env = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+    try:
+        env['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                       capture_output=True, text=True,
+                                       timeout=5).stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        env['commit'] = None
+    try:
+        with open('package.json') as f:
+            env['version'] = json.load(f).get('version')
+    except (OSError, ValueError):
+        env['version'] = None
+    return env
+
+
+def bench_engines(host_count: int = 254, rate: int = 20000) -> Dict:
+    """Connect engine vs SYN engine against the same listeners"""
+    from port_engine import AsyncPortEngine
+    from syn_engine import SynScanEngine, raw_sockets_available
+
+    hosts = bench_hosts(host_count)
+    report = {'benchmark': 'engines', 'hosts': len(hosts),
+              'ports': len(BENCH_PORTS), 'runs': []}
+
+    engines = [('connect', AsyncPortEngine(max_in_flight=512, per_host=32, timeout=0.3))]
+    if raw_sockets_available():
+        engines.append(('syn', SynScanEngine(rate=rate)))
+    else:
+        report['skipped'] = ['syn (no raw sockets, needs root)']
+
+    with loopback_listeners(hosts) as expected:
+        for name, engine in engines:
+            results = engine.scan(hosts, BENCH_PORTS)
+            stats = engine.stats
+            report['runs'].append({
+                'engine': name,
+                'elapsed_s': stats['elapsed_s'],
+                'probes_per_sec': round(len(hosts) * len(BENCH_PORTS) / stats['elapsed_s'], 1)
+                                  if stats['elapsed_s'] else 0.0,
+                'open': sum(len(p) for p in results.values()),
+                'correct': results == expected,
+                'stats': dict(stats),
+            })
+
+    return report
+
+
+def bench_size(host_count: int, open_ports: List[int], every: int,
+               latency_ms: float) -> Dict:
+    """port_scan_parallel, _classify_by_ports, enrich_devices, export_results"""
+    from dns_resolver import PtrResolver, use_resolver
+    from ultra_scanner import UltraScanner
+
+    hosts = bench_hosts(host_count)
+    run = {'hosts': len(hosts), 'listeners': 0, 'phases': {}}
+
+    with SimulatedNetwork(hosts, open_ports, every, latency_ms) as net:
+        run['listeners'] = sum(len(p) for p in net.expected.values())
+        use_resolver(PtrResolver(nameservers=['127.0.0.1'], port=net.dns_port))
+
+        scanner, _ = _timed(lambda: UltraScanner(BENCH_NETWORK, incremental=False))
+        scanner.important_ports = sorted(set(BENCH_PORTS) | set(open_ports))
+        devices = {ip: {'ip': ip, 'mac': '', 'vendor': 'Unknown', 'method': 'bench'}
+                   for ip in hosts}
+
+        devices, elapsed = _timed(scanner.port_scan_parallel, devices)
+        stats = scanner.scan_stats['port_scan']
+        found = {ip: d.get('open_ports', []) for ip, d in devices.items()}
+        run['phases']['port_scan'] = {
+            'elapsed_s': round(elapsed, 3),
+            'probes_per_sec': round(len(hosts) * len(scanner.important_ports) / elapsed, 1),
+            'timeouts': stats.get('timeouts', stats.get('filtered', 0)),
+        }
+        run['correct'] = found == net.expected
+
+        port_lists = [d.get('open_ports', []) for d in devices.values()]
+        _, elapsed = _timed(lambda: [scanner._classify_by_ports(p) for p in port_lists])
+        run['phases']['classify'] = {
+            'elapsed_s': round(elapsed, 4),
+            'per_host_us': round(elapsed / len(hosts) * 1e6, 2),
+        }
+
+        devices, elapsed = _timed(scanner.enrich_devices, devices)
+        run['phases']['enrich'] = {
+            'elapsed_s': round(elapsed, 3),
+            'dns_answers': scanner.scan_stats['dns']['answers'],
+            'dns_timeouts': scanner.scan_stats['dns']['timeouts'],
+        }
+        use_resolver(None)
+
+        scanner.devices = devices
+        with tempfile.TemporaryDirectory() as tmp:
+            export_file = os.path.join(tmp, 'network_data.json')
+            # Simulated hosts stay out of the real network_history.bin
+            _, elapsed = _timed(scanner.export_results, export_file, False)
+            run['phases']['export'] = {
+                'elapsed_s': round(elapsed, 4),
+                'bytes': os.path.getsize(export_file),
+            }
+
+    run['total_s'] = round(sum(p['elapsed_s'] for p in run['phases'].values()), 3)
+    return run
+
+
+def bench_suite(sizes: List[int] = SUITE_SIZES, open_ports: List[int] = OPEN_PORTS,
+                every: int = 4, latency_ms: float = 0.0) -> Dict:
+    report = {
+        'benchmark': 'suite',
+        'timestamp': datetime.now().isoformat(),
+        'environment': _environment(),
+        'open_ports': open_ports,
+        'open_every': every,
+        'latency_ms': latency_ms,
+        'runs': [],
+    }
+    with netem_delay(latency_ms) as applied:
+        report['connect_latency'] = 'netem' if applied else 'none (DNS only, needs tc netem + root)'
+        for size in sizes:
+            print(f"  ⏳ {size} hosts ...", flush=True)
+            report['runs'].append(bench_size(size, open_ports, every, latency_ms))
+    return report
+
+
+def _synthetic_export(count: int) -> Dict:
+    """Export dict shaped like UltraScanner.export_results, deterministic"""
+    import random
+
+    rng = random.Random(count)
+    now = datetime.now().isoformat()
+    vendors = ['Ubiquiti Networks', 'Sony Interactive', 'Synology', 'Raspberry Pi', 'Unknown']
+    types = ['router', 'wlan_ap', 'gaming_console', 'nas', 'pc', 'unknown']
+    devices = {}
+    for i, ip in enumerate(bench_hosts(count)):
+        ports = sorted(rng.sample(BENCH_PORTS, rng.randint(0, 4)))
+        devices[ip] = {
+            'hostname': f"device-{i}",
+            'mac': ':'.join(f"{rng.randrange(256):02X}" for _ in range(6)),
+            'vendor': rng.choice(vendors),
+            'type': rng.choice(types),
+            'open_ports': ports,
+            'metrics': {
+                'status': 'online',
+                'last_seen': now,
+                'latency_ms': round(rng.uniform(0.2, 40), 2),
+                'port_count': len(ports),
+            },
+            'discovery_method': 'ultra_scanner',
+            'last_probed': time.time(),
+        }
+    return {
+        'timestamp': now,
+        'network_range': BENCH_NETWORK,
+        'total_devices': count,
+        'devices': devices,
+        'summary': {'by_type': {}, 'by_vendor': {}, 'total_ports': 0},
+        'scan_method': 'ultra_scanner_optimized',
+        'auto_discovered': True,
+    }
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_snapshot(sizes: List[int] = SUITE_SIZES) -> Dict:
+    """Size and load time: pretty JSON, compact JSON, binary snapshot"""
+    import binary_snapshot
+
+    report = {'benchmark': 'snapshot', 'timestamp': datetime.now().isoformat(),
+              'environment': _environment(), 'runs': []}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            output = _synthetic_export(size)
+            pretty, compact = (os.path.join(tmp, f'{n}.json') for n in ('pretty', 'compact'))
+            binary = os.path.join(tmp, 'snapshot.bin')
+            with open(pretty, 'w') as f:
+                json.dump(output, f, indent=2)
+            with open(compact, 'w') as f:
+                json.dump(output, f, separators=(',', ':'))
+            binary_snapshot.write(binary, output)
+            probe_ip = bench_hosts(size)[size // 2]
+
+            def _json_load(path=pretty):
+                with open(path) as f:
+                    return json.load(f)
+
+            def _bin(action):
+                with binary_snapshot.BinarySnapshot(binary) as snap:
+                    return action(snap)
+
+            run = {
+                'hosts': size,
+                'bytes': {'json': os.path.getsize(pretty), 'json_compact': os.path.getsize(compact),
+                          'binary': os.path.getsize(binary)},
+                'load_ms': {
+                    'json': _best_of(_json_load) * 1000,
+                    'json_compact': _best_of(lambda: _json_load(compact)) * 1000,
+                    'binary_full': _best_of(lambda: _bin(lambda s: s.to_dict())) * 1000,
+                    'binary_device': _best_of(lambda: _bin(lambda s: s.device(probe_ip))) * 1000,
+                    'binary_column': _best_of(lambda: _bin(lambda s: s.column_values('type'))) * 1000,
+                },
+                'correct': _bin(lambda s: s.to_dict()) == output,
+            }
+            run['load_ms'] = {k: round(v, 3) for k, v in run['load_ms'].items()}
+            report['runs'].append(run)
+    return report
+
+
+def bench_snmp(oid_count: int = 50, repeat: int = 3, latency_ms: float = 0.0,
+               max_pdu: int = 1472) -> Dict:
+    """
+    50-OID device poll: new SnmpEngine + transport per GET, shared pool,
+    shared pool with multi-OID GETs (agent PDU limit `max_pdu` bytes -> tooBig)
+    """
+    from lazy_imports import is_available
+
+    report = {'benchmark': 'snmp', 'timestamp': datetime.now().isoformat(),
+              'environment': _environment(), 'oids': oid_count,
+              'latency_ms': latency_ms, 'max_pdu': max_pdu, 'runs': []}
+    if not is_available('pysnmp'):
+        report['skipped'] = ['snmp (pysnmp not installed)']
+        return report
+
+    from lazy_imports import load_hlapi
+    from snmp_session import SnmpPool
+
+    hlapi = load_hlapi()
+    interfaces = max(1, -(-oid_count // 2))
+    with SimulatedAgent(interfaces, latency_ms=latency_ms, max_size=max_pdu) as agent:
+        # ifDescr + ifOperStatus of every port: a typical status poll
+        oids = [IF_ENTRY_OID + (column, index) for index in range(1, interfaces + 1)
+                for column in (2, 8)][:oid_count]
+        names = ['.'.join(map(str, oid)) for oid in oids]
+        expected = agent.values(oids)
+
+        def per_call():
+            values = []
+            for name in names:
+                _, _, _, var_binds = next(hlapi.getCmd(
+                    hlapi.SnmpEngine(), hlapi.CommunityData('public', mpModel=1),
+                    hlapi.UdpTransportTarget(('127.0.0.1', agent.port), timeout=2),
+                    hlapi.ContextData(), hlapi.ObjectType(hlapi.ObjectIdentity(name))))
+                values.append(str(var_binds[0][1]) if var_binds else None)
+            return values
+
+        pool = SnmpPool()
+
+        def pooled():
+            return [pool.get('127.0.0.1', name, port=agent.port) for name in names]
+
+        def batched():
+            values = pool.get_many('127.0.0.1', dict(zip(names, names)), port=agent.port)
+            return [values[name] for name in names]
+
+        for mode, poll in (('per_call', per_call), ('pooled', pooled), ('batched', batched)):
+            pool.reset_stats()
+            requests = agent.requests
+            values = poll()                      # warm-up (pool: engine + transport)
+            best = _best_of(poll, repeat)
+            report['runs'].append({
+                'mode': mode,
+                'poll_ms': round(best * 1000, 2),
+                'per_get_ms': round(best * 1000 / len(names), 3),
+                'requests': (agent.requests - requests) // (repeat + 1),
+                'correct': values == expected,
+                'pool': dict(pool.stats) if mode != 'per_call' else None,
+            })
+    return report
+
+
+def bench_snmp_walk(port_counts: List[int] = (48, 400), latency_ms: float = 1.0,
+                    max_pdu: int = 1472) -> Dict:
+    """ifTable walk of a 48 / 400 port switch: GETNEXT vs GETBULK vs parallel columns"""
+    from lazy_imports import is_available
+
+    report = {'benchmark': 'snmp-walk', 'timestamp': datetime.now().isoformat(),
+              'environment': _environment(), 'latency_ms': latency_ms,
+              'max_pdu': max_pdu, 'runs': []}
+    if not is_available('pysnmp'):
+        report['skipped'] = ['snmp-walk (pysnmp not installed)']
+        return report
+
+    from snmp_session import SnmpPool
+
+    table = '.'.join(map(str, IF_ENTRY_OID))
+    columns = [f'{table}.{column}' for column in (2, 5, 8, 10, 14, 16, 20)]  # get_interface_stats
+    for ports in port_counts:
+        with SimulatedAgent(ports, latency_ms=latency_ms, max_size=max_pdu) as agent:
+            pool = SnmpPool()   # fresh: includes the max-repetitions ramp-up
+            entries = [oid for oid in agent.mib if oid[:len(IF_ENTRY_OID)] == IF_ENTRY_OID]
+            expected = sorted(zip(('.'.join(map(str, oid)) for oid in entries),
+                                  agent.values(entries)))
+
+            def walk(oids, bulk):
+                return sorted(pool.walk_columns('127.0.0.1', oids, port=agent.port, bulk=bulk))
+
+            for mode, run, check in (
+                    ('getnext', lambda: walk([table], False), expected),
+                    ('getbulk', lambda: walk([table], True), expected),
+                    ('columns', lambda: walk(columns, True),
+                     [(o, v) for o, v in expected if o.rsplit('.', 1)[0] in columns])):
+                requests = agent.requests
+                start = time.perf_counter()
+                result = run()
+                elapsed = time.perf_counter() - start
+                report['runs'].append({
+                    'ports': ports,
+                    'mode': mode,
+                    'varbinds': len(result),
+                    'requests': agent.requests - requests,
+                    'elapsed_ms': round(elapsed * 1000, 1),
+                    'bulk_size': pool.bulk_size('127.0.0.1') if mode != 'getnext' else 1,
+                    'correct': result == check,
+                })
+    return report
+
+
+def bench_snmp_poll(agents: int = 20, dead: int = 10, latency_ms: float = 20.0,
+                    in_flight: int = 32) -> Dict:
+    """
+    System group + ifTable of every device: one device after the other vs
+    SnmpPoller - agents on 127.10.0.x:161 (root), silent hosts on 127.10.1.x
+    """
+    from lazy_imports import is_available
+
+    report = {'benchmark': 'snmp-poll', 'timestamp': datetime.now().isoformat(),
+              'environment': _environment(), 'agents': agents, 'dead': dead,
+              'latency_ms': latency_ms, 'runs': []}
+    if not is_available('pysnmp'):
+        report['skipped'] = ['snmp-poll (pysnmp not installed)']
+        return report
+
+    from snmp_poller import SnmpPoller
+    from snmp_session import SnmpError, get_snmp_pool
+
+    system = {str(i): '.'.join(map(str, SYSTEM_OID + (i, 0))) for i in range(1, 7)}
+    columns = ['.'.join(map(str, IF_ENTRY_OID + (column,))) for column in IF_COLUMNS]
+    live = [f'127.10.0.{i + 1}' for i in range(agents)]
+    hosts = live + [f'127.10.1.{i + 1}' for i in range(dead)]
+
+    def poll(ip):
+        pool = get_snmp_pool()
+        try:
+            return (pool.get_many(ip, system, timeout=1, retries=1),
+                    sorted(pool.walk_columns(ip, columns, timeout=1, retries=1)))
+        except SnmpError:
+            return None
+
+    with contextlib.ExitStack() as stack:
+        try:
+            for ip in live:
+                stack.enter_context(SimulatedAgent(24, latency_ms=latency_ms, host=ip, port=161))
+        except OSError as e:
+            report['skipped'] = [f'snmp-poll (agents on port 161: {e})']
+            return report
+
+        poller = SnmpPoller(max_in_flight=in_flight, sweep_timeout=1)   # same timeout as poll()
+        for mode, run in (('sequential', lambda: {ip: poll(ip) for ip in hosts}),
+                          ('poller', lambda: poller.poll(hosts, poll))):
+            start = time.perf_counter()
+            result = run()
+            elapsed = time.perf_counter() - start
+            report['runs'].append({
+                'mode': mode,
+                'elapsed_s': round(elapsed, 3),
+                'answered': sum(1 for value in result.values() if value),
+                'result': result,
+            })
+
+    expected = report['runs'][0].pop('result')
+    report['runs'][1]['correct'] = report['runs'][1].pop('result') == expected
+    report['runs'][0]['correct'] = all(expected[ip] for ip in live)
+    report['poller'] = poller.stats
+    return report
+
+
+def print_report(report: Dict):
+    print("\n" + "="*70)
+    if report['benchmark'] == 'engines':
+        print(f"🏁 BENCHMARK: engines ({report['hosts']} hosts x {report['ports']} ports)")
+        print("="*70)
+        for run in report['runs']:
+            icon = '✅' if run['correct'] else '❌'
+            print(f"  {icon} {run['engine']:10} | {run['elapsed_s']:7.3f} s | "
+                  f"{run['probes_per_sec']:10.0f} probes/s | {run['open']} open")
+        for skipped in report.get('skipped', []):
+            print(f"  ⏭️  {skipped}")
+
+        runs = {r['engine']: r for r in report['runs']}
+        if 'connect' in runs and 'syn' in runs and runs['syn']['elapsed_s']:
+            print(f"\nSYN speedup: {runs['connect']['elapsed_s'] / runs['syn']['elapsed_s']:.1f}x")
+        return
+
+    if report['benchmark'] == 'snapshot':
+        print("🏁 BENCHMARK: snapshot (size, load time in ms)")
+        print("="*70)
+        for run in report['runs']:
+            b, t = run['bytes'], run['load_ms']
+            icon = '✅' if run['correct'] else '❌'
+            print(f"  {icon} {run['hosts']:6} hosts | JSON {b['json'] / 1024:8.1f} KiB "
+                  f"{t['json']:8.2f} ms | compact {b['json_compact'] / 1024:8.1f} KiB "
+                  f"{t['json_compact']:8.2f} ms | binary {b['binary'] / 1024:8.1f} KiB")
+            print(f"  {'':9}binary: full {t['binary_full']:8.2f} ms | one device "
+                  f"{t['binary_device']:6.3f} ms | type column {t['binary_column']:7.2f} ms")
+        return
+
+    if report['benchmark'] == 'snmp':
+        print(f"🏁 BENCHMARK: snmp ({report['oids']}-OID device poll, "
+              f"agent latency {report['latency_ms']:g} ms, PDU limit {report['max_pdu']} bytes)")
+        print("="*70)
+        for run in report['runs']:
+            icon = '✅' if run['correct'] else '❌'
+            print(f"  {icon} {run['mode']:9} | {run['poll_ms']:9.2f} ms/poll | "
+                  f"{run['per_get_ms']:7.3f} ms/GET | {run['requests']} requests")
+        for skipped in report.get('skipped', []):
+            print(f"  ⏭️  {skipped}")
+
+        runs = {r['mode']: r for r in report['runs']}
+        if 'per_call' in runs and 'pooled' in runs and runs['pooled']['poll_ms']:
+            print(f"\nPool speedup: {runs['per_call']['poll_ms'] / runs['pooled']['poll_ms']:.1f}x")
+        if 'pooled' in runs and 'batched' in runs and runs['batched']['requests']:
+            print(f"Multi-OID GET: {runs['pooled']['requests'] / runs['batched']['requests']:.1f}x "
+                  f"fewer round trips, {runs['pooled']['poll_ms'] / runs['batched']['poll_ms']:.1f}x faster")
+        return
+
+    if report['benchmark'] == 'snmp-walk':
+        print(f"🏁 BENCHMARK: snmp-walk (ifTable, agent latency {report['latency_ms']:g} ms, "
+              f"PDU limit {report['max_pdu']} bytes)")
+        print("="*70)
+        for run in report['runs']:
+            icon = '✅' if run['correct'] else '❌'
+            print(f"  {icon} {run['ports']:4} ports | {run['mode']:8} | {run['varbinds']:5} varbinds | "
+                  f"{run['requests']:5} round trips | {run['elapsed_ms']:8.1f} ms | "
+                  f"{run['bulk_size']} per response")
+        for skipped in report.get('skipped', []):
+            print(f"  ⏭️  {skipped}")
+        return
+
+    if report['benchmark'] == 'snmp-poll':
+        print(f"🏁 BENCHMARK: snmp-poll ({report['agents']} agents + {report['dead']} silent hosts, "
+              f"agent latency {report['latency_ms']:g} ms)")
+        print("="*70)
+        for run in report['runs']:
+            icon = '✅' if run['correct'] else '❌'
+            print(f"  {icon} {run['mode']:10} | {run['elapsed_s']:8.3f} s | {run['answered']} devices")
+        for skipped in report.get('skipped', []):
+            print(f"  ⏭️  {skipped}")
+
+        runs = {r['mode']: r for r in report['runs']}
+        if 'poller' in runs and runs['poller']['elapsed_s']:
+            print(f"\nPoller speedup: "
+                  f"{runs['sequential']['elapsed_s'] / runs['poller']['elapsed_s']:.1f}x "
+                  f"(max. {report['poller']['max_in_flight']} devices in flight)")
+        return
+
+    print(f"🏁 BENCHMARK: suite (latency {report['latency_ms']:g} ms, "
+          f"connect latency: {report['connect_latency']})")
+    print("="*70)
+    for run in report['runs']:
+        p = run['phases']
+        icon = '✅' if run['correct'] else '❌'
+        print(f"  {icon} {run['hosts']:6} hosts | ports {p['port_scan']['elapsed_s']:7.3f}s "
+              f"({p['port_scan']['probes_per_sec']:.0f}/s) | "
+              f"classify {p['classify']['per_host_us']:6.2f} µs/host | "
+              f"enrich {p['enrich']['elapsed_s']:6.3f}s | "
+              f"export {p['export']['elapsed_s']:6.3f}s")
+
+
+def compare(old: Dict, new: Dict) -> int:
+    """Suite reports side by side - phases more than 20% slower are flagged"""
+    print("\n" + "="*70)
+    print(f"📊 COMPARE: {old['environment'].get('commit')} -> {new['environment'].get('commit')}")
+    print("="*70)
+
+    old_runs = {r['hosts']: r for r in old['runs']}
+    regressions = 0
+    for run in new['runs']:
+        before = old_runs.get(run['hosts'])
+        if before is None:
+            continue
+        for phase, values in run['phases'].items():
+            prev = before['phases'].get(phase, {}).get('elapsed_s')
+            if not prev:
+                continue
+            change = (values['elapsed_s'] - prev) / prev * 100
+            slower = change > 20
+            regressions += slower
+            print(f"  {'❌' if slower else '✅'} {run['hosts']:6} hosts | {phase:10} | "
+                  f"{prev:8.4f}s -> {values['elapsed_s']:8.4f}s ({change:+6.1f}%)")
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Offline scanner benchmarks (loopback)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    engines = sub.add_parser('engines', help='Connect vs SYN port scan engine')
+    engines.add_argument('--hosts', type=int, default=254, help='Target hosts (default: 254)')
+    engines.add_argument('--rate', type=int, default=20000, help='SYN packets/s (default: 20000)')
+    engines.add_argument('--json', metavar='FILE', help='Also write the report as JSON')
+
+    suite = sub.add_parser('suite', help='Port scan, classify, enrich, export at 100/1k/10k hosts')
+    suite.add_argument('--sizes', default=','.join(map(str, SUITE_SIZES)),
+                       help='Host counts (default: 100,1000,10000)')
+    suite.add_argument('--open-ports', default=','.join(map(str, OPEN_PORTS)),
+                       help='Open ports on simulated hosts (default: 22,80,443)')
+    suite.add_argument('--every', type=int, default=4,
+                       help='Every n-th host has open ports (default: 4)')
+    suite.add_argument('--latency-ms', type=float, default=0.0,
+                       help='Simulated round trip (DNS responder, lo netem if available)')
+    suite.add_argument('--json', metavar='FILE',
+                       help=f'Report path (default: {RESULTS_DIR}/suite-<time>.json)')
+
+    snapshot = sub.add_parser('snapshot', help='JSON vs binary snapshot size and load time')
+    snapshot.add_argument('--sizes', default=','.join(map(str, SUITE_SIZES)),
+                          help='Device counts (default: 100,1000,10000)')
+    snapshot.add_argument('--json', metavar='FILE', help='Also write the report as JSON')
+
+    snmp = sub.add_parser('snmp', help='SNMP GETs: engine per request vs shared pool')
+    snmp.add_argument('--oids', type=int, default=50, help='OIDs per device poll (default: 50)')
+    snmp.add_argument('--latency-ms', type=float, default=0.0,
+                      help='Simulated agent response time')
+    snmp.add_argument('--max-pdu', type=int, default=1472,
+                      help='Agent response size limit in bytes, larger = tooBig (default: 1472)')
+    snmp.add_argument('--json', metavar='FILE', help='Also write the report as JSON')
+
+    walk = sub.add_parser('snmp-walk', help='ifTable walk: GETNEXT vs GETBULK vs parallel columns')
+    walk.add_argument('--ports', default='48,400', help='Switch sizes (default: 48,400)')
+    walk.add_argument('--latency-ms', type=float, default=1.0,
+                      help='Simulated agent response time (default: 1)')
+    walk.add_argument('--max-pdu', type=int, default=1472,
+                      help='Agent response size limit in bytes (default: 1472)')
+    walk.add_argument('--json', metavar='FILE', help='Also write the report as JSON')
+
+    poll = sub.add_parser('snmp-poll', help='Device polls one by one vs concurrent SnmpPoller')
+    poll.add_argument('--agents', type=int, default=20, help='Simulated agents (default: 20)')
+    poll.add_argument('--dead', type=int, default=10, help='Hosts without agent (default: 10)')
+    poll.add_argument('--latency-ms', type=float, default=20.0,
+                      help='Simulated agent response time (default: 20)')
+    poll.add_argument('--in-flight', type=int, default=32, help='Devices polled at once (default: 32)')
+    poll.add_argument('--json', metavar='FILE', help='Also write the report as JSON')
+
+    cmp = sub.add_parser('compare', help='Compare two suite reports')
+    cmp.add_argument('old')
+    cmp.add_argument('new')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.old) as f_old, open(args.new) as f_new:
+            return compare(json.load(f_old), json.load(f_new))
+
+    if args.command == 'engines':
+        report = bench_engines(args.hosts, args.rate)
+    elif args.command == 'snapshot':
+        report = bench_snapshot([int(s) for s in args.sizes.split(',')])
+    elif args.command == 'snmp':
+        report = bench_snmp(args.oids, latency_ms=args.latency_ms, max_pdu=args.max_pdu)
+    elif args.command == 'snmp-walk':
+        report = bench_snmp_walk([int(p) for p in args.ports.split(',')],
+                                 args.latency_ms, args.max_pdu)
+    elif args.command == 'snmp-poll':
+        report = bench_snmp_poll(args.agents, args.dead, args.latency_ms, args.in_flight)
+    else:
+        report = bench_suite([int(s) for s in args.sizes.split(',')],
+                             [int(p) for p in args.open_ports.split(',')],
+                             args.every, args.latency_ms)
+        if not args.json:
+            os.makedirs(RESULTS_DIR, exist_ok=True)
+            args.json = os.path.join(RESULTS_DIR,
+                                     f"suite-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report: {args.json}")
+
+    return 0 if all(r['correct'] for r in report['runs']) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
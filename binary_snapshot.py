@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Binary Snapshot - columnar network_data.bin next to network_data.json
+
+Readers that only need a few fields (one device, all types, all
+latencies) should not parse the whole pretty-printed JSON tree:
+- Written together with the JSON export (same content, `export.binary_snapshot`)
+- One column per field, devices sorted by IP (binary search by address)
+- Strings in offset tables, repeated strings (vendor, type, ...) dictionary-encoded
+- Open ports in CSR layout (offsets + one flat u16 array)
+- The file is mmap'ed, columns are memoryviews - nothing is decoded until used
+
+Layout (little endian, columns 8-byte aligned):
+    header   magic 'NMS1' | version u16 | reserved u16 | devices u32 | columns u32
+    index    columns x (name 24s | kind u8 | 7x pad | offset u64)
+    column   length u64 | data
+        u32 / u16 / f64   plain arrays
+        str               count u32 | (count + 1) x end offset u32 | UTF-8
+        json              UTF-8 JSON (export fields outside the device table)
+
+Usage:
+    snap = BinarySnapshot('network_data.bin')
+    snap.device('192.168.1.10')      # one device, same dict as in the JSON
+    snap.column_values('type')       # all device types
+"""
+
+import ipaddress
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterator, List, Optional
+
+_MAGIC = b'NMS1'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHII')
+_INDEX = struct.Struct('<24sB7xQ')
+_LENGTH = struct.Struct('<Q')
+
+KIND_U32, KIND_U16, KIND_F64, KIND_STR, KIND_JSON = 1, 2, 3, 4, 5
+_ARRAY_FORMATS = {KIND_U32: 'I', KIND_U16: 'H', KIND_F64: 'd'}
+
+# Device fields with their own column -> presence bit
+# (str = offset table, dict = u32 codes into '<name>.dict')
+DEVICE_FIELDS = [
+    ('hostname', 'str'),
+    ('mac', 'str'),
+    ('vendor', 'dict'),
+    ('type', 'dict'),
+    ('open_ports', 'ports'),
+    ('discovery_method', 'dict'),
+    ('last_probed', 'f64'),
+    ('metrics', 'present'),
+]
+METRIC_FIELDS = [
+    ('status', 'dict'),
+    ('last_seen', 'dict'),
+    ('latency_ms', 'f64'),
+    ('port_count', 'u32'),
+]
+_FIELD_BITS = {name: i for i, (name, _) in enumerate(DEVICE_FIELDS + METRIC_FIELDS)}
+_DEVICE_NAMES = {name for name, _ in DEVICE_FIELDS}
+_METRIC_NAMES = {name for name, _ in METRIC_FIELDS}
+
+
+def binary_path(export_file: str) -> str:
+    """network_data.json -> network_data.bin"""
+    return f"{os.path.splitext(export_file)[0]}.bin"
+
+
+# --- writer ---------------------------------------------------------------
+
+def _fits(kind: str, value) -> bool:
+    """Can value be stored in a column of this kind (losslessly)?"""
+    if isinstance(value, bool):
+        return False
+    if kind in ('str', 'dict'):
+        return isinstance(value, str)
+    if kind == 'f64':
+        return isinstance(value, (int, float))
+    if kind == 'u32':
+        return isinstance(value, int) and 0 <= value <= 0xFFFFFFFF
+    if kind == 'ports':
+        return isinstance(value, list) and all(
+            isinstance(p, int) and not isinstance(p, bool) and 0 <= p <= 0xFFFF for p in value)
+    return False
+
+
+def _str_column(values: List[str]) -> bytes:
+    encoded = [v.encode('utf-8') for v in values]
+    ends, total = [], 0
+    for item in encoded:
+        total += len(item)
+        ends.append(total)
+    return (struct.pack(f'<{len(values) + 2}I', len(values), 0, *ends)
+            + b''.join(encoded))
+
+
+def _dict_columns(name: str, values: List[str]) -> Dict[str, tuple]:
+    table: Dict[str, int] = {}
+    codes = [table.setdefault(v, len(table)) for v in values]
+    return {
+        name: (KIND_U32, struct.pack(f'<{len(codes)}I', *codes)),
+        f'{name}.dict': (KIND_STR, _str_column(list(table))),
+    }
+
+
+def encode(output: Dict) -> bytes:
+    """Export dict (as written to network_data.json) -> snapshot bytes"""
+    devices = output.get('devices', {})
+    rows = sorted(((int(ipaddress.IPv4Address(ip)), ip, dev) for ip, dev in devices.items()),
+                  key=lambda r: r[0])
+    count = len(rows)
+
+    columns: Dict[str, tuple] = {
+        'meta': (KIND_JSON, json.dumps({k: v for k, v in output.items() if k != 'devices'},
+                                       separators=(',', ':')).encode('utf-8')),
+        'ip': (KIND_U32, struct.pack(f'<{count}I', *(r[0] for r in rows))),
+    }
+
+    present = [0] * count
+    extras = [''] * count
+    values: Dict[str, list] = {name: [] for name, _ in DEVICE_FIELDS + METRIC_FIELDS}
+    port_ends, ports = [0], []
+
+    for i, (_, _, dev) in enumerate(rows):
+        extra = {k: v for k, v in dev.items() if k not in _DEVICE_NAMES}
+        metrics = dev.get('metrics')
+        if 'metrics' in dev and not isinstance(metrics, dict):
+            extra['metrics'] = metrics
+            metrics = None
+
+        for name, kind in DEVICE_FIELDS:
+            value = dev.get(name)
+            if kind == 'present':
+                ok = metrics is not None
+            else:
+                ok = name in dev and _fits(kind, value)
+            if ok:
+                present[i] |= 1 << _FIELD_BITS[name]
+            elif name in dev and name != 'metrics':
+                extra[name] = value
+            values[name].append(value if ok else None)
+            if kind == 'ports':
+                ports.extend(value if ok else [])
+                port_ends.append(len(ports))
+
+        metrics = metrics or {}
+        metric_extra = {k: v for k, v in metrics.items() if k not in _METRIC_NAMES}
+        for name, kind in METRIC_FIELDS:
+            value = metrics.get(name)
+            ok = name in metrics and _fits(kind, value)
+            if ok:
+                present[i] |= 1 << _FIELD_BITS[name]
+            elif name in metrics:
+                metric_extra[name] = value
+            values[name].append(value if ok else None)
+        if metric_extra:
+            extra['metrics'] = metric_extra
+        if extra:
+            extras[i] = json.dumps(extra, separators=(',', ':'))
+
+    columns['present'] = (KIND_U32, struct.pack(f'<{count}I', *present))
+    columns['extra'] = (KIND_STR, _str_column(extras))
+    columns['ports.offsets'] = (KIND_U32, struct.pack(f'<{count + 1}I', *port_ends))
+    columns['ports'] = (KIND_U16, struct.pack(f'<{len(ports)}H', *ports))
+
+    for name, kind in DEVICE_FIELDS + METRIC_FIELDS:
+        column = values[name]
+        if kind == 'str':
+            columns[name] = (KIND_STR, _str_column([v or '' for v in column]))
+        elif kind == 'dict':
+            columns.update(_dict_columns(name, [v or '' for v in column]))
+        elif kind == 'f64':
+            columns[name] = (KIND_F64, struct.pack(f'<{count}d', *(v or 0.0 for v in column)))
+        elif kind == 'u32':
+            columns[name] = (KIND_U32, struct.pack(f'<{count}I', *(v or 0 for v in column)))
+
+    # Header + index, then 8-byte aligned, length-prefixed columns
+    offset = _HEADER.size + _INDEX.size * len(columns)
+    index, blobs = [], []
+    for name, (kind, data) in columns.items():
+        offset += -offset % 8
+        index.append(_INDEX.pack(name.encode('ascii'), kind, offset))
+        blob = _LENGTH.pack(len(data)) + data
+        blobs.append((offset, blob))
+        offset += len(blob)
+
+    out = bytearray(_HEADER.pack(_MAGIC, _VERSION, 0, count, len(columns)))
+    out += b''.join(index)
+    for start, blob in blobs:
+        out += b'\x00' * (start - len(out))
+        out += blob
+    return bytes(out)
+
+
+def write(path: str, output: Dict) -> int:
+    """Atomic write -> bytes written"""
+    from export_writer import atomic_write
+
+    data = encode(output)
+    atomic_write(path, data)
+    return len(data)
+
+
+# --- reader ---------------------------------------------------------------
+
+class _Strings:
+    """Lazy view on a str column"""
+
+    def __init__(self, view: memoryview):
+        self.count = struct.unpack_from('<I', view, 0)[0]
+        self._ends = view[4:8 + 4 * self.count].cast('I')
+        self._data = view[8 + 4 * self.count:]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int) -> str:
+        return bytes(self._data[self._ends[i]:self._ends[i + 1]]).decode('utf-8')
+
+
+class BinarySnapshot:
+    """
+    mmap'ed snapshot - columns are decoded on access, devices on demand
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+
+        magic, version, _, self.count, n_columns = _HEADER.unpack_from(self._view, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"{path}: not a network snapshot (v{_VERSION})")
+        if sys.byteorder != 'little':
+            raise ValueError("binary snapshots are little endian only")
+
+        self.columns: Dict[str, tuple] = {}
+        for i in range(n_columns):
+            name, kind, offset = _INDEX.unpack_from(self._view, _HEADER.size + i * _INDEX.size)
+            length = _LENGTH.unpack_from(self._view, offset)[0]
+            start = offset + _LENGTH.size
+            self.columns[name.rstrip(b'\x00').decode('ascii')] = (kind, start, start + length)
+        self._cache: Dict[str, object] = {}
+
+    def close(self):
+        self._cache.clear()
+        try:
+            self._view.release()
+            self._mm.close()
+        except BufferError:
+            pass  # caller still holds a column - unmapped when it is dropped
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def column(self, name: str):
+        """memoryview (numeric), _Strings (str) or dict (json) - cached"""
+        if name not in self._cache:
+            kind, start, end = self.columns[name]
+            view = self._view[start:end]
+            if kind in _ARRAY_FORMATS:
+                self._cache[name] = view.cast(_ARRAY_FORMATS[kind])
+            elif kind == KIND_STR:
+                self._cache[name] = _Strings(view)
+            else:
+                self._cache[name] = json.loads(bytes(view))
+        return self._cache[name]
+
+    @property
+    def meta(self) -> Dict:
+        """Everything in the export except the devices (summary, timestamp, ...)"""
+        return self.column('meta')
+
+    def ip(self, i: int) -> str:
+        return str(ipaddress.IPv4Address(self.column('ip')[i]))
+
+    def ips(self) -> List[str]:
+        return [str(ipaddress.IPv4Address(v)) for v in self.column('ip')]
+
+    def find(self, ip: str) -> Optional[int]:
+        """Row of ip (binary search) or None"""
+        try:
+            key = int(ipaddress.IPv4Address(ip))
+        except ValueError:
+            return None
+        ips = self.column('ip')
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ips[mid] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo if lo < self.count and ips[lo] == key else None
+
+    def _value(self, name: str, kind: str, i: int):
+        if kind == 'str':
+            return self.column(name)[i]
+        if kind == 'dict':
+            return self.column(f'{name}.dict')[self.column(name)[i]]
+        if kind == 'ports':
+            offsets = self.column('ports.offsets')
+            return self.column('ports')[offsets[i]:offsets[i + 1]].tolist()
+        return self.column(name)[i]
+
+    def column_values(self, name: str) -> List:
+        """One field for all devices (None where the device has no value)"""
+        kind = dict(DEVICE_FIELDS + METRIC_FIELDS)[name]
+        bit = 1 << _FIELD_BITS[name]
+        present = self.column('present')
+        return [self._value(name, kind, i) if present[i] & bit else None
+                for i in range(self.count)]
+
+    def row(self, i: int) -> Dict:
+        """Device dict of row i - same keys and values as in the JSON export"""
+        present = self.column('present')[i]
+        device = {}
+        for name, kind in DEVICE_FIELDS:
+            if present & (1 << _FIELD_BITS[name]):
+                device[name] = {} if kind == 'present' else self._value(name, kind, i)
+        if 'metrics' in device:
+            for name, kind in METRIC_FIELDS:
+                if present & (1 << _FIELD_BITS[name]):
+                    device['metrics'][name] = self._value(name, kind, i)
+
+        extra = self.column('extra')[i]
+        if extra:
+            extra = json.loads(extra)
+            if isinstance(extra.get('metrics'), dict) and 'metrics' in device:
+                device['metrics'].update(extra.pop('metrics'))
+            device.update(extra)
+        return device
+
+    def device(self, ip: str) -> Optional[Dict]:
+        i = self.find(ip)
+        return None if i is None else self.row(i)
+
+    def devices(self) -> Iterator[tuple]:
+        for i in range(self.count):
+            yield self.ip(i), self.row(i)
+
+    def to_dict(self) -> Dict:
+        """Full export dict (what json.load on network_data.json returns)"""
+        data = dict(self.meta)
+        data['devices'] = dict(self.devices())
+        return data
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else binary_path('network_data.json')
+    try:
+        snap = BinarySnapshot(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ {path}: {e}")
+        sys.exit(1)
+
+    with snap:
+        print(f"\n📦 {path}: {len(snap)} devices, {os.path.getsize(path)} bytes, "
+              f"{len(snap.columns)} columns")
+        if len(sys.argv) > 2:
+            print(json.dumps(snap.device(sys.argv[2]), indent=2))
+            return
+        for ip, device_type in zip(snap.ips(), snap.column_values('type')):
+            print(f"  {ip:15} | {device_type}")
+
+
+if __name__ == "__main__":
+    main()
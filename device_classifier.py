@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Device Classifier - port signatures as bitmasks, batch scoring
+
+Every device's open ports become ONE integer (bit per signature port),
+every signature a required/optional mask pair:
+
+    score = popcount(ports & required) * 10 + popcount(ports & optional)
+
+A batch is scored against all signatures in one vectorized pass
+(NumPy when installed, plain ints otherwise). Results are identical to
+the per-device loops: highest score wins, ties go to the first signature.
+Vendor rules are resolved once per distinct vendor string (cached).
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from lazy_imports import is_available, load
+
+NUMPY_AVAILABLE = is_available('numpy')
+
+# Below this, NumPy setup costs more than the loop
+NUMPY_MIN_BATCH = 256
+
+# Substring in vendor -> device type (first match wins)
+VENDOR_TYPES = {
+    'cisco': 'router', 'juniper': 'router',
+    'ubiquiti': 'wlan_ap', 'mikrotik': 'router',
+    'playstation': 'gaming_console', 'xbox': 'gaming_console',
+    'nintendo': 'gaming_console',
+    'synology': 'nas', 'qnap': 'nas',
+    'raspberry': 'raspberry_pi',
+}
+
+
+def _popcount(x: int) -> int:
+    return bin(x).count('1')
+
+
+class BitmaskClassifier:
+    """
+    Usage:
+        clf = BitmaskClassifier(scanner.port_signatures)
+        clf.classify_batch([[80, 443], [139, 445]])  -> ['router', 'nas']
+    """
+
+    def __init__(self, signatures: Dict, vendor_types: Dict = None):
+        self.types = list(signatures)
+        self.ports = sorted({p for sig in signatures.values()
+                             for p in sig['required'] + sig['optional']})
+        self.bit = {port: i for i, port in enumerate(self.ports)}
+
+        self.required = [self._mask(sig['required']) for sig in signatures.values()]
+        self.optional = [self._mask(sig['optional']) for sig in signatures.values()]
+
+        self.vendor_types = VENDOR_TYPES if vendor_types is None else vendor_types
+        self._vendor_cache: Dict[str, Optional[str]] = {}
+        self._np_weights = None
+
+    def _mask(self, ports: List[int]) -> int:
+        mask = 0
+        for port in ports:
+            mask |= 1 << self.bit[port]
+        return mask
+
+    def encode(self, open_ports: List[int]) -> int:
+        """Open ports -> bitmask (ports outside all signatures are ignored)"""
+        mask = 0
+        for port in open_ports:
+            i = self.bit.get(port)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def classify_mask(self, mask: int) -> str:
+        best_type, best_score = 'unknown', -1
+        for i, device_type in enumerate(self.types):
+            required = _popcount(mask & self.required[i])
+            if required == 0:
+                continue
+            score = required * 10 + _popcount(mask & self.optional[i])
+            if score > best_score:
+                best_type, best_score = device_type, score
+        return best_type
+
+    def classify_ports(self, open_ports: List[int]) -> str:
+        """Single device (same result as UltraScanner._classify_by_ports)"""
+        return self.classify_mask(self.encode(open_ports))
+
+    def classify_masks(self, masks: List[int]) -> List[str]:
+        """All devices against all signatures"""
+        if (NUMPY_AVAILABLE and len(masks) >= NUMPY_MIN_BATCH
+                and len(self.ports) <= 63):
+            return self._classify_numpy(masks)
+        return [self.classify_mask(m) for m in masks]
+
+    def classify_batch(self, port_lists: List[List[int]]) -> List[str]:
+        return self.classify_masks([self.encode(p) for p in port_lists])
+
+    def _classify_numpy(self, masks: List[int]) -> List[str]:
+        np = load('numpy')
+
+        if self._np_weights is None:
+            n_bits = len(self.ports)
+            bits = np.arange(n_bits, dtype=np.uint64)
+            required = np.array(self.required, dtype=np.uint64)
+            optional = np.array(self.optional, dtype=np.uint64)
+            # bits x signatures membership matrices
+            self._np_weights = (
+                bits,
+                ((required[None, :] >> bits[:, None]) & 1).astype(np.int32),
+                ((optional[None, :] >> bits[:, None]) & 1).astype(np.int32),
+            )
+        bits, req_w, opt_w = self._np_weights
+
+        values = np.array(masks, dtype=np.uint64)
+        port_bits = ((values[:, None] >> bits[None, :]) & 1).astype(np.int32)
+
+        required = port_bits @ req_w
+        scores = np.where(required > 0, required * 10 + port_bits @ opt_w, -1)
+
+        best = scores.argmax(axis=1)   # first maximum = first signature on ties
+        labels = np.array(self.types + ['unknown'], dtype=object)
+        best[scores.max(axis=1) < 0] = len(self.types)
+        return labels[best].tolist()
+
+    def vendor_type(self, vendor: str) -> Optional[str]:
+        """Device type from vendor string - resolved once per distinct vendor"""
+        key = vendor.lower()
+        if key not in self._vendor_cache:
+            self._vendor_cache[key] = next(
+                (val for sub, val in self.vendor_types.items() if sub in key), None
+            )
+        return self._vendor_cache[key]
+
+    def final_type(self, device: Dict) -> str:
+        """Vendor -> port type -> hostname (same as _multi_factor_classify)"""
+        by_vendor = self.vendor_type(device.get('vendor', ''))
+        if by_vendor:
+            return by_vendor
+
+        if device.get('device_type', 'unknown') != 'unknown':
+            return device['device_type']
+
+        hostname = device.get('hostname', '').lower()
+        if any(x in hostname for x in ['router', 'gw']):
+            return 'router'
+        elif 'ap' in hostname or 'unifi' in hostname:
+            return 'wlan_ap'
+
+        return 'unknown'
+
+    def final_types(self, devices: List[Dict]) -> List[str]:
+        return [self.final_type(d) for d in devices]
+
+
+def _reference_classify(signatures: Dict, open_ports: List[int]) -> str:
+    """Original per-device loop (for the equivalence check)"""
+    open_set = set(open_ports)
+    scores = {}
+    for device_type, sig in signatures.items():
+        required = sum(1 for p in sig['required'] if p in open_set)
+        if required == 0:
+            continue
+        optional = sum(1 for p in sig['optional'] if p in open_set)
+        scores[device_type] = required * 10 + optional
+    if not scores:
+        return 'unknown'
+    return max(scores.items(), key=lambda x: x[1])[0]
+
+
+def main():
+    """Benchmark + equivalence check on random devices"""
+    import random
+    import sys
+    from ultra_scanner import UltraScanner
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    random.seed(42)
+
+    scanner = UltraScanner('127.0.0.0/24')
+    signatures = scanner.port_signatures
+    ports = scanner.important_ports
+    port_lists = [random.sample(ports, random.randint(0, 6)) for _ in range(count)]
+
+    print(f"\n🧮 Classifying {count} devices "
+          f"(NumPy: {'yes' if NUMPY_AVAILABLE else 'no'})")
+
+    start = time.perf_counter()
+    expected = [_reference_classify(signatures, p) for p in port_lists]
+    loop_ms = (time.perf_counter() - start) * 1000
+
+    clf = BitmaskClassifier(signatures)
+    start = time.perf_counter()
+    masks = [clf.encode(p) for p in port_lists]
+    encode_ms = (time.perf_counter() - start) * 1000
+
+    clf.classify_masks(masks[:NUMPY_MIN_BATCH])  # warm-up (NumPy import)
+    start = time.perf_counter()
+    result = clf.classify_masks(masks)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    mismatches = sum(1 for a, b in zip(expected, result) if a != b)
+    print(f"  Per-device loop : {loop_ms:8.1f} ms")
+    print(f"  Encode bitmasks : {encode_ms:8.1f} ms")
+    print(f"  Batch scoring   : {batch_ms:8.1f} ms")
+    print(f"  {'✅' if not mismatches else '❌'} {mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Async Reverse-DNS Resolver - shared by all scanners
+
+Replaces `socket.setdefaulttimeout(1)` + `gethostbyaddr` per host:
+- PTR queries for ALL hosts go out over ONE UDP socket to the system
+  resolver (/etc/resolv.conf), answers are matched by query id
+- No process-global socket timeout (port scan sockets stay untouched)
+- Positive cache honours the record TTL
+- Negative cache (NXDOMAIN / no PTR: SOA minimum, timeouts: short TTL),
+  so hosts without PTR records cost nothing on the next scan
+- /etc/hosts is consulted first (like nsswitch "files dns")
+
+Sync callers (thread pools) and async callers (scan pipeline) share one
+background event loop, identical in-flight lookups are merged.
+"""
+
+import asyncio
+import ipaddress
+import random
+import socket
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from rate_governor import get_governor
+
+DNS_PORT = 53
+TYPE_PTR = 12
+TYPE_SOA = 6
+CLASS_IN = 1
+RCODE_NXDOMAIN = 3
+RECV_BUFFER = 4 << 20  # capped by net.core.rmem_max
+
+
+def read_nameservers(path: str = '/etc/resolv.conf') -> List[str]:
+    servers = []
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == 'nameserver':
+                    servers.append(parts[1].split('%')[0])
+    except OSError:
+        pass
+    return servers
+
+
+def read_hosts_file(path: str = '/etc/hosts') -> Dict[str, str]:
+    """IP -> first hostname"""
+    hosts = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split('#', 1)[0].split()
+                if len(parts) >= 2:
+                    hosts.setdefault(parts[0], parts[1])
+    except OSError:
+        pass
+    return hosts
+
+
+def _build_query(qid: int, qname: str) -> bytes:
+    header = struct.pack('>HHHHHH', qid, 0x0100, 1, 0, 0, 0)  # RD, one question
+    labels = b''.join(bytes([len(l)]) + l.encode('ascii') for l in qname.split('.') if l)
+    return header + labels + b'\x00' + struct.pack('>HH', TYPE_PTR, CLASS_IN)
+
+
+def _read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """Domain name with compression pointers -> (name, offset after name)"""
+    labels = []
+    end = None
+    for _ in range(128):
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            return '.'.join(labels), end if end is not None else offset
+        labels.append(data[offset:offset + length].decode('ascii', 'replace'))
+        offset += length
+    raise ValueError('DNS name loop')
+
+
+def _parse_response(data: bytes) -> Tuple[int, str, Optional[str], Optional[int], int]:
+    """-> (query id, question name, PTR name or None, TTL or None, rcode)"""
+    qid, flags, qdcount, ancount, nscount, _ = struct.unpack_from('>HHHHHH', data, 0)
+    rcode = flags & 0x000F
+
+    offset = 12
+    qname = ''
+    for _ in range(qdcount):
+        qname, offset = _read_name(data, offset)
+        offset += 4
+
+    name, ttl = None, None
+    for index in range(ancount + nscount):
+        _, offset = _read_name(data, offset)
+        rtype, _, rttl, rdlength = struct.unpack_from('>HHIH', data, offset)
+        offset += 10
+        if index < ancount and rtype == TYPE_PTR and name is None:
+            name, _ = _read_name(data, offset)
+            ttl = rttl
+        elif index >= ancount and rtype == TYPE_SOA and name is None:
+            # Negative caching (RFC 2308): min(SOA TTL, SOA minimum)
+            minimum = struct.unpack_from('>I', data, offset + rdlength - 4)[0]
+            ttl = min(rttl, minimum)
+        offset += rdlength
+
+    return qid, qname, name, ttl, rcode
+
+
+class _DnsProtocol(asyncio.DatagramProtocol):
+    def __init__(self, resolver):
+        self.resolver = resolver
+
+    def datagram_received(self, data, addr):
+        self.resolver._on_response(data)
+
+
+class PtrResolver:
+    """
+    Cached async PTR lookups
+    Usage: get_resolver().resolve('192.168.1.10') -> 'nas.lan' or None
+    """
+
+    def __init__(self, timeout: float = 1.0, retries: int = 1,
+                 negative_ttl: int = 300, timeout_ttl: int = 60,
+                 min_ttl: int = 30, max_ttl: int = 3600,
+                 nameservers: Optional[List[str]] = None, port: int = DNS_PORT):
+        self.timeout = timeout
+        self.port = port
+        self.retries = retries
+        self.negative_ttl = negative_ttl
+        self.timeout_ttl = timeout_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+
+        servers = read_nameservers() if nameservers is None else nameservers
+        self.family = socket.AF_INET6 if servers and ':' in servers[0] else socket.AF_INET
+        self.nameservers = [s for s in servers if (':' in s) == (self.family == socket.AF_INET6)]
+        self.hosts = read_hosts_file()
+
+        self._positive: Dict[str, Tuple[str, float]] = {}   # ip -> (name, expires)
+        self._negative: Dict[str, float] = {}               # ip -> expires
+        self.stats = {'queries': 0, 'answers': 0, 'nxdomain': 0, 'timeouts': 0,
+                      'cache_hits': 0, 'negative_hits': 0}
+
+        self._loop = None
+        self._transport = None
+        self._start_lock = threading.Lock()
+        self._pending: Dict[int, Tuple[asyncio.Future, str]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    # --- background loop -------------------------------------------------
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run():
+                asyncio.set_event_loop(loop)
+                if self.nameservers:
+                    self._transport, _ = loop.run_until_complete(
+                        loop.create_datagram_endpoint(lambda: _DnsProtocol(self),
+                                                      family=self.family)
+                    )
+                    # One query per host goes out at once - room for the reply burst
+                    try:
+                        self._transport.get_extra_info('socket').setsockopt(
+                            socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+                    except OSError:
+                        pass
+                ready.set()
+                loop.run_forever()
+
+            threading.Thread(target=_run, name='ptr-resolver', daemon=True).start()
+            ready.wait()
+            self._loop = loop
+
+    def _on_response(self, data: bytes):
+        try:
+            qid, qname, name, ttl, rcode = _parse_response(data)
+        except (ValueError, IndexError, struct.error):
+            return
+        entry = self._pending.get(qid)
+        if entry is None:
+            return
+        future, expected = entry
+        if qname.lower() != expected.lower() or future.done():
+            return  # stray or spoofed reply
+        future.set_result((name, ttl, rcode))
+
+    def _new_id(self) -> int:
+        while True:
+            qid = random.getrandbits(16)
+            if qid not in self._pending:
+                return qid
+
+    # --- lookups (run on the resolver loop) ------------------------------
+
+    async def _query(self, ip: str) -> Optional[str]:
+        try:
+            qname = ipaddress.ip_address(ip).reverse_pointer
+        except ValueError:
+            return None
+
+        if not self._transport:
+            # No resolv.conf: system resolver in a thread (still no global timeout)
+            try:
+                name = (await self._loop.run_in_executor(None, socket.gethostbyaddr, ip))[0]
+                self._store(ip, name, self.max_ttl)
+                return name
+            except (OSError, UnicodeError):
+                self._store(ip, None, self.negative_ttl)
+                return None
+
+        for attempt in range(self.retries + 1):
+            server = self.nameservers[attempt % len(self.nameservers)]
+            qid = self._new_id()
+            future = self._loop.create_future()
+            self._pending[qid] = (future, qname)
+            self.stats['queries'] += 1
+            await get_governor().acquire_async(1, 'dns')
+            try:
+                self._transport.sendto(_build_query(qid, qname), (server, self.port))
+                name, ttl, rcode = await asyncio.wait_for(future, self.timeout)
+            except (asyncio.TimeoutError, OSError):
+                continue
+            finally:
+                self._pending.pop(qid, None)
+
+            if name:
+                self.stats['answers'] += 1
+                self._store(ip, name, ttl)
+                return name
+            if rcode == RCODE_NXDOMAIN or rcode == 0:
+                self.stats['nxdomain'] += 1
+                self._store(ip, None, ttl if ttl is not None else self.negative_ttl)
+                return None
+            # SERVFAIL / REFUSED: try next attempt
+
+        self.stats['timeouts'] += 1
+        self._store(ip, None, self.timeout_ttl)
+        return None
+
+    async def _lookup(self, ip: str) -> Optional[str]:
+        """Merge concurrent lookups of the same IP"""
+        hit, name = self.cached(ip)
+        if hit:
+            return name
+        task = self._inflight.get(ip)
+        if task is None:
+            task = self._loop.create_task(self._query(ip))
+            self._inflight[ip] = task
+            task.add_done_callback(lambda _: self._inflight.pop(ip, None))
+        # Shielded: a cancelled waiter (batch deadline) leaves the shared query
+        # running for the other callers of the same IP
+        return await asyncio.shield(task)
+
+    def _store(self, ip: str, name: Optional[str], ttl: Optional[int]):
+        if name:
+            ttl = max(self.min_ttl, min(self.max_ttl, ttl or self.min_ttl))
+            self._positive[ip] = (name.rstrip('.'), time.time() + ttl)
+            self._negative.pop(ip, None)
+        else:
+            self._negative[ip] = time.time() + max(1, min(self.max_ttl, ttl or 0))
+
+    # --- public API ------------------------------------------------------
+
+    def cached(self, ip: str) -> Tuple[bool, Optional[str]]:
+        """(hit, name) without any network traffic"""
+        if ip in self.hosts:
+            return True, self.hosts[ip]
+        now = time.time()
+        entry = self._positive.get(ip)
+        if entry and entry[1] > now:
+            self.stats['cache_hits'] += 1
+            return True, entry[0]
+        expires = self._negative.get(ip)
+        if expires and expires > now:
+            self.stats['negative_hits'] += 1
+            return True, None
+        return False, None
+
+    def resolve(self, ip: str) -> Optional[str]:
+        """Blocking lookup -> hostname or None"""
+        hit, name = self.cached(ip)
+        if hit:
+            return name
+        self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._lookup(ip), self._loop)
+        try:
+            return future.result(self.timeout * (self.retries + 1) + 1)
+        except Exception:
+            return None
+
+    async def resolve_async(self, ip: str) -> Optional[str]:
+        """Awaitable from any event loop"""
+        hit, name = self.cached(ip)
+        if hit:
+            return name
+        self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._lookup(ip), self._loop)
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception:
+            return None
+
+    def resolve_many(self, ips: Iterable[str],
+                     timings: Optional[Dict[str, float]] = None) -> Dict[str, Optional[str]]:
+        """
+        All lookups concurrently on the one socket -> {ip: name or None}
+        timings (optional dict) receives the lookup time per IP in ms
+        """
+        ips = list(dict.fromkeys(ips))
+        results = {}
+        missing = []
+        for ip in ips:
+            hit, name = self.cached(ip)
+            if hit:
+                results[ip] = name
+                if timings is not None:
+                    timings[ip] = 0.0
+            else:
+                missing.append(ip)
+
+        if missing:
+            self._ensure_loop()
+
+            async def _timed(ip: str) -> Optional[str]:
+                start = time.perf_counter()
+                try:
+                    return await self._lookup(ip)
+                finally:
+                    if timings is not None:
+                        timings[ip] = round((time.perf_counter() - start) * 1000, 1)
+
+            deadline = self._batch_deadline(len(missing))
+
+            async def _all():
+                # Answers that arrived count even if the batch runs out of time,
+                # lookups still waiting (queries or packet budget) are cancelled
+                tasks = [self._loop.create_task(_timed(ip)) for ip in missing]
+                _, pending = await asyncio.wait(tasks, timeout=deadline)
+                for task in pending:
+                    task.cancel()
+                return [None if task.cancelled() or not task.done() or task.exception()
+                        else task.result() for task in tasks]
+
+            future = asyncio.run_coroutine_threadsafe(_all(), self._loop)
+            try:
+                names = future.result(deadline + 1)
+            except Exception:
+                names = [None] * len(missing)
+            for ip, name in zip(missing, names):
+                results[ip] = name if isinstance(name, str) else None
+
+        return results
+
+    def _batch_deadline(self, lookups: int) -> float:
+        """One lookup's worst case, plus the time the packet budget needs for all queries"""
+        deadline = self.timeout * (self.retries + 1) + 5
+        pps = get_governor().pps
+        if pps:
+            deadline += lookups * (self.retries + 1) / pps
+        return deadline
+
+    def cache_stats(self) -> Dict:
+        return dict(self.stats, positive_cached=len(self._positive),
+                    negative_cached=len(self._negative))
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_resolver() -> PtrResolver:
+    """Process-wide resolver (one socket, one cache)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = PtrResolver()
+        return _shared
+
+
+def use_resolver(resolver: Optional[PtrResolver]):
+    """Replace the process-wide resolver (benchmarks); None = default on next use"""
+    global _shared
+    with _shared_lock:
+        _shared = resolver
+
+
+def resolve_many(ips: Iterable[str]) -> Dict[str, Optional[str]]:
+    return get_resolver().resolve_many(ips)
+
+
+def main():
+    import sys
+
+    ips = sys.argv[1:] or ['127.0.0.1']
+    resolver = get_resolver()
+    print(f"Nameservers: {', '.join(resolver.nameservers) or 'none (gethostbyaddr fallback)'}")
+
+    for label in ('cold', 'cached'):
+        start = time.perf_counter()
+        results = resolver.resolve_many(ips)
+        print(f"\n{label}: {(time.perf_counter() - start) * 1000:.1f} ms")
+        for ip in ips:
+            print(f"  {ip:15} | {results[ip] or '-'}")
+    print(f"\n{resolver.cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
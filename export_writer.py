@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Export Writer - atomic, compact, change-aware network_data.json
+
+- Written to a temp file in the same directory, then renamed over the
+  target: server.js (chokidar) never reads a half-written file
+- Optional compact output (no indent) - `"export": {"compact": true}`
+- Content fingerprint without the per-scan noise (timestamps, run stats,
+  latency jitter below `latency_step_ms`): an unchanged network is not
+  rewritten, so the dashboard only gets broadcasts on real changes
+- Columnar binary copy (network_data.bin, see binary_snapshot.py) for
+  readers that need single devices or fields without parsing the JSON
+- Every export (written or not) appends per-device samples to the
+  history ring (history_store.py) when `export.history_enabled` is set
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+from typing import Dict, Optional, Union
+
+# Change every scan without the network changing
+VOLATILE_KEYS = frozenset({'timestamp', 'last_seen', 'last_probed', 'shards', 'incremental'})
+
+DEFAULTS = {
+    'compact': False,
+    'skip_unchanged': True,
+    'latency_step_ms': 5.0,
+    'binary_snapshot': True,
+}
+
+
+def atomic_write(path: str, text: Union[str, bytes]):
+    """Temp file + fsync + rename - readers see the old or the new file, never a mix"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(text, bytes) else 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_export_config(config_file: str = 'monitor_config.json',
+                       defaults: Dict = DEFAULTS) -> Dict:
+    """'export' section of monitor_config.json with defaults"""
+    try:
+        with open(config_file, 'r') as f:
+            section = json.load(f).get('export', {})
+    except (FileNotFoundError, ValueError):
+        section = {}
+    return {**defaults, **{k: section[k] for k in defaults if k in section}}
+
+
+class SnapshotWriter:
+    """
+    Usage: get_writer().write('network_data.json', output) -> True if written
+    """
+
+    def __init__(self, compact: bool = False, skip_unchanged: bool = True,
+                 latency_step_ms: float = 5.0, binary_snapshot: bool = True):
+        self.compact = compact
+        self.skip_unchanged = skip_unchanged
+        self.latency_step_ms = latency_step_ms
+        self.binary_snapshot = binary_snapshot
+        self._hashes: Dict[str, Optional[str]] = {}   # path -> last fingerprint
+        self.stats = {'writes': 0, 'skipped': 0, 'bytes_written': 0,
+                      'binary_bytes': 0, 'binary_errors': 0}
+
+    def _stable(self, value):
+        """Copy without volatile keys, latency quantized"""
+        if isinstance(value, dict):
+            stable = {}
+            for key, item in value.items():
+                if key in VOLATILE_KEYS:
+                    continue
+                if key == 'latency_ms' and isinstance(item, (int, float)) and self.latency_step_ms:
+                    item = round(item / self.latency_step_ms)
+                stable[key] = self._stable(item)
+            return stable
+        if isinstance(value, list):
+            return [self._stable(item) for item in value]
+        return value
+
+    def fingerprint(self, data: Dict) -> str:
+        canonical = json.dumps(self._stable(data), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _previous_hash(self, path: str) -> Optional[str]:
+        """Last fingerprint for path - from the file on disk on first use"""
+        if path not in self._hashes:
+            try:
+                with open(path, 'r') as f:
+                    self._hashes[path] = self.fingerprint(json.load(f))
+            except (OSError, ValueError):
+                self._hashes[path] = None
+        return self._hashes[path]
+
+    def serialize(self, data: Dict) -> str:
+        if self.compact:
+            return json.dumps(data, separators=(',', ':'))
+        return json.dumps(data, indent=2)
+
+    def write(self, path: str, data: Dict, force: bool = False) -> bool:
+        """Atomic write, skipped if nothing but volatile fields changed"""
+        path = os.path.abspath(path)
+        digest = self.fingerprint(data)
+        if (self.skip_unchanged and not force
+                and os.path.exists(path) and digest == self._previous_hash(path)):
+            self.stats['skipped'] += 1
+            if self.binary_snapshot:
+                self._write_binary(path, data, missing_only=True)
+            return False
+
+        text = self.serialize(data)
+        atomic_write(path, text)
+        self._hashes[path] = digest
+        self.stats['writes'] += 1
+        self.stats['bytes_written'] += len(text)
+        if self.binary_snapshot:
+            self._write_binary(path, data)
+        return True
+
+    def _write_binary(self, path: str, data: Dict, missing_only: bool = False):
+        from binary_snapshot import binary_path, write
+
+        target = binary_path(path)
+        if missing_only and os.path.exists(target):
+            return
+        try:
+            self.stats['binary_bytes'] = write(target, data)
+        except (ValueError, TypeError, struct.error):
+            # Not a device table (or non-IPv4 keys) - JSON only
+            self.stats['binary_errors'] += 1
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_writer() -> SnapshotWriter:
+    """Process-wide writer (remembers the last fingerprint per file)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SnapshotWriter(**load_export_config())
+        return _shared
+
+
+def write_snapshot(path: str, data: Dict, force: bool = False, history: bool = True) -> bool:
+    """history=False: export only, no samples in the history ring (benchmarks, test runs)"""
+    written = get_writer().write(path, data, force)
+    if not history:
+        return written
+    from history_store import get_history
+
+    store = get_history()
+    if store is not None:
+        store.append_export(data)
+    return written
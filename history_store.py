@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+History Store - fixed-size ring of per-device metric samples
+
+network_data.json only holds the last scan. Every export (all scanners go
+through export_writer.write_snapshot) appends one sample per device here:
+- Fixed capacity (`export.max_history_entries` samples), the oldest
+  samples are overwritten - file size and memory stay bounded
+- Append is O(1): one or two writes into the ring plus the header
+- Samples are in time order, a time range is found by binary search on
+  the timestamps - only the matching records are read
+
+Layout (little endian):
+    header   magic 'NMH1' | version u16 | record size u16 | capacity u64 | written u64
+    records  capacity x (time f64 | ipv4 u32 | latency_ms f32 | port_count u16 | status u8 | 5x pad)
+
+`written` counts all appends ever, the next slot is `written % capacity`.
+Unknown latency is NaN, unknown port count 0xFFFF.
+
+Usage:
+    history = get_history()              # None if export.history_enabled is false
+    history.append_export(output)
+    history.range(since=time.time() - 3600, ip='192.168.1.10')
+"""
+
+import fcntl
+import ipaddress
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from export_writer import load_export_config
+
+_MAGIC = b'NMH1'
+_VERSION = 1
+_HEADER = struct.Struct('<4sHHQQ')
+_HEADER_SIZE = 32
+_RECORD = struct.Struct('<dIfHB5x')
+_TIME = struct.Struct('<d')
+
+STATUSES = ('unknown', 'online', 'offline')
+_STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+NO_PORT_COUNT = 0xFFFF
+
+HISTORY_DEFAULTS = {
+    'history_enabled': False,
+    'history_file': 'network_history.bin',
+    'max_history_entries': 100000,
+}
+
+Sample = Tuple[float, str, Optional[float], Optional[int], str]
+
+
+def device_sample(device: Dict) -> Tuple[Optional[float], Optional[int], str]:
+    """(latency_ms, port_count, status) from any scanner's device dict"""
+    metrics = device.get('metrics') if isinstance(device.get('metrics'), dict) else {}
+    latency = metrics.get('latency_ms', metrics.get('response_time', device.get('latency_ms')))
+    ports = metrics.get('port_count')
+    if ports is None and isinstance(device.get('open_ports'), list):
+        ports = len(device['open_ports'])
+    status = metrics.get('status', device.get('status', 'online'))
+    return (float(latency) if isinstance(latency, (int, float)) else None,
+            int(ports) if isinstance(ports, int) else None,
+            status if status in _STATUS_CODES else 'unknown')
+
+
+class HistoryStore:
+    """
+    Ring file of (time, ip, latency, port count, status) samples
+    Safe for several scanner processes (flock around appends)
+    """
+
+    def __init__(self, path: str, capacity: int = 100000):
+        if capacity < 1:
+            raise ValueError("history capacity must be >= 1")
+        self.path = path
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._written, self._last_time = self._load_header()
+
+    # ---- file handling ----
+
+    def _read_header(self) -> Optional[Tuple[int, int]]:
+        raw = os.pread(self._fd, _HEADER.size, 0)
+        if len(raw) < _HEADER.size:
+            return None
+        magic, version, record_size, capacity, written = _HEADER.unpack(raw)
+        if magic != _MAGIC or version != _VERSION or record_size != _RECORD.size:
+            return None
+        return capacity, written
+
+    def _load_header(self) -> Tuple[int, float]:
+        with self._file_lock():
+            header = self._read_header()
+            if header is None:
+                self._reset([])
+                return 0, 0.0
+            capacity, written = header
+            if capacity != self.capacity:
+                # Capacity changed in the config: keep the newest samples
+                count = min(written, capacity)
+                self._reset(list(self._records(written - count, count, capacity)))
+                written = min(count, self.capacity)
+        last = self._time_at(written - 1) if written else 0.0
+        return written, last
+
+    def _reset(self, records: List[bytes]):
+        """Rewrite the ring with the given (oldest first) records"""
+        records = records[-self.capacity:]
+        os.ftruncate(self._fd, 0)
+        os.ftruncate(self._fd, _HEADER_SIZE + self.capacity * _RECORD.size)  # sparse
+        if records:
+            os.pwrite(self._fd, b''.join(records), _HEADER_SIZE)
+        self._write_header(len(records))
+
+    def _write_header(self, written: int):
+        os.pwrite(self._fd, _HEADER.pack(_MAGIC, _VERSION, _RECORD.size,
+                                         self.capacity, written), 0)
+
+    def _file_lock(self):
+        return _FileLock(self._fd)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- ring addressing ----
+
+    def _time_at(self, index: int) -> float:
+        """Timestamp of absolute sample number index"""
+        offset = _HEADER_SIZE + (index % self.capacity) * _RECORD.size
+        return _TIME.unpack(os.pread(self._fd, _TIME.size, offset))[0]
+
+    def _records(self, first: int, count: int, capacity: int) -> Iterator[bytes]:
+        """Raw records first..first+count (absolute numbers), at most two reads"""
+        while count > 0:
+            slot = first % capacity
+            chunk = min(count, capacity - slot)
+            data = os.pread(self._fd, chunk * _RECORD.size, _HEADER_SIZE + slot * _RECORD.size)
+            for i in range(0, len(data), _RECORD.size):
+                yield data[i:i + _RECORD.size]
+            first += chunk
+            count -= chunk
+
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+
+    # ---- append ----
+
+    def append(self, samples: Iterable[Sample]) -> int:
+        """Append samples (time, ip, latency_ms, port_count, status), returns count"""
+        records = []
+        for stamp, ip, latency, ports, status in samples:
+            try:
+                address = int(ipaddress.IPv4Address(ip))
+            except ValueError:
+                continue  # IPv6 / hostnames: no slot in the record
+            records.append((stamp, address,
+                            math.nan if latency is None else latency,
+                            NO_PORT_COUNT if ports is None else min(ports, NO_PORT_COUNT - 1),
+                            _STATUS_CODES.get(status, 0)))
+        if not records:
+            return 0
+
+        with self._lock, self._file_lock():
+            header = self._read_header()
+            if header:
+                self._written = header[1]   # other scanner processes may have appended
+                if self._written:
+                    self._last_time = max(self._last_time, self._time_at(self._written - 1))
+            # Timestamps never go backwards (clock steps) - range() relies on order
+            stamp_floor = self._last_time
+            packed = []
+            for stamp, address, latency, ports, status in records[-self.capacity:]:
+                stamp_floor = max(stamp_floor, stamp)
+                packed.append(_RECORD.pack(stamp_floor, address, latency, ports, status))
+
+            start, remaining = self._written, len(packed)
+            while remaining:
+                slot = start % self.capacity
+                chunk = min(remaining, self.capacity - slot)
+                offset = len(packed) - remaining
+                os.pwrite(self._fd, b''.join(packed[offset:offset + chunk]),
+                          _HEADER_SIZE + slot * _RECORD.size)
+                start += chunk
+                remaining -= chunk
+            # Records first, header last: a crash loses at most this batch
+            self._written += len(packed)
+            self._last_time = stamp_floor
+            self._write_header(self._written)
+        return len(packed)
+
+    def append_export(self, output: Dict, stamp: Optional[float] = None) -> int:
+        """One sample per device of an export dict (network_data.json format)"""
+        stamp = time.time() if stamp is None else stamp
+        devices = output.get('devices')
+        if not isinstance(devices, dict):
+            return 0
+        return self.append((stamp, ip, *device_sample(device))
+                           for ip, device in devices.items() if isinstance(device, dict))
+
+    # ---- read ----
+
+    def _bisect(self, stamp: float, lo: int, hi: int) -> int:
+        """First absolute sample number in [lo, hi) with time >= stamp"""
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._time_at(mid) < stamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def range(self, since: Optional[float] = None, until: Optional[float] = None,
+              ip: Optional[str] = None) -> List[Dict]:
+        """Samples with since <= time < until (optionally one IP), oldest first"""
+        with self._lock:
+            header = self._read_header()
+            if header:
+                self._written = header[1]
+            written = self._written
+            oldest = written - len(self)
+            first = oldest if since is None else self._bisect(since, oldest, written)
+            last = written if until is None else self._bisect(until, first, written)
+            address = int(ipaddress.IPv4Address(ip)) if ip else None
+
+            samples = []
+            for raw in self._records(first, last - first, self.capacity):
+                stamp, addr, latency, ports, status = _RECORD.unpack(raw)
+                if address is not None and addr != address:
+                    continue
+                samples.append({
+                    'time': stamp,
+                    'ip': str(ipaddress.IPv4Address(addr)),
+                    'latency_ms': None if math.isnan(latency) else round(latency, 3),
+                    'port_count': None if ports == NO_PORT_COUNT else ports,
+                    'status': STATUSES[status] if status < len(STATUSES) else 'unknown',
+                })
+            return samples
+
+
+class _FileLock:
+    """flock on an open fd (exclusive, blocking)"""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def __enter__(self):
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_history() -> Optional[HistoryStore]:
+    """Process-wide store from monitor_config.json, None when disabled"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            config = load_export_config(defaults=HISTORY_DEFAULTS)
+            if not config['history_enabled']:
+                _shared = False
+            else:
+                try:
+                    _shared = HistoryStore(config['history_file'], int(config['max_history_entries']))
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  History disabled ({config['history_file']}: {e})")
+                    _shared = False
+        return None if _shared is False else _shared
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Read the device history ring')
+    parser.add_argument('ip', nargs='?', help='Only this device')
+    parser.add_argument('--minutes', type=float, default=60, help='Time range (default: 60)')
+    parser.add_argument('--file', default=load_export_config(defaults=HISTORY_DEFAULTS)['history_file'])
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"❌ {args.file}: no history yet (export.history_enabled)")
+        sys.exit(1)
+    with HistoryStore(args.file, _capacity_of(args.file)) as history:
+        samples = history.range(since=time.time() - args.minutes * 60, ip=args.ip)
+        print(f"\n🕒 {args.file}: {len(history)}/{history.capacity} samples, "
+              f"{len(samples)} in the last {args.minutes:g} min")
+        for sample in samples[-50:]:
+            latency = '-' if sample['latency_ms'] is None else f"{sample['latency_ms']:.1f} ms"
+            ports = '-' if sample['port_count'] is None else sample['port_count']
+            print(f"  {time.strftime('%H:%M:%S', time.localtime(sample['time']))} | "
+                  f"{sample['ip']:15} | {sample['status']:7} | {latency:>9} | ports {ports}")
+
+
+def _capacity_of(path: str) -> int:
+    """Capacity from the file header - the CLI must not resize the ring"""
+    with open(path, 'rb') as f:
+        raw = f.read(_HEADER.size)
+    if len(raw) == _HEADER.size and raw[:4] == _MAGIC:
+        return _HEADER.unpack(raw)[3]
+    return HISTORY_DEFAULTS['max_history_entries']
+
+
+if __name__ == "__main__":
+    main()
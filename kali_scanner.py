@@ -16,6 +16,11 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import sys
 
+from oui_db import get_oui_db
+from export_writer import write_snapshot
+from dns_resolver import get_resolver
+from network_ranges import interface_network
+
 class KaliScanner:
     """
     Zero-Config Scanner mit Kali Linux Tools
@@ -96,25 +101,10 @@ class KaliScanner:
     def _detect_network(self, interface: str) -> str:
         """Auto-detect network range"""
         try:
-            result = subprocess.run(
-                ['ip', 'addr', 'show', interface],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            
-            # Parse CIDR
-            match = re.search(r'inet (\d+\.\d+\.\d+\.\d+)/(\d+)', result.stdout)
-            if match:
-                ip = match.group(1)
-                cidr = match.group(2)
-                
-                # Convert to network address
-                parts = ip.split('.')
-                if cidr == '24':
-                    return f"{parts[0]}.{parts[1]}.{parts[2]}.0/24"
-                elif cidr == '16':
-                    return f"{parts[0]}.{parts[1]}.0.0/16"
+            # Netzwerk mit echtem Präfix (/20, /21, /23, ... - nicht nur /24 und /16)
+            network = interface_network(interface)
+            if network:
+                return network
         
         except Exception as e:
             print(f"⚠️  Network detection failed: {e}")
@@ -247,7 +237,7 @@ class KaliScanner:
         return devices
     
     def _fping_scan(self) -> Dict:
-        """fping fallback (kein MAC/Vendor)"""
+        """fping fallback - MAC aus Kernel-ARP-Tabelle, Vendor aus OUI-Index"""
         devices = {}
         
         try:
@@ -259,21 +249,44 @@ class KaliScanner:
                 timeout=60
             )
             
+            # fping hat die ARP-Tabelle gefüllt
+            neighbors = self._neighbor_macs()
+            oui_db = get_oui_db()
+            
             for ip in result.stdout.split('\n'):
                 ip = ip.strip()
                 if ip:
+                    mac = neighbors.get(ip, '')
+                    vendor = (oui_db.lookup(mac) or 'Unknown') if mac else 'Unknown'
                     devices[ip] = {
                         'ip': ip,
+                        'mac': mac,
+                        'vendor': vendor,
                         'hostname': self._resolve_hostname(ip),
                         'method': 'fping'
                     }
-                    print(f"  {ip:15}")
+                    print(f"  {ip:15} | {mac or '-':17} | {vendor}")
         
         except Exception as e:
             print(f"  ⚠️  fping failed: {e}")
         
         return devices
     
+    def _neighbor_macs(self) -> Dict[str, str]:
+        """IP -> MAC aus /proc/net/arp (nur vollständige Einträge)"""
+        macs = {}
+        try:
+            with open('/proc/net/arp') as f:
+                next(f)  # Header
+                for line in f:
+                    parts = line.split()
+                    # IP | HW type | Flags | MAC | Mask | Device
+                    if len(parts) >= 4 and parts[2] != '0x0' and parts[3] != '00:00:00:00:00:00':
+                        macs[parts[0]] = parts[3].lower()
+        except (OSError, StopIteration):
+            pass
+        return macs
+    
     def masscan_ports(self, devices: Dict) -> Dict:
         """
         Phase 2: Fast Port Scan mit masscan
@@ -475,11 +488,8 @@ class KaliScanner:
         return 'unknown'
     
     def _resolve_hostname(self, ip: str) -> str:
-        """DNS hostname resolution"""
-        try:
-            return socket.gethostbyaddr(ip)[0]
-        except:
-            return f"device-{ip.split('.')[-1]}"
+        """PTR hostname resolution (shared cached resolver)"""
+        return get_resolver().resolve(ip) or f"device-{ip.split('.')[-1]}"
     
     def _get_icon(self, device_type: str) -> str:
         """Device icon"""
@@ -557,10 +567,10 @@ class KaliScanner:
                 'discovery_method': device.get('method', 'kali_tools')
             }
         
-        with open(filename, 'w') as f:
-            json.dump(output, f, indent=2)
-        
-        print(f"\n💾 Results exported: {filename}")
+        if write_snapshot(filename, output):
+            print(f"\n💾 Results exported: {filename}")
+        else:
+            print(f"\n💾 Results unchanged: {filename}")
         return filename
     
     def _generate_summary(self) -> Dict:
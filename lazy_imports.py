@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Lazy Imports - heavy optional dependencies load on first use
+
+Scapy and pysnmp each cost hundreds of milliseconds at import time.
+Scanners only check availability at startup (find_spec, no import)
+and load the module in the phase that actually needs it.
+Load times are recorded for `--startup-profile`.
+"""
+
+import importlib
+import importlib.util
+import threading
+import time
+from typing import Dict
+
+IMPORT_TIMES: Dict[str, float] = {}   # module -> load time in ms
+
+_lock = threading.Lock()
+
+
+def is_available(name: str) -> bool:
+    """Check if a module is installed - WITHOUT importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def load(name: str):
+    """Import on first use (thread-safe), record load time"""
+    with _lock:
+        if name in IMPORT_TIMES:
+            return importlib.import_module(name)
+
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMES[name] = round((time.perf_counter() - start) * 1000, 1)
+        return module
+
+
+def load_scapy():
+    """scapy.all with output suppressed"""
+    scapy = load('scapy.all')
+    scapy.conf.verb = 0
+    return scapy
+
+
+def load_hlapi():
+    """pysnmp high-level API"""
+    return load('pysnmp.hlapi')
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Network Ranges - detection, parsing and sharding of scan targets
+
+- Local network with its REAL prefix (/20, /21, ...) instead of a forced /24
+- Several CIDRs at once: "10.10.0.0/21, 10.20.0.0/24 10.30.0.0/20"
+- Large ranges split into shards (default /24) for parallel scanning
+- Routed ranges (no local interface) are marked, ARP cannot reach them
+"""
+
+import ipaddress
+import re
+import socket
+import subprocess
+from typing import Iterable, List, Optional, Union
+
+DEFAULT_NETWORK = '192.168.1.0/24'
+
+
+def local_ip() -> Optional[str]:
+    """Source IP of the default route (no packet is sent)"""
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.settimeout(1)
+        s.connect(("8.8.8.8", 80))
+        ip = s.getsockname()[0]
+        s.close()
+        return ip
+    except OSError:
+        return None
+
+
+def local_networks(interface: Optional[str] = None) -> List[ipaddress.IPv4Interface]:
+    """IPv4 addresses with prefix of all (or one) interfaces, loopback excluded"""
+    cmd = ['ip', '-o', '-4', 'addr', 'show']
+    if interface:
+        cmd += ['dev', interface]
+    try:
+        output = subprocess.run(cmd, capture_output=True, text=True, timeout=2).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return []
+
+    found = []
+    for match in re.finditer(r'inet (\d+\.\d+\.\d+\.\d+/\d+)', output):
+        iface = ipaddress.ip_interface(match.group(1))
+        if not iface.is_loopback:
+            found.append(iface)
+    return found
+
+
+def interface_network(interface: Optional[str] = None) -> Optional[str]:
+    """Network of an interface (first IPv4 address) with its real prefix"""
+    nets = local_networks(interface)
+    return str(nets[0].network) if nets else None
+
+
+def local_network(default: str = DEFAULT_NETWORK) -> str:
+    """Network of the default-route address with its real prefix"""
+    ip = local_ip()
+    if not ip:
+        return default
+
+    for iface in local_networks():
+        if str(iface.ip) == ip:
+            return str(iface.network)
+
+    # No `ip` tool: assume /24 around the local address
+    return str(ipaddress.ip_network(f"{ip}/24", strict=False))
+
+
+def parse_ranges(spec: Union[str, Iterable[str]]) -> List[ipaddress.IPv4Network]:
+    """'a/21, b/24 c' or a list -> networks (host bits cleared, overlaps merged)"""
+    if isinstance(spec, str):
+        spec = re.split(r'[,\s]+', spec)
+
+    networks = [ipaddress.ip_network(part.strip(), strict=False)
+                for part in spec if part and part.strip()]
+    return list(ipaddress.collapse_addresses(networks))
+
+
+def shard_ranges(networks: Iterable[ipaddress.IPv4Network],
+                 shard_prefix: int = 24) -> List[ipaddress.IPv4Network]:
+    """Split every network larger than /shard_prefix into /shard_prefix blocks"""
+    shards = []
+    for network in networks:
+        if network.prefixlen >= shard_prefix:
+            shards.append(network)
+        else:
+            shards.extend(network.subnets(new_prefix=shard_prefix))
+    return shards
+
+
+def is_local(network: ipaddress.IPv4Network,
+             interfaces: Optional[List[ipaddress.IPv4Interface]] = None) -> bool:
+    """True if an interface is attached to (part of) this network -> ARP works"""
+    interfaces = local_networks() if interfaces is None else interfaces
+    return any(network.overlaps(iface.network) for iface in interfaces)
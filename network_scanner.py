@@ -5,7 +5,6 @@ Automatische Erkennung und Klassifizierung von Netzwerkgeräten
 """
 
 import subprocess
-import json
 import re
 import time
 from datetime import datetime
@@ -13,6 +12,8 @@ from typing import Dict, List, Optional
 import socket
 import struct
 
+from export_writer import write_snapshot
+
 class NetworkScanner:
     def __init__(self, network_range: str = "192.168.1.0/24"):
         self.network_range = network_range
@@ -199,8 +200,7 @@ class NetworkScanner:
             'summary': self._generate_summary()
         }
         
-        with open(filename, 'w') as f:
-            json.dump(output, f, indent=2)
+        write_snapshot(filename, output)
         
         return filename
 
@@ -5,13 +5,16 @@ Network Scanner V3 - NO DEMO DATA
 """
 
 import subprocess
-import json
-import socket
 import time
 from datetime import datetime
 from typing import Dict, List, Optional
 import ipaddress
 
+from pinger import get_pinger
+from export_writer import write_snapshot
+from dns_resolver import get_resolver
+from network_ranges import local_network
+
 class NetworkScanner:
     """
     Network Scanner - NUR echte Discovery
@@ -25,13 +28,8 @@ class NetworkScanner:
     def _detect_network_range(self) -> str:
         """Auto-detect local network range"""
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-            
-            parts = local_ip.split('.')
-            network = f"{parts[0]}.{parts[1]}.{parts[2]}.0/24"
+            # Real prefix of the local interface (not always /24)
+            network = local_network()
             print(f"🔍 Auto-detected network: {network}")
             return network
         except:
@@ -103,14 +101,18 @@ class NetworkScanner:
         
         try:
             network = ipaddress.ip_network(self.network_range)
+            hosts = [str(ip) for ip in network.hosts()]
             count = 0
             
-            print("⏳ Running ping sweep (may take 1-2 min)...")
+            print(f"⏳ Running ping sweep ({len(hosts)} IPs, one ICMP batch)...")
             
-            for ip in network.hosts():
-                ip_str = str(ip)
-                
-                if self._is_alive(ip_str):
+            results = get_pinger().ping_many(hosts, timeout=1.0)
+            
+            # PTR lookups for all live hosts at once (fills the cache)
+            get_resolver().resolve_many(ip for ip in hosts if results[ip]['alive'])
+            
+            for ip_str in hosts:
+                if results[ip_str]['alive']:
                     devices[ip_str] = {
                         'hostname': self._resolve_hostname(ip_str),
                         'discovery_method': 'ping'
@@ -127,22 +129,13 @@ class NetworkScanner:
     def _is_alive(self, ip: str, timeout: int = 1) -> bool:
         """Check if host responds to ping"""
         try:
-            result = subprocess.run(
-                ['ping', '-c', '1', '-W', str(timeout), ip],
-                capture_output=True,
-                timeout=timeout + 1
-            )
-            return result.returncode == 0
+            return get_pinger().is_alive(ip, timeout=timeout)
         except:
             return False
     
     def _resolve_hostname(self, ip: str) -> str:
-        """Resolve hostname via DNS"""
-        try:
-            hostname = socket.gethostbyaddr(ip)[0]
-            return hostname
-        except:
-            return f"device-{ip.split('.')[-1]}"
+        """Resolve hostname via PTR (shared cached resolver)"""
+        return get_resolver().resolve(ip) or f"device-{ip.split('.')[-1]}"
     
     def _is_valid_ip(self, ip: str) -> bool:
         """Validate IP address"""
@@ -194,19 +187,9 @@ class NetworkScanner:
         
         # Measure real ping time
         try:
-            result = subprocess.run(
-                ['ping', '-c', '1', ip],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            
-            if result.returncode == 0:
-                # Extract ping time
-                import re
-                match = re.search(r'time=([\d.]+)', result.stdout)
-                if match:
-                    metrics['response_time'] = float(match.group(1))
+            rtt = get_pinger().ping(ip, timeout=2.0)
+            if rtt is not None:
+                metrics['response_time'] = rtt
         except:
             pass
         
@@ -269,10 +252,10 @@ class NetworkScanner:
             'has_demo_data': False  # IMPORTANT FLAG
         }
         
-        with open(filename, 'w') as f:
-            json.dump(output, f, indent=2)
-        
-        print(f"\n💾 Exported to: {filename}")
+        if write_snapshot(filename, output):
+            print(f"\n💾 Exported to: {filename}")
+        else:
+            print(f"\n💾 Unchanged: {filename}")
         return filename
     
     def _generate_summary(self) -> Dict:
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+OUI Database - full IEEE vendor registry, memory-mapped
+
+Vendor lookup for every MAC, not just ~70 hardcoded prefixes:
+- Sources: IEEE registry CSVs (MA-L oui.csv, MA-M mam.csv, MA-S oui36.csv),
+  arp-scan's ieee-oui.txt or Wireshark's manuf - whatever is installed
+- Compiled ONCE into a sorted binary index (oui_data/oui.idx)
+- The index is mmap'ed and searched by binary search: near-instant load,
+  pages are shared between processes instead of a dict per scanner
+- Longest prefix wins (MA-S /36 before MA-M /28 before MA-L /24)
+
+Index layout (big endian):
+    header   magic 'OUI1' | count u32 | source signature 8s | names offset u32
+    records  count x (key u64 = prefix48 << 8 | prefix bits, name offset u32)
+    names    NUL-terminated UTF-8, deduplicated
+
+Get the registry:  python3 oui_db.py fetch   (or apt install ieee-data)
+"""
+
+import csv
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+from typing import Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get('NETMON_OUI_DIR', os.path.join(HERE, 'oui_data'))
+INDEX_FILE = os.path.join(DATA_DIR, 'oui.idx')
+
+# IEEE registry CSVs (MA-L, MA-M, MA-S)
+REGISTRY_FILES = ['oui.csv', 'mam.csv', 'oui36.csv']
+REGISTRY_URL = 'https://standards-oui.ieee.org/{}'
+REGISTRY_DIRS = [DATA_DIR, '/usr/share/ieee-data', '/var/lib/ieee-data']
+
+# Distribution copies (Kali ships both)
+EXTRA_SOURCES = [
+    '/usr/share/arp-scan/ieee-oui.txt',
+    '/usr/share/wireshark/manuf',
+]
+
+_MAGIC = b'OUI1'
+_HEADER = struct.Struct('>4sI8sI')
+_RECORD = struct.Struct('>QI')
+_PREFIX_BITS = (36, 28, 24)
+
+# manuf: '00:1B:C5:00:00:00/36<TAB>Short<TAB>Long name'
+_MANUF_LINE = re.compile(r'^([0-9A-Fa-f]{2}(?:[:\-.][0-9A-Fa-f]{2}){2,5})(?:/(\d+))?\s+(.+)$')
+# ieee-oui.txt: '001BC5000<TAB>Vendor'
+_HEX_LINE = re.compile(r'^([0-9A-Fa-f]{6,9})\s+(.+)$')
+
+
+def _mac_to_int(mac: str) -> Tuple[int, int]:
+    """'aa:bb:cc:dd:ee:ff' (any separator) -> (48-bit value, known bits)"""
+    digits = ''.join(c for c in mac if c in '0123456789abcdefABCDEF')[:12]
+    if len(digits) < 6:
+        return 0, 0
+    return int(digits.ljust(12, '0'), 16), len(digits) * 4
+
+
+def _key(prefix48: int, bits: int) -> int:
+    prefix48 &= ((1 << bits) - 1) << (48 - bits)
+    return (prefix48 << 8) | bits
+
+
+def _parse_registry_csv(path: str) -> List[Tuple[int, int, str]]:
+    """IEEE CSV: Registry,Assignment,Organization Name,Organization Address"""
+    entries = []
+    with open(path, newline='', encoding='utf-8', errors='replace') as f:
+        for row in csv.reader(f):
+            if len(row) < 3 or row[0] == 'Registry':
+                continue
+            assignment, name = row[1].strip(), row[2].strip()
+            if not name or not re.fullmatch(r'[0-9A-Fa-f]{6,9}', assignment):
+                continue
+            value, bits = _mac_to_int(assignment)
+            entries.append((value, bits, name))
+    return entries
+
+
+def _parse_text(path: str) -> List[Tuple[int, int, str]]:
+    """Wireshark manuf / arp-scan ieee-oui.txt / IEEE oui.txt '(hex)' lines"""
+    entries = []
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            match = _MANUF_LINE.match(line)
+            if match:
+                value, bits = _mac_to_int(match.group(1))
+                if match.group(2):
+                    bits = int(match.group(2))
+                elif bits == 48:
+                    continue  # single address, not a block
+                names = [n.strip() for n in match.group(3).replace('(hex)', '').split('\t') if n.strip()]
+                if names and bits in _PREFIX_BITS:
+                    entries.append((value, bits, names[-1]))
+                continue
+
+            match = _HEX_LINE.match(line)
+            if match and '(base 16)' not in line:
+                value, bits = _mac_to_int(match.group(1))
+                if bits in _PREFIX_BITS:
+                    entries.append((value, bits, match.group(2).strip()))
+    return entries
+
+
+def find_sources() -> List[str]:
+    """Installed registry files, best first"""
+    sources = []
+    for directory in REGISTRY_DIRS:
+        found = [os.path.join(directory, name) for name in REGISTRY_FILES
+                 if os.path.isfile(os.path.join(directory, name))]
+        if found:
+            sources.extend(found)
+            break
+    sources.extend(p for p in EXTRA_SOURCES if os.path.isfile(p))
+    return sources
+
+
+def _signature(sources: List[str]) -> bytes:
+    """Cheap change detection: path, size, mtime of every source"""
+    h = hashlib.sha1()
+    for path in sources:
+        st = os.stat(path)
+        h.update(f"{path}|{st.st_size}|{int(st.st_mtime)}\n".encode())
+    return h.digest()[:8]
+
+
+def build_index(sources: List[str], index_path: str = INDEX_FILE) -> int:
+    """Compile sources into the binary index (atomic replace). Returns record count."""
+    records: Dict[int, str] = {}
+    for path in sources:
+        parse = _parse_registry_csv if path.endswith('.csv') else _parse_text
+        for value, bits, name in parse(path):
+            records.setdefault(_key(value, bits), name)  # first source wins
+
+    names = bytearray()
+    name_offsets: Dict[str, int] = {}
+    body = bytearray()
+    for key in sorted(records):
+        name = records[key]
+        if name not in name_offsets:
+            name_offsets[name] = len(names)
+            names += name.encode('utf-8') + b'\0'
+        body += _RECORD.pack(key, name_offsets[name])
+
+    names_offset = _HEADER.size + len(body)
+    header = _HEADER.pack(_MAGIC, len(records), _signature(sources), names_offset)
+
+    os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+    tmp = f"{index_path}.tmp{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(body)
+        f.write(names)
+    os.replace(tmp, index_path)
+    return len(records)
+
+
+class OuiDatabase:
+    """
+    Memory-mapped vendor index
+    Usage: OuiDatabase().lookup('dc:a6:32:01:02:03') -> 'Raspberry Pi Trading Ltd'
+    """
+
+    def __init__(self, index_path: str = INDEX_FILE, sources: Optional[List[str]] = None):
+        self.index_path = index_path
+        self.sources = find_sources() if sources is None else sources
+        self.count = 0
+        self._mm = None
+        self._open()
+
+    def _open(self):
+        """Map the index - (re)build it first when the sources changed"""
+        try:
+            if self.sources and self._stale():
+                count = build_index(self.sources, self.index_path)
+                print(f"📚 OUI index built: {count} vendor blocks -> {self.index_path}")
+
+            with open(self.index_path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, count, _, names_offset = _HEADER.unpack_from(mm, 0)
+            if magic != _MAGIC:
+                mm.close()
+                return
+            self._mm, self.count, self._names = mm, count, names_offset
+        except (OSError, ValueError, struct.error):
+            self._mm, self.count = None, 0
+
+    def _stale(self) -> bool:
+        try:
+            with open(self.index_path, 'rb') as f:
+                magic, _, signature, _ = _HEADER.unpack(f.read(_HEADER.size))
+            return magic != _MAGIC or signature != _signature(self.sources)
+        except (OSError, struct.error):
+            return True
+
+    def _find(self, key: int) -> Optional[int]:
+        """Binary search over the fixed-size records -> name offset"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key, name_off = _RECORD.unpack_from(self._mm, _HEADER.size + mid * _RECORD.size)
+            if mid_key == key:
+                return name_off
+            if mid_key < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def lookup(self, mac: str) -> Optional[str]:
+        """Vendor for a MAC (longest registered prefix) or None"""
+        if not self._mm or not mac:
+            return None
+        value, known_bits = _mac_to_int(mac)
+        for bits in _PREFIX_BITS:
+            if bits > known_bits:
+                continue
+            name_off = self._find(_key(value, bits))
+            if name_off is not None:
+                start = self._names + name_off
+                return self._mm[start:self._mm.find(b'\0', start)].decode('utf-8', 'replace')
+        return None
+
+    def __len__(self) -> int:
+        return self.count
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_oui_db() -> OuiDatabase:
+    """Process-wide index (mapped once, shared by all scanners)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = OuiDatabase()
+        return _shared
+
+
+def lookup_vendor(mac: str) -> Optional[str]:
+    return get_oui_db().lookup(mac)
+
+
+def fetch(directory: str = DATA_DIR):
+    """Download the IEEE registry CSVs into oui_data/"""
+    import urllib.request
+
+    os.makedirs(directory, exist_ok=True)
+    for name in REGISTRY_FILES:
+        target = os.path.join(directory, name)
+        print(f"⬇️  {REGISTRY_URL.format(name)}")
+        request = urllib.request.Request(REGISTRY_URL.format(name),
+                                         headers={'User-Agent': 'netMon'})
+        with urllib.request.urlopen(request, timeout=60) as response, \
+                open(target + '.tmp', 'wb') as f:
+            f.write(response.read())
+        os.replace(target + '.tmp', target)
+
+
+def main():
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else 'info'
+
+    if cmd == 'fetch':
+        fetch()
+        cmd = 'build'
+
+    if cmd == 'build':
+        sources = find_sources()
+        if not sources:
+            print("❌ No OUI sources found")
+            print("   python3 oui_db.py fetch   or   apt install ieee-data")
+            sys.exit(1)
+        count = build_index(sources)
+        print(f"✅ {count} vendor blocks from {len(sources)} source(s) -> {INDEX_FILE}")
+    elif cmd == 'lookup':
+        db = get_oui_db()
+        for mac in sys.argv[2:]:
+            print(f"  {mac:17} | {db.lookup(mac) or 'Unknown'}")
+    else:
+        db = get_oui_db()
+        print(f"Index:   {INDEX_FILE} ({len(db)} vendor blocks)")
+        print(f"Sources: {', '.join(db.sources) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Batched ICMP Echo Pinger - shared by all scanners
+
+One ICMP socket for ALL targets instead of one `ping` process per host:
+- Raw ICMP socket (root / CAP_NET_RAW)
+- Fallback: unprivileged datagram ICMP socket (net.ipv4.ping_group_range)
+- Last resort: system `ping` subprocesses (old behaviour)
+
+Echo requests go out to hundreds of hosts at once, replies are matched
+by id/seq and returned as RTT, loss and up/down per target.
+"""
+
+import os
+import re
+import select
+import socket
+import struct
+import subprocess
+import threading
+import time
+import concurrent.futures
+from typing import Dict, Iterable, Optional
+
+from rate_governor import get_governor
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+_id_lock = threading.Lock()
+_id_counter = 0
+
+
+def _next_ident() -> int:
+    """Unique echo id per batch - raw sockets see ALL ICMP replies"""
+    global _id_counter
+    with _id_lock:
+        _id_counter += 1
+        return (os.getpid() + _id_counter) & 0xFFFF
+
+
+def _wait(sock: socket.socket, event: int, timeout: float) -> bool:
+    """poll() instead of select(): no FD_SETSIZE limit (fds > 1024 in busy processes)"""
+    poller = select.poll()
+    poller.register(sock, event)
+    return bool(poller.poll(max(0.0, timeout) * 1000))
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _build_echo(ident: int, seq: int, payload_size: int = 56) -> bytes:
+    payload = struct.pack('!d', time.perf_counter()).ljust(payload_size, b'Q')
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    csum = _checksum(header + payload)
+    return struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, csum, ident, seq) + payload
+
+
+class IcmpPinger:
+    """
+    Batched pinger
+    Usage: IcmpPinger().ping_many(['192.168.1.1', ...])
+    """
+
+    def __init__(self, timeout: float = 1.0):
+        self.timeout = timeout
+        self.mode = self._detect_mode()
+
+    @staticmethod
+    def _detect_mode() -> str:
+        """raw -> dgram -> subprocess"""
+        for mode, kind in (('raw', socket.SOCK_RAW), ('dgram', socket.SOCK_DGRAM)):
+            try:
+                s = socket.socket(socket.AF_INET, kind, socket.IPPROTO_ICMP)
+                s.close()
+                return mode
+            except (PermissionError, OSError):
+                continue
+        return 'subprocess'
+
+    def _open_socket(self) -> socket.socket:
+        kind = socket.SOCK_RAW if self.mode == 'raw' else socket.SOCK_DGRAM
+        sock = socket.socket(socket.AF_INET, kind, socket.IPPROTO_ICMP)
+        sock.setblocking(False)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        except OSError:
+            pass
+        return sock
+
+    def ping(self, ip: str, timeout: Optional[float] = None) -> Optional[float]:
+        """Single host - RTT in ms or None"""
+        return self.ping_many([ip], timeout=timeout)[ip]['rtt_ms']
+
+    def is_alive(self, ip: str, timeout: Optional[float] = None) -> bool:
+        return self.ping_many([ip], timeout=timeout)[ip]['alive']
+
+    def ping_many(self, ips: Iterable[str], count: int = 1,
+                  timeout: Optional[float] = None,
+                  interval: float = 0.2) -> Dict[str, Dict]:
+        """
+        Ping all targets at once
+
+        Returns:
+            {ip: {'alive', 'rtt_ms' (avg), 'min_ms', 'max_ms',
+                  'sent', 'received', 'loss'}}
+        """
+        targets = list(dict.fromkeys(ips))
+        timeout = self.timeout if timeout is None else timeout
+        if not targets:
+            return {}
+
+        if self.mode == 'subprocess':
+            rtts = self._ping_subprocess(targets, count, timeout)
+        else:
+            try:
+                rtts = self._ping_socket(targets, count, timeout, interval)
+            except OSError:
+                rtts = self._ping_subprocess(targets, count, timeout)
+
+        return {ip: self._summarize(rtts[ip], count) for ip in targets}
+
+    @staticmethod
+    def _summarize(samples, count: int) -> Dict:
+        received = len(samples)
+        return {
+            'alive': received > 0,
+            'rtt_ms': round(sum(samples) / received, 3) if received else None,
+            'min_ms': round(min(samples), 3) if received else None,
+            'max_ms': round(max(samples), 3) if received else None,
+            'sent': count,
+            'received': received,
+            'loss': round(1 - received / count, 3) if count else 0.0,
+        }
+
+    def _ping_socket(self, targets, count: int, timeout: float,
+                     interval: float) -> Dict[str, list]:
+        """Send/receive loop on ONE socket"""
+        sock = self._open_socket()
+        ident = _next_ident()
+        raw = self.mode == 'raw'
+
+        governor = get_governor()
+        rtts = {ip: [] for ip in targets}
+        pending = {}        # seq -> (ip, send_time)
+        seq = 0
+        next_round = 0
+        next_target = len(targets)  # index into targets while a round is being sent
+        round_at = time.perf_counter()
+        deadline = None
+
+        try:
+            while True:
+                now = time.perf_counter()
+
+                # Send the next round to all targets
+                if next_target >= len(targets) and next_round < count and now >= round_at:
+                    next_target = 0
+
+                # Rate budget: never sleep here - replies are timestamped on receive
+                throttled = 0.0
+                while next_target < len(targets):
+                    throttled = governor.try_acquire(1, 'icmp')
+                    if throttled:
+                        break
+                    ip = targets[next_target]
+                    next_target += 1
+                    seq = (seq + 1) & 0xFFFF
+                    if self._send_echo(sock, _build_echo(ident, seq), ip):
+                        pending[seq] = (ip, time.perf_counter())
+                    if next_target == len(targets):
+                        next_round += 1
+                        round_at = time.perf_counter() + interval
+                        deadline = time.perf_counter() + timeout
+                sending = next_target < len(targets)
+
+                if not sending and next_round >= count and (not pending or now >= deadline):
+                    break
+
+                if sending:
+                    wait = throttled
+                elif next_round >= count:
+                    wait = deadline - now
+                else:
+                    wait = min(round_at - now, deadline - now)
+                if not _wait(sock, select.POLLIN, wait):
+                    continue
+
+                # Drain everything that arrived
+                while True:
+                    try:
+                        data, addr = sock.recvfrom(2048)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    recv_time = time.perf_counter()
+
+                    if raw:
+                        ihl = (data[0] & 0x0F) * 4
+                        data = data[ihl:]
+                    if len(data) < 8:
+                        continue
+
+                    icmp_type, _, _, r_ident, r_seq = struct.unpack('!BBHHH', data[:8])
+                    if icmp_type != ICMP_ECHO_REPLY:
+                        continue
+                    # Datagram sockets get a kernel-assigned id
+                    if raw and r_ident != ident:
+                        continue
+
+                    entry = pending.get(r_seq)
+                    if entry and entry[0] == addr[0]:
+                        del pending[r_seq]
+                        rtts[entry[0]].append((recv_time - entry[1]) * 1000)
+        finally:
+            sock.close()
+
+        return rtts
+
+    @staticmethod
+    def _send_echo(sock: socket.socket, packet: bytes, ip: str) -> bool:
+        try:
+            sock.sendto(packet, (ip, 0))
+        except BlockingIOError:
+            _wait(sock, select.POLLOUT, 0.05)
+            try:
+                sock.sendto(packet, (ip, 0))
+            except OSError:
+                return False
+        except OSError:
+            return False
+        return True
+
+    def _ping_subprocess(self, targets, count: int, timeout: float) -> Dict[str, list]:
+        """Fallback: system ping, still parallel"""
+        wait = max(1, int(round(timeout)))
+
+        def _one(ip):
+            get_governor().acquire(count, 'icmp')
+            try:
+                result = subprocess.run(
+                    ['ping', '-c', str(count), '-W', str(wait), ip],
+                    capture_output=True,
+                    text=True,
+                    timeout=count * (wait + 1) + 1
+                )
+                return [float(m) for m in re.findall(r'time=([\d.]+)', result.stdout)]
+            except Exception:
+                return []
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, len(targets))) as ex:
+            return dict(zip(targets, ex.map(_one, targets)))
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_pinger() -> IcmpPinger:
+    """Process-wide pinger (mode detection runs once)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = IcmpPinger()
+        return _shared
+
+
+def ping_many(ips: Iterable[str], count: int = 1,
+              timeout: float = 1.0) -> Dict[str, Dict]:
+    return get_pinger().ping_many(ips, count=count, timeout=timeout)
+
+
+def main():
+    import sys
+    import ipaddress
+
+    if len(sys.argv) < 2:
+        print("Usage: python3 pinger.py <ip|cidr> [count]")
+        sys.exit(1)
+
+    net = ipaddress.ip_network(sys.argv[1], strict=False)
+    targets = [str(h) for h in net.hosts()] or [str(net.network_address)]
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    pinger = get_pinger()
+    start = time.perf_counter()
+    results = pinger.ping_many(targets, count=count)
+    elapsed = time.perf_counter() - start
+
+    alive = {ip: r for ip, r in results.items() if r['alive']}
+    for ip, r in alive.items():
+        print(f"  {ip:15} | {r['rtt_ms']:7.2f} ms | loss {r['loss']*100:.0f}%")
+    print(f"✅ {len(alive)}/{len(targets)} up in {elapsed:.2f}s (mode: {pinger.mode})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Port Cache - open ports per MAC address, persisted between scans
+
+A host's open ports rarely change, probing all of them every scan is
+mostly wasted packets:
+- Fresh entry, same IP        -> revalidate a small sample of ports only;
+                                 sample agrees = cached result is reused
+- Sample disagrees            -> full rescan (entry replaced)
+- TTL expired / MAC on a new IP / port list changed -> full rescan
+- Every probed port keeps the time it was last observed
+- Bounded (LRU eviction), hit/miss counters for the scan stats
+
+File (port_cache.json):
+    {"version": 1, "entries": [[mac, {"ip", "open_ports", "ports",
+                                      "scanned_at", "observed": {port: time}}], ...]}
+    (least recently used first)
+"""
+
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from export_writer import atomic_write
+
+_VERSION = 1
+
+# plan() verdicts
+HIT, MISS, EXPIRED, MOVED = 'hit', 'miss', 'expired', 'moved'
+
+
+class PortCache:
+    """
+    Usage:
+        verdict, ports = cache.plan(mac, ip, all_ports)   # ports to probe
+        open_now = scan(ip, ports)
+        open_ports = cache.resolve(mac, ip, all_ports, ports, open_now)
+        # None = sample disagreed, scan all_ports and call cache.store()
+    """
+
+    def __init__(self, path: str = 'port_cache.json', ttl: float = 3600,
+                 max_entries: int = 4096, sample_size: int = 4):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.sample_size = max(1, sample_size)
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._changed = set()       # MACs updated since load (merged by the parent on sharded scans)
+        self._lock = threading.Lock()
+        self.stats = self._empty_stats()
+        self.load()
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            'hits': 0,            # sample agreed, cached ports reused
+            'misses': 0,          # unknown MAC
+            'expired': 0,         # older than the TTL (or other port list)
+            'moved': 0,           # MAC on a new IP
+            'invalidated': 0,     # sample disagreed -> full rescan
+            'evictions': 0,
+            'port_probes_saved': 0,
+        }
+
+    def reset_stats(self):
+        self.stats = self._empty_stats()
+
+    # ---- persistence ----
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version') != _VERSION:
+            return
+        with self._lock:
+            for mac, entry in data.get('entries', []):
+                self._entries[mac] = entry
+                self._entries.move_to_end(mac)
+            self._evict()
+
+    def save(self) -> bool:
+        """Atomic write - only if something changed"""
+        with self._lock:
+            if not self._changed:
+                return False
+            text = json.dumps({'version': _VERSION, 'entries': list(self._entries.items())},
+                              separators=(',', ':'))
+            self._changed.clear()
+        atomic_write(self.path, text)
+        return True
+
+    def changed_entries(self) -> Dict[str, Dict]:
+        """Entries updated in this process (shard worker -> parent)"""
+        with self._lock:
+            return {mac: self._entries[mac] for mac in self._changed if mac in self._entries}
+
+    def merge(self, entries: Dict[str, Dict]):
+        with self._lock:
+            for mac, entry in entries.items():
+                self._put(mac, entry)
+
+    # ---- LRU ----
+
+    def _put(self, mac: str, entry: Dict):
+        self._entries[mac] = entry
+        self._entries.move_to_end(mac)
+        self._changed.add(mac)
+        self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            mac, _ = self._entries.popitem(last=False)
+            self._changed.discard(mac)
+            self.stats['evictions'] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, mac: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(mac.upper())
+            if entry is not None:
+                self._entries.move_to_end(mac.upper())
+            return entry
+
+    # ---- scan integration ----
+
+    def plan(self, mac: Optional[str], ip: str, ports: List[int],
+             now: Optional[float] = None) -> Tuple[str, List[int]]:
+        """-> (verdict, ports to probe): sample on HIT, all ports otherwise"""
+        if not mac:
+            return MISS, list(ports)
+        now = time.time() if now is None else now
+        entry = self.get(mac)
+
+        if entry is None:
+            verdict = MISS
+        elif entry.get('ip') != ip:
+            verdict = MOVED
+        elif now - entry.get('scanned_at', 0) > self.ttl or entry.get('ports') != list(ports):
+            verdict = EXPIRED
+        else:
+            return HIT, self._sample(entry, ports)
+
+        self.stats[{MISS: 'misses', MOVED: 'moved', EXPIRED: 'expired'}[verdict]] += 1
+        return verdict, list(ports)
+
+    def _sample(self, entry: Dict, ports: List[int]) -> List[int]:
+        """Half cached-open, half cached-closed ports (both directions of change)"""
+        rng = random.Random()
+        open_ports = [p for p in ports if p in set(entry.get('open_ports', []))]
+        closed = [p for p in ports if p not in set(open_ports)]
+        want_open = min(len(open_ports), max(1, self.sample_size // 2))
+        sample = rng.sample(open_ports, want_open)
+        sample += rng.sample(closed, min(len(closed), self.sample_size - want_open))
+        return sorted(sample)
+
+    def resolve(self, mac: Optional[str], ip: str, ports: List[int],
+                probed: List[int], open_now: Iterable[int],
+                now: Optional[float] = None) -> Optional[List[int]]:
+        """
+        Result of a plan() scan -> open ports
+        None: sample disagreed with the cache, caller must scan all ports
+        """
+        now = time.time() if now is None else now
+        open_now = sorted(open_now)
+        if not mac:
+            return open_now
+        if len(probed) == len(ports):
+            self.store(mac, ip, ports, open_now, now)
+            return open_now
+
+        entry = self.get(mac)
+        cached_open = set(entry.get('open_ports', [])) if entry else set()
+        if entry is None or {p for p in probed if p in cached_open} != set(open_now):
+            self.stats['invalidated'] += 1
+            return None
+
+        with self._lock:
+            observed = dict(entry.get('observed', {}))
+            for port in probed:
+                observed[str(port)] = now
+            self._put(mac.upper(), {**entry, 'observed': observed})
+            self.stats['hits'] += 1
+            self.stats['port_probes_saved'] += len(ports) - len(probed)
+        return sorted(cached_open)
+
+    def store(self, mac: str, ip: str, ports: List[int], open_ports: List[int],
+              now: Optional[float] = None):
+        """Full scan result -> new entry"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._put(mac.upper(), {
+                'ip': ip,
+                'open_ports': sorted(open_ports),
+                'ports': list(ports),
+                'scanned_at': now,
+                'observed': {str(port): now for port in ports},
+            })
+
+    def summary(self) -> Dict:
+        lookups = sum(self.stats[k] for k in ('hits', 'misses', 'expired', 'moved', 'invalidated'))
+        return {
+            **self.stats,
+            'entries': len(self),
+            'hit_rate': round(self.stats['hits'] / lookups, 3) if lookups else 0.0,
+        }
+
+
+def merge_cache_stats(runs: List[Dict]) -> Dict:
+    """Counters of several shard workers -> one entry"""
+    if not runs:
+        return {}
+    merged = {key: sum(run.get(key, 0) for run in runs)
+              for key in PortCache._empty_stats()}
+    lookups = sum(merged[k] for k in ('hits', 'misses', 'expired', 'moved', 'invalidated'))
+    merged['hit_rate'] = round(merged['hits'] / lookups, 3) if lookups else 0.0
+    return merged
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Async Port Engine - TCP connect scanning on a single event loop
+
+Replaces the nested ThreadPoolExecutor design (10 device workers x 20 port
+workers) with one asyncio loop:
+- One global in-flight budget (max concurrent connects)
+- One per-host budget (max concurrent connects per target)
+- Bounded host workers, so memory stays flat at 10k+ hosts
+- Adaptive per-host connect timeouts from smoothed RTT (RFC 6298)
+- Throughput stats (connects/sec) after every run
+- Every connect draws a token from the shared packet budget (rate_governor)
+"""
+
+import asyncio
+import errno
+import resource
+import socket
+import time
+from typing import Dict, Iterable, List, Optional
+
+from rate_governor import get_governor
+
+
+class RttEstimator:
+    """
+    Smoothed RTT + variance per host -> connect timeout
+
+        srtt   = 7/8 srtt + 1/8 sample
+        rttvar = 3/4 rttvar + 1/4 |srtt - sample|
+        timeout = clamp(srtt + 4 * rttvar, floor, ceiling)
+
+    Seeded from ARP/ICMP replies, refined by every answered connect
+    (SYN/ACK or RST). Timed-out probes give no sample (Karn).
+    The ceiling stays below the kernel's 1s initial SYN RTO, so a probe
+    never waits long enough to trigger a SYN retransmission.
+    """
+
+    def __init__(self, floor: float = 0.1, ceiling: float = 0.9,
+                 max_hosts: int = 65536):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.max_hosts = max_hosts
+        self._hosts: Dict[str, List[float]] = {}   # ip -> [srtt, rttvar]
+
+    def update(self, ip: str, rtt: float):
+        entry = self._hosts.get(ip)
+        if entry is None:
+            if len(self._hosts) >= self.max_hosts:
+                self._hosts.pop(next(iter(self._hosts)))
+            self._hosts[ip] = [rtt, rtt / 2]
+            return
+        srtt, rttvar = entry
+        entry[1] = 0.75 * rttvar + 0.25 * abs(srtt - rtt)
+        entry[0] = 0.875 * srtt + 0.125 * rtt
+
+    def seed(self, ip: str, rtt: float):
+        """Initial sample (ARP/ping) - ignored if the host is already known"""
+        if ip not in self._hosts and rtt is not None and rtt >= 0:
+            self.update(ip, rtt)
+
+    def timeout(self, ip: str) -> Optional[float]:
+        """Adaptive timeout, or None if there is no estimate yet"""
+        entry = self._hosts.get(ip)
+        if entry is None:
+            return None
+        return min(self.ceiling, max(self.floor, entry[0] + 4 * entry[1]))
+
+    def __contains__(self, ip: str) -> bool:
+        return ip in self._hosts
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+
+class AsyncPortEngine:
+    """
+    TCP connect scanner
+    Scans EVERY host - no device cap
+    """
+
+    def __init__(self, max_in_flight: int = 512, per_host: int = 32,
+                 timeout: float = 0.3, adaptive: bool = True):
+        self.max_in_flight = self._clamp_to_fd_limit(max_in_flight)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.adaptive = adaptive
+        self.rtt = RttEstimator()
+        self._sem = None
+        self._sem_loop = None
+        self._in_flight = 0
+        self.stats = self._empty_stats()
+        self.host_stats: Dict[str, Dict] = {}   # ip -> per-host telemetry
+
+    @staticmethod
+    def _clamp_to_fd_limit(requested: int) -> int:
+        """Keep in-flight sockets below the process fd limit"""
+        try:
+            soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+            if soft != resource.RLIM_INFINITY:
+                return max(1, min(requested, soft - 64))
+        except (ValueError, OSError):
+            pass
+        return max(1, requested)
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            'engine': 'connect',
+            'hosts': 0,
+            'connects': 0,
+            'open': 0,
+            'refused': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'elapsed_s': 0.0,
+            'connects_per_sec': 0.0,
+            'max_in_flight': 0,
+            'adaptive_probes': 0,          # probes with an RTT-derived timeout
+            'probe_wait_saved_s': 0.0,     # vs. fixed timeout, timed-out probes with a shorter one
+            'retransmissions_avoided': 0,  # answers later than the fixed timeout
+            'rtt_hosts': 0,
+        }
+
+    def reset_stats(self):
+        self.stats = self._empty_stats()
+        self.host_stats = {}
+
+    def _global_sem(self) -> asyncio.Semaphore:
+        """Global budget, bound to the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_in_flight)
+            self._sem_loop = loop
+            self._in_flight = 0
+        return self._sem
+
+    def seed_rtt(self, ip: str, rtt_ms: Optional[float]):
+        """RTT from ARP/ping (ms) as the first estimate for a host"""
+        if rtt_ms is not None:
+            self.rtt.seed(ip, rtt_ms / 1000)
+
+    def timeout_for(self, ip: str) -> float:
+        adaptive = self.rtt.timeout(ip) if self.adaptive else None
+        return adaptive if adaptive is not None else self.timeout
+
+    async def probe(self, ip: str, port: int,
+                    timeout: Optional[float] = None) -> bool:
+        """Single non-blocking connect - True if port is open"""
+        await get_governor().acquire_async(1, 'tcp')
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+
+        adaptive = timeout is None and self.adaptive and ip in self.rtt
+        timeout = timeout or self.timeout_for(ip)
+
+        self.stats['connects'] += 1
+        host = self.host_stats.get(ip)
+        if host is not None:
+            host['port_probes'] += 1
+        if adaptive:
+            self.stats['adaptive_probes'] += 1
+        self._in_flight += 1
+        if self._in_flight > self.stats['max_in_flight']:
+            self.stats['max_in_flight'] = self._in_flight
+
+        start = time.perf_counter()
+        answered = False
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+            self.stats['open'] += 1
+            answered = True
+            return True
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            if host is not None:
+                host['port_timeouts'] += 1
+            if adaptive:
+                # a timeout above the fixed one waited longer, that is no saving
+                self.stats['probe_wait_saved_s'] += max(0.0, self.timeout - timeout)
+        except ConnectionRefusedError:
+            self.stats['refused'] += 1
+            answered = True
+        except OSError as e:
+            if e.errno == errno.ECONNREFUSED:
+                self.stats['refused'] += 1
+                answered = True
+            else:
+                self.stats['errors'] += 1
+        finally:
+            self._in_flight -= 1
+            sock.close()
+            if answered:
+                rtt = time.perf_counter() - start
+                self.rtt.update(ip, rtt)
+                if rtt > self.timeout:
+                    # Fixed timeout would have given up -> re-probe or false negative
+                    self.stats['retransmissions_avoided'] += 1
+
+        return False
+
+    async def scan_host(self, ip: str, ports: Iterable[int]) -> List[int]:
+        """Scan one host within the per-host and global budgets"""
+        global_sem = self._global_sem()
+        host_sem = asyncio.Semaphore(self.per_host)
+        open_ports = []
+        host = self.host_stats[ip] = {'port_probes': 0, 'port_timeouts': 0}
+        start = time.perf_counter()
+
+        async def _one(port: int):
+            async with host_sem:
+                async with global_sem:
+                    if await self.probe(ip, port):
+                        open_ports.append(port)
+
+        await asyncio.gather(*(_one(p) for p in ports))
+        self.stats['hosts'] += 1
+        host['port_scan_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        host['open_ports'] = len(open_ports)
+        return sorted(open_ports)
+
+    async def scan_async(self, hosts: Iterable[str], ports: List[int],
+                         plan: Optional[Dict[str, List[int]]] = None) -> Dict[str, List[int]]:
+        """Scan all hosts - results as {ip: [open ports]} (plan: per-host port lists)"""
+        self.reset_stats()
+        self._global_sem()
+        start = time.perf_counter()
+
+        queue = asyncio.Queue()
+        for ip in hosts:
+            queue.put_nowait(ip)
+
+        # Enough host workers to keep the global budget saturated
+        per_host = max(1, min(self.per_host, len(ports)))
+        workers = max(1, -(-self.max_in_flight // per_host))
+        workers = min(workers, queue.qsize()) or 1
+
+        results = {}
+
+        async def _worker():
+            while True:
+                try:
+                    ip = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results[ip] = await self.scan_host(ip, plan.get(ip, ports) if plan else ports)
+
+        await asyncio.gather(*(_worker() for _ in range(workers)))
+
+        self._finish_stats(start)
+        return results
+
+    def _finish_stats(self, start: float):
+        elapsed = time.perf_counter() - start
+        self.stats['elapsed_s'] = round(elapsed, 3)
+        self.stats['probe_wait_saved_s'] = round(self.stats['probe_wait_saved_s'], 3)
+        self.stats['rtt_hosts'] = len(self.rtt)
+        if elapsed > 0:
+            self.stats['connects_per_sec'] = round(self.stats['connects'] / elapsed, 1)
+
+    def scan(self, hosts: Iterable[str], ports: List[int],
+             plan: Optional[Dict[str, List[int]]] = None) -> Dict[str, List[int]]:
+        """Blocking wrapper around scan_async"""
+        return asyncio.run(self.scan_async(hosts, ports, plan))
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python3 port_engine.py <ip|cidr> [ports]")
+        sys.exit(1)
+
+    import ipaddress
+    target = sys.argv[1]
+    ports = [int(p) for p in sys.argv[2].split(',')] if len(sys.argv) > 2 else [22, 80, 443]
+    hosts = [str(h) for h in ipaddress.ip_network(target, strict=False).hosts()] or [target]
+
+    engine = AsyncPortEngine()
+    results = engine.scan(hosts, ports)
+
+    for ip, open_ports in results.items():
+        if open_ports:
+            print(f"  {ip:15} | {open_ports}")
+
+    s = engine.stats
+    print(f"✅ {s['connects']} connects to {s['hosts']} hosts in {s['elapsed_s']}s "
+          f"({s['connects_per_sec']} connects/s)")
+    print(f"⏱️  {s['adaptive_probes']} adaptive probes, {s['probe_wait_saved_s']}s wait saved, "
+          f"{s['retransmissions_avoided']} retransmissions avoided")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,14 @@ Quick Scanner - Fast Discovery (5-10 Sekunden)
 Scannt nur wichtige IPs: .1, .10, .11, .20-30, .100-110, .254
 """
 
-import json
-import subprocess
 import socket
 from datetime import datetime
 from typing import Dict
 
+from pinger import get_pinger
+from export_writer import write_snapshot
+from dns_resolver import get_resolver
+
 class QuickScanner:
     """Schneller Scanner für wichtige IPs"""
     
@@ -50,22 +52,13 @@ class QuickScanner:
     def _is_alive(self, ip: str) -> bool:
         """Quick ping check"""
         try:
-            result = subprocess.run(
-                ['ping', '-c', '1', '-W', '1', ip],
-                capture_output=True,
-                timeout=2,
-                check=False
-            )
-            return result.returncode == 0
+            return get_pinger().is_alive(ip, timeout=1.0)
         except:
             return False
     
     def _resolve_hostname(self, ip: str) -> str:
-        """Resolve hostname"""
-        try:
-            return socket.gethostbyaddr(ip)[0]
-        except:
-            return f"device-{ip.split('.')[-1]}"
+        """Resolve hostname (PTR, cached)"""
+        return get_resolver().resolve(ip) or f"device-{ip.split('.')[-1]}"
     
     def _detect_type(self, ip: str, hostname: str) -> str:
         """Simple type detection"""
@@ -104,12 +97,13 @@ class QuickScanner:
         devices = {}
         found = 0
         
-        for last_octet in self.important_ips:
-            ip = f"{self.network_base}.{last_octet}"
-            
-            print(f"Testing {ip}...", end='\r')
-            
-            if self._is_alive(ip):
+        # Alle wichtigen IPs in EINEM ICMP-Batch
+        ips = [f"{self.network_base}.{last_octet}" for last_octet in self.important_ips]
+        alive = get_pinger().ping_many(ips, timeout=1.0)
+        get_resolver().resolve_many(ip for ip in ips if alive[ip]['alive'])
+        
+        for ip in ips:
+            if alive[ip]['alive']:
                 hostname = self._resolve_hostname(ip)
                 device_type = self._detect_type(ip, hostname)
                 
@@ -161,10 +155,10 @@ class QuickScanner:
             output['summary']['by_type'][dev_type] = \
                 output['summary']['by_type'].get(dev_type, 0) + 1
         
-        with open(filename, 'w') as f:
-            json.dump(output, f, indent=2)
-        
-        print(f"\n💾 Exportiert: {filename}")
+        if write_snapshot(filename, output):
+            print(f"\n💾 Exportiert: {filename}")
+        else:
+            print(f"\n💾 Unverändert: {filename}")
         return filename
 
 
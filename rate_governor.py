@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Rate Governor - one packet budget for every probe type
+
+ARP, TCP connects, SYN packets, UDP service probes, ICMP echos, PTR
+queries and SNMP requests all draw tokens from the same bucket, so a scan
+never sends more than `pps` packets per second (bursts up to `burst`) in
+total:
+- Profiles in monitor_config.json ('rate_limit' section), e.g. "normal"
+  (pps 0 = unlimited, only measured) and "gaming" (quiet while consoles
+  are being measured)
+- Thread-safe; `acquire()` blocks, `acquire_async()` awaits, `try_acquire()`
+  never waits (callers that have other work, e.g. receiving replies)
+- Stats per scan: packets per probe kind, achieved and peak rate,
+  how many acquisitions had to wait (-> scan telemetry)
+
+Usage:
+    governor = get_governor()
+    governor.acquire(1, 'icmp')
+    await governor.acquire_async(1, 'tcp')
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+DEFAULT_PROFILES = {
+    'normal': {'pps': 0, 'burst': 256},     # unlimited, rate is still measured
+    'gaming': {'pps': 100, 'burst': 10},    # quiet: ~100 packets/s for the whole scan
+}
+
+PROBE_KINDS = ('arp', 'tcp', 'syn', 'udp', 'icmp', 'dns', 'snmp')
+
+
+def load_rate_config(config_file: str = 'monitor_config.json') -> Dict:
+    """'rate_limit' section: {'profile': name, <name>: {'pps', 'burst'}, ...}"""
+    try:
+        with open(config_file, 'r') as f:
+            section = json.load(f).get('rate_limit', {})
+    except (FileNotFoundError, ValueError):
+        section = {}
+    profiles = {name: dict(values) for name, values in DEFAULT_PROFILES.items()}
+    for name, values in section.items():
+        if isinstance(values, dict):
+            profiles[name] = {**profiles.get(name, {'pps': 0, 'burst': 256}), **values}
+    return {'profile': section.get('profile', 'normal'), 'profiles': profiles}
+
+
+class RateGovernor:
+    """
+    Token bucket: `pps` tokens per second, at most `burst` saved up
+    pps = 0 disables throttling (packets are still counted)
+    """
+
+    def __init__(self, pps: float = 0, burst: int = 256, profile: str = 'custom'):
+        self._lock = threading.Lock()
+        self.configure(pps, burst, profile)
+        self.reset_stats()
+
+    def configure(self, pps: float, burst: int, profile: str = 'custom'):
+        with self._lock:
+            self.pps = max(0.0, float(pps))
+            self.burst = max(1, int(burst))
+            self.profile = profile
+            self._tokens = float(self.burst)
+            self._refilled_at = time.perf_counter()
+
+    def reset_stats(self):
+        with self._lock:
+            self._packets = dict.fromkeys(PROBE_KINDS, 0)
+            self._first_at = None
+            self._last_at = None
+            self._throttled = 0
+            self._second = None      # current 1s window (for the peak rate)
+            self._second_count = 0
+            self._peak = 0
+
+    # ---- token bucket ----
+
+    def _count(self, n: int, kind: str, now: float):
+        self._packets[kind] = self._packets.get(kind, 0) + n
+        if self._first_at is None:
+            self._first_at = now
+        self._last_at = now
+        second = int(now)
+        if second != self._second:
+            self._second, self._second_count = second, 0
+        self._second_count += n
+        self._peak = max(self._peak, self._second_count)
+
+    def try_acquire(self, n: int = 1, kind: str = 'tcp') -> float:
+        """Take n tokens -> 0.0, or seconds until they are available (nothing taken)"""
+        n = min(n, self.burst)
+        with self._lock:
+            now = time.perf_counter()
+            if self.pps:
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.pps)
+                self._refilled_at = now
+                if self._tokens < n:
+                    return (n - self._tokens) / self.pps
+                self._tokens -= n
+            self._count(n, kind, now)
+            return 0.0
+
+    def acquire(self, n: int = 1, kind: str = 'tcp'):
+        """Blocking - n may exceed the burst (taken in burst-sized parts)"""
+        waited = False
+        while n > 0:
+            part = min(n, self.burst)
+            wait = self.try_acquire(part, kind)
+            if wait:
+                waited = waited or self._mark_throttled()
+                time.sleep(wait)
+                continue
+            n -= part
+
+    async def acquire_async(self, n: int = 1, kind: str = 'tcp'):
+        waited = False
+        while n > 0:
+            part = min(n, self.burst)
+            wait = self.try_acquire(part, kind)
+            if wait:
+                waited = waited or self._mark_throttled()
+                await asyncio.sleep(wait)
+                continue
+            n -= part
+
+    def _mark_throttled(self) -> bool:
+        with self._lock:
+            self._throttled += 1
+        return True
+
+    def record(self, n: int, kind: str):
+        """Packets paced by someone else (scapy inter=, arp-scan --interval)"""
+        with self._lock:
+            self._count(n, kind, time.perf_counter())
+
+    def paced(self, items: Sequence, kind: str) -> Iterator[List]:
+        """Burst-sized slices of items, each paid for before it is yielded"""
+        items = list(items)
+        step = max(1, self.burst) if self.pps else max(1, len(items))
+        for i in range(0, len(items), step):
+            chunk = items[i:i + step]
+            self.acquire(len(chunk), kind)
+            yield chunk
+
+    def interval(self) -> float:
+        """Seconds between packets at the limit (0 = unlimited)"""
+        return 1.0 / self.pps if self.pps else 0.0
+
+    # ---- stats ----
+
+    def stats(self) -> Dict:
+        with self._lock:
+            packets = sum(self._packets.values())
+            elapsed = (self._last_at - self._first_at) if self._first_at is not None else 0.0
+            return {
+                'profile': self.profile,
+                'pps_limit': self.pps,
+                'burst': self.burst,
+                'packets': packets,
+                'by_kind': {k: v for k, v in self._packets.items() if v},
+                'elapsed_s': round(elapsed, 3),
+                'achieved_pps': round(packets / elapsed, 1) if elapsed > 0 else 0.0,
+                'peak_pps': self._peak,
+                'throttled': self._throttled,
+            }
+
+
+def merge_rate_stats(runs: List[Dict], elapsed_s: float) -> Dict:
+    """Rate stats of several processes (shard workers) -> one entry"""
+    if not runs:
+        return {}
+    by_kind = {}
+    for run in runs:
+        for kind, count in run.get('by_kind', {}).items():
+            by_kind[kind] = by_kind.get(kind, 0) + count
+    packets = sum(run.get('packets', 0) for run in runs)
+    return {
+        'profile': runs[0].get('profile'),
+        'pps_limit': sum(run.get('pps_limit', 0) for run in runs),
+        'burst': runs[0].get('burst'),
+        'packets': packets,
+        'by_kind': by_kind,
+        'elapsed_s': round(elapsed_s, 3),
+        'achieved_pps': round(packets / elapsed_s, 1) if elapsed_s else 0.0,
+        'peak_pps': sum(run.get('peak_pps', 0) for run in runs),   # upper bound
+        'throttled': sum(run.get('throttled', 0) for run in runs),
+    }
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_governor() -> RateGovernor:
+    """Process-wide governor, profile from monitor_config.json"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = RateGovernor()
+            use_profile(load_rate_config()['profile'], governor=_shared)
+        return _shared
+
+
+def use_profile(name: str, share: float = 1.0,
+                governor: Optional[RateGovernor] = None) -> Dict:
+    """
+    Switch the shared governor to a configured profile
+    share: fraction of the budget for this process (shard workers)
+    """
+    profiles = load_rate_config()['profiles']
+    if name not in profiles:
+        raise ValueError(f"unknown rate profile '{name}' (known: {', '.join(profiles)})")
+    values = profiles[name]
+    pps = values.get('pps', 0) * share
+    burst = max(1, int(values.get('burst', 256) * share))
+    (governor or get_governor()).configure(pps, burst, name)
+    return {'pps': pps, 'burst': burst}
+
+
+def describe(governor: RateGovernor) -> str:
+    if not governor.pps:
+        return f"{governor.profile} (unlimited)"
+    return f"{governor.profile} ({governor.pps:g} pkts/s, burst {governor.burst})"
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Scan Pipeline - ARP, port scan and enrichment overlap per host
+
+Phased scanning waits for the full ARP sweep before the first port
+probe, and for the slowest port scan before the first enrichment.
+Here every host flows through the stages on its own:
+
+    ARP reply -> [port queue] -> port scan -> [enrich queue] -> PTR + ping
+
+Queues are bounded (backpressure), so total wall time is close to the
+slowest single host's path instead of the sum of the phases.
+"""
+
+import asyncio
+import concurrent.futures
+import time
+from typing import Dict
+
+from dns_resolver import get_resolver
+from scan_telemetry import ping_fields
+
+
+class ScanPipeline:
+    """
+    Streaming scan for one UltraScanner
+    Usage: devices = ScanPipeline(scanner).run()
+    """
+
+    def __init__(self, scanner, queue_size: int = 64,
+                 port_workers: int = None, enrich_workers: int = 16):
+        self.scanner = scanner
+        self.queue_size = max(1, queue_size)
+        engine = scanner.port_engine
+        self.port_workers = port_workers or max(
+            1, engine.max_in_flight // max(1, min(engine.per_host, len(scanner.important_ports)))
+        )
+        self.enrich_workers = max(1, enrich_workers)
+
+        self.devices = {}
+        self.probed = 0
+        self.carried = 0
+        self.stage_times = {}
+
+    def run(self) -> Dict:
+        """Blocking - returns {ip: device}"""
+        print("\n" + "="*70)
+        print("🌊 PIPELINE: ARP → PORTS → ENRICHMENT (streaming)")
+        print("="*70)
+        return asyncio.run(self._run())
+
+    def _mark(self, stage: str, event: str):
+        """First/last activity per stage (relative to start)"""
+        t = round(time.perf_counter() - self._start, 3)
+        times = self.stage_times.setdefault(stage, {})
+        if event == 'first':
+            times.setdefault('first_s', t)
+        else:
+            times['last_s'] = t
+
+    async def _run(self) -> Dict:
+        loop = asyncio.get_running_loop()
+        self._start = time.perf_counter()
+
+        self.port_q = asyncio.Queue(self.queue_size)
+        self.enrich_q = asyncio.Queue(self.queue_size)
+
+        engine = self.scanner.port_engine
+        engine.reset_stats()
+
+        arp_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.io_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.enrich_workers
+        )
+
+        def on_host(ip: str, device: Dict):
+            # Called from the ARP thread - blocks when the port queue is full
+            asyncio.run_coroutine_threadsafe(
+                self.port_q.put((ip, device)), loop
+            ).result()
+
+        sampler = asyncio.create_task(self._sample_load())
+        try:
+            port_tasks = [asyncio.create_task(self._port_worker())
+                          for _ in range(self.port_workers)]
+            enrich_tasks = [asyncio.create_task(self._enrich_worker())
+                            for _ in range(self.enrich_workers)]
+
+            found = await loop.run_in_executor(arp_executor, self.scanner.arp_stream, on_host)
+            self._mark('arp', 'last')
+            print(f"✅ ARP: {found} devices in {self.scanner._last_scan_time:.1f}s "
+                  f"(port scans already running)")
+
+            for _ in port_tasks:
+                await self.port_q.put(None)
+            await asyncio.gather(*port_tasks)
+
+            for _ in enrich_tasks:
+                await self.enrich_q.put(None)
+            await asyncio.gather(*enrich_tasks)
+        finally:
+            sampler.cancel()
+            if self.scanner.udp_engine is not None:
+                self.scanner.udp_engine.close()
+            arp_executor.shutdown(wait=False)
+            self.io_executor.shutdown(wait=False)
+
+        engine._finish_stats(self._start)
+        self._record_telemetry()
+        self.scanner.scan_stats['port_scan'] = dict(engine.stats)
+        self.scanner.scan_stats['pipeline'] = {
+            'queue_size': self.queue_size,
+            'port_workers': self.port_workers,
+            'enrich_workers': self.enrich_workers,
+            'stages': self.stage_times,
+        }
+        self.scanner.scan_stats['dns'] = get_resolver().cache_stats()
+        if self.scanner.incremental:
+            self.scanner._incremental_stats(self.probed, self.carried)
+
+        print(f"✅ Pipeline done in {time.perf_counter() - self._start:.1f}s "
+              f"({engine.stats['connects']} connects, "
+              f"{engine.stats['connects_per_sec']:.0f} connects/s)")
+        self.scanner._print_rtt_stats(engine.stats)
+        return self.devices
+
+    async def _sample_load(self):
+        """Peak thread/task counts while the stages overlap"""
+        while True:
+            self.scanner.telemetry.sample('pipeline')
+            await asyncio.sleep(0.1)
+
+    def _record_telemetry(self):
+        """Stage spans + per-host port stats -> scanner telemetry"""
+        telemetry = self.scanner.telemetry
+        offset = telemetry.phases.get('pipeline', {}).get('start_s', 0)
+        for stage, times in self.stage_times.items():
+            first = times.get('first_s', 0)
+            telemetry.record_phase(stage, offset + first, times.get('last_s', first) - first)
+        telemetry.hosts_from_engine(self.scanner.port_engine.host_stats)
+
+    @staticmethod
+    async def _timed(awaitable):
+        """-> (result, elapsed ms)"""
+        start = time.perf_counter()
+        result = await awaitable
+        return result, round((time.perf_counter() - start) * 1000, 1)
+
+    @staticmethod
+    def _ping_fields(rtt, wall_ms: float) -> Dict:
+        """ping_ms = ICMP round trip (unset on timeout), as in the phased scan; wall time separately"""
+        return dict(ping_fields(rtt), ping_wall_ms=wall_ms)
+
+    async def _port_worker(self):
+        scanner = self.scanner
+
+        while True:
+            item = await self.port_q.get()
+            if item is None:
+                return
+            ip, device = item
+            self._mark('arp', 'first')
+
+            if scanner.incremental:
+                previous = scanner._carry_forward(ip, device, time.time())
+                if previous is not None:
+                    self.carried += 1
+                    await self.enrich_q.put((ip, previous, False))
+                    continue
+
+            self._mark('ports', 'first')
+            scanner._seed_rtt(ip, device)
+            probed = scanner._ports_to_probe(ip, device)
+            open_ports = await scanner._probe_host(ip, probed)
+            open_ports = scanner._cached_ports(ip, device, probed, open_ports)
+            if open_ports is None:
+                # Revalidation sample disagreed with the port cache
+                open_ports = await scanner._probe_host(ip, scanner.important_ports)
+                open_ports = scanner._cached_ports(ip, device, scanner.important_ports, open_ports)
+            self._mark('ports', 'last')
+
+            if open_ports:
+                device['open_ports'] = open_ports
+                device['port_count'] = len(open_ports)
+                device['device_type'] = scanner._classify_by_ports(open_ports)
+                print(f"  {ip:15} | {len(open_ports):2} ports | {device['device_type']}")
+
+            self.probed += 1
+            await self.enrich_q.put((ip, device, True))
+
+    async def _enrich_worker(self):
+        scanner = self.scanner
+        loop = asyncio.get_running_loop()
+
+        while True:
+            item = await self.enrich_q.get()
+            if item is None:
+                return
+            ip, device, probed = item
+            self._mark('enrich', 'first')
+
+            latency_job = loop.run_in_executor(self.io_executor, scanner._measure_latency_fast, ip)
+
+            if probed:
+                (name, dns_ms), (latency, ping_wall_ms) = await asyncio.gather(
+                    self._timed(get_resolver().resolve_async(ip)),
+                    self._timed(latency_job)
+                )
+                scanner.telemetry.host(ip, dns_ms=dns_ms, **self._ping_fields(latency, ping_wall_ms))
+                hostname = name or scanner._default_hostname(ip)
+                device['hostname'] = hostname
+                device['final_type'] = scanner._multi_factor_classify(device)
+                device['probed_at'] = time.time()
+
+                icon = scanner._get_icon(device['final_type'])
+                print(f"  {icon} {ip:15} | {device['final_type']:15} | {hostname}")
+            else:
+                # Unchanged host: previous results, fresh latency only
+                latency, ping_wall_ms = await self._timed(latency_job)
+                scanner.telemetry.host(ip, carried=True, **self._ping_fields(latency, ping_wall_ms))
+
+            if latency:
+                device['latency_ms'] = latency
+
+            self.devices[ip] = device
+            self._mark('enrich', 'last')
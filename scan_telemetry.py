@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Scan Telemetry - structured timings per phase and per host
+
+Collected during `full_scan`, written next to the export:
+- network_data.telemetry.json  (phases, hosts, engine/DNS stats)
+- network_data.prom            (Prometheus text exposition, served by
+                                server.js at /metrics)
+
+Per phase: wall time, thread and asyncio task counts (peak).
+Per host:  DNS, ping and port scan time, port probes and timeouts,
+           SNMP round trips (all / interface table) and poll time.
+Per scan:  packets sent per probe kind and the achieved rate (rate_governor),
+           SNMP requests (snmp_session).
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from export_writer import atomic_write
+
+METRIC_PREFIX = 'netmon'
+
+# Host fields -> (metric name, help, scale to base unit)
+HOST_METRICS = {
+    'dns_ms': ('host_dns_seconds', 'PTR lookup time per host', 0.001),
+    'ping_ms': ('host_ping_seconds', 'ICMP round trip per host (hosts that answered)', 0.001),
+    'ping_timeouts': ('host_ping_timeouts', 'ICMP pings without answer per host', 1),
+    'port_scan_ms': ('host_port_scan_seconds', 'Port scan wall time per host', 0.001),
+    'port_probes': ('host_port_probes', 'Port probes sent per host', 1),
+    'port_timeouts': ('host_port_timeouts', 'Port probes without answer per host', 1),
+    'open_ports': ('host_open_ports', 'Open ports per host', 1),
+    'udp_probes': ('host_udp_probes', 'UDP service probes per host', 1),
+    'udp_open': ('host_udp_open', 'UDP services that answered per host', 1),
+    'snmp_requests': ('host_snmp_requests', 'SNMP requests (round trips) per host', 1),
+    'snmp_if_requests': ('host_snmp_interface_requests',
+                         'SNMP requests for the interface table per host', 1),
+    'snmp_ms': ('host_snmp_poll_seconds', 'SNMP poll wall time per host', 0.001),
+}
+
+PHASE_METRICS = {
+    'duration_s': ('phase_duration_seconds', 'Wall time per scan phase'),
+    'threads': ('phase_threads', 'Peak thread count per scan phase'),
+    'tasks': ('phase_tasks', 'Peak asyncio task count per scan phase'),
+}
+
+
+def telemetry_paths(export_file: str) -> Tuple[str, str]:
+    """network_data.json -> (network_data.telemetry.json, network_data.prom)"""
+    base = os.path.splitext(export_file)[0]
+    return f"{base}.telemetry.json", f"{base}.prom"
+
+
+def _label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _sample(value: float) -> str:
+    """Exact sample value - ints as written, floats with all digits (no 1.23457e+06)"""
+    if isinstance(value, int):
+        return str(int(value))
+    return repr(float(value))
+
+
+def ping_fields(rtt_ms: Optional[float]) -> Dict:
+    """Host values of one ping - no answer: ping_timeouts, no ping_ms"""
+    if rtt_ms is None:
+        return {'ping_timeouts': 1}
+    return {'ping_ms': rtt_ms, 'ping_timeouts': 0}
+
+
+class ScanTelemetry:
+    """
+    One instance per scan
+    Usage:
+        with telemetry.phase('ports'):
+            ...
+        telemetry.host(ip, dns_ms=3.1, ping_ms=0.8)
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now().isoformat()
+        self._t0 = time.perf_counter()
+        self.phases: Dict[str, Dict] = {}
+        self.hosts: Dict[str, Dict] = {}
+        self.total_s = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a phase, sample thread/task counts at start and end"""
+        start = time.perf_counter()
+        entry = self.phases.setdefault(name, {})
+        entry.setdefault('start_s', round(start - self._t0, 3))
+        self.sample(name)
+        try:
+            yield entry
+        finally:
+            self.sample(name)
+            entry['duration_s'] = round(entry.get('duration_s', 0) + time.perf_counter() - start, 3)
+
+    def record_phase(self, name: str, start_s: float, duration_s: float, **values):
+        """Phase measured elsewhere (pipeline stages overlap, shards run in workers)"""
+        entry = self.phases.setdefault(name, {})
+        entry.update(start_s=round(start_s, 3), duration_s=round(duration_s, 3), **values)
+
+    def sample(self, name: str):
+        """Peak threads (and tasks, when called on an event loop) for a phase"""
+        entry = self.phases.setdefault(name, {})
+        entry['threads'] = max(entry.get('threads', 0), threading.active_count())
+        try:
+            tasks = len(asyncio.all_tasks())
+        except RuntimeError:
+            return  # no running loop
+        entry['tasks'] = max(entry.get('tasks', 0), tasks)
+
+    def host(self, ip: str, **values):
+        """Merge per-host values (thread-safe)"""
+        with self._lock:
+            self.hosts.setdefault(ip, {}).update(values)
+
+    def hosts_from_engine(self, host_stats: Dict[str, Dict]):
+        """Per-host port engine stats -> host entries"""
+        for ip, stats in host_stats.items():
+            self.host(ip, **stats)
+
+    def finish(self):
+        self.total_s = round(time.perf_counter() - self._t0, 3)
+
+    def slowest_hosts(self, key: str = 'port_scan_ms', top: int = 5) -> List[Tuple[str, float]]:
+        ranked = [(ip, h[key]) for ip, h in self.hosts.items() if h.get(key) is not None]
+        return sorted(ranked, key=lambda x: x[1], reverse=True)[:top]
+
+    def to_dict(self, scan_stats: Optional[Dict] = None) -> Dict:
+        data = {
+            'started_at': self.started_at,
+            'total_s': self.total_s,
+            'phases': self.phases,
+            'hosts': self.hosts,
+        }
+        for key in ('port_scan', 'udp_scan', 'dns', 'incremental', 'pipeline', 'rate',
+                    'port_cache', 'snmp'):
+            if scan_stats and key in scan_stats:
+                data[key] = scan_stats[key]
+        return data
+
+    def merge(self, other: Dict, prefix: str = ''):
+        """Telemetry dict of a shard worker -> this scan"""
+        for name, phase in other.get('phases', {}).items():
+            self.phases[f"{prefix}{name}"] = phase
+        for ip, values in other.get('hosts', {}).items():
+            self.host(ip, **values)
+
+    def prometheus(self, scan_stats: Optional[Dict] = None) -> str:
+        """Text exposition format 0.0.4"""
+        lines = []
+
+        def metric(name: str, help_text: str, samples: Iterable[Tuple[str, float]]):
+            samples = list(samples)
+            if not samples:
+                return
+            full = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} gauge")
+            for labels, value in samples:
+                lines.append(f"{full}{labels} {_sample(value)}")
+
+        metric('scan_duration_seconds', 'Wall time of the last scan', [('', self.total_s)])
+        metric('scan_hosts', 'Hosts with telemetry in the last scan', [('', len(self.hosts))])
+
+        for key, (name, help_text) in PHASE_METRICS.items():
+            metric(name, help_text, (
+                (f'{{phase="{_label(phase)}"}}', values[key])
+                for phase, values in self.phases.items() if key in values
+            ))
+
+        port_scan = (scan_stats or {}).get('port_scan', {})
+        for key in ('connects', 'packets_sent', 'open', 'timeouts', 'filtered', 'errors'):
+            if key in port_scan:
+                metric(f'port_scan_{key}', f'Port scan {key} in the last scan',
+                       [('', port_scan[key])])
+
+        udp_scan = (scan_stats or {}).get('udp_scan', {})
+        for key in ('probes', 'datagrams_sent', 'open', 'no_reply'):
+            if key in udp_scan:
+                metric(f'udp_scan_{key}', f'UDP service probe {key} in the last scan',
+                       [('', udp_scan[key])])
+
+        dns = (scan_stats or {}).get('dns', {})
+        for key in ('queries', 'answers', 'timeouts', 'cache_hits', 'negative_hits'):
+            if key in dns:
+                metric(f'dns_{key}', f'PTR resolver {key} (cumulative)', [('', dns[key])])
+
+        rate = (scan_stats or {}).get('rate', {})
+        if rate:
+            metric('probe_rate_pps', 'Achieved probe packet rate in the last scan',
+                   [('', rate.get('achieved_pps', 0))])
+            metric('probe_peak_pps', 'Peak probe packets in one second of the last scan',
+                   [('', rate.get('peak_pps', 0))])
+            metric('probe_rate_limit_pps', 'Packet budget (0 = unlimited)',
+                   [(f'{{profile="{_label(rate.get("profile"))}"}}', rate.get('pps_limit', 0))])
+            metric('probe_throttled', 'Probe acquisitions that waited for the budget',
+                   [('', rate.get('throttled', 0))])
+            metric('probe_packets', 'Probe packets per kind in the last scan', (
+                (f'{{kind="{_label(kind)}"}}', count)
+                for kind, count in sorted(rate.get('by_kind', {}).items())
+            ))
+
+        port_cache = (scan_stats or {}).get('port_cache', {})
+        for key in ('hits', 'misses', 'expired', 'moved', 'invalidated', 'evictions', 'entries'):
+            if key in port_cache:
+                metric(f'port_cache_{key}', f'Port cache {key} in the last scan',
+                       [('', port_cache[key])])
+
+        snmp = (scan_stats or {}).get('snmp', {})
+        for key in ('requests', 'bulk_requests', 'too_big', 'errors', 'agents',
+                    'deadline_exceeded'):
+            if key in snmp:
+                metric(f'snmp_{key}', f'SNMP {key} in the last scan', [('', snmp[key])])
+
+        for key, (name, help_text, scale) in HOST_METRICS.items():
+            metric(name, help_text, (
+                (f'{{ip="{_label(ip)}"}}', round(values[key] * scale, 6))
+                for ip, values in sorted(self.hosts.items()) if values.get(key) is not None
+            ))
+
+        return '\n'.join(lines) + '\n'
+
+    def write(self, export_file: str, scan_stats: Optional[Dict] = None) -> Tuple[str, str]:
+        """JSON sidecar + .prom next to the export file"""
+        json_path, prom_path = telemetry_paths(export_file)
+        # Write + rename: scrapers never see a half-written file
+        atomic_write(json_path, json.dumps(self.to_dict(scan_stats), indent=2))
+        atomic_write(prom_path, self.prometheus(scan_stats))
+        return json_path, prom_path
+
+
+def main():
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else telemetry_paths('network_data.json')[0]
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {path}: {e}")
+        sys.exit(1)
+
+    print(f"\n📈 Scan telemetry ({data['started_at']}, {data['total_s']}s)")
+    for name, phase in data['phases'].items():
+        print(f"  {name:20} | {phase.get('duration_s', 0):7.3f}s | "
+              f"threads {phase.get('threads', '-'):>3} | tasks {phase.get('tasks', '-'):>4}")
+
+    rate = data.get('rate')
+    if rate:
+        print(f"\n  Probe rate: {rate['achieved_pps']} pkts/s avg, {rate['peak_pps']} peak, "
+              f"{rate['packets']} packets ({rate['profile']})")
+
+    snmp = data.get('snmp')
+    if snmp:
+        print(f"  SNMP: {snmp['requests']} requests ({snmp.get('bulk_requests', 0)} GETBULK), "
+              f"{snmp.get('errors', 0)} errors")
+        if 'agents' in snmp:
+            print(f"  SNMP poll: {snmp['agents']}/{snmp['devices']} agents in {snmp['poll_s']}s, "
+                  f"{snmp['deadline_exceeded']} over the deadline")
+
+    hosts = data['hosts']
+    for key in ('port_scan_ms', 'dns_ms', 'ping_ms'):
+        ranked = sorted(((ip, h[key]) for ip, h in hosts.items() if h.get(key) is not None),
+                        key=lambda x: x[1], reverse=True)[:5]
+        if ranked:
+            print(f"\n  Slowest by {key}:")
+            for ip, value in ranked:
+                print(f"    {ip:15} | {value:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
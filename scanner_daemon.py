@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Scanner Daemon - ONE long-running UltraScanner process
+
+Instead of server.js spawning `python3 ultra_scanner.py` every cycle:
+- Internal scheduler (scan every N seconds)
+- Warm state between cycles (vendor table, caches, previous results)
+- Scan triggers over a local Unix socket
+
+Protocol (one JSON object per line):
+    -> {"cmd": "scan"}      <- {"success": true, "devices": 12, ...}
+    -> {"cmd": "status"}    <- {"success": true, "scans": 42, ...}
+    -> {"cmd": "stop"}      <- {"success": true}
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+DEFAULT_SOCKET = '/tmp/netmon-scanner.sock'
+EXIT_SOCKET_IN_USE = 3   # exit code: another daemon owns the socket (server.js does not restart)
+
+
+class _TriggerHandler(socketserver.StreamRequestHandler):
+    """One request line -> one reply line"""
+
+    def handle(self):
+        line = self.rfile.readline(4096).decode('utf-8', 'replace').strip()
+        try:
+            request = json.loads(line) if line.startswith('{') else {'cmd': line or 'status'}
+        except ValueError:
+            request = {'cmd': 'invalid'}
+
+        reply = self.server.daemon.handle_command(request.get('cmd', ''), request)
+        self.wfile.write((json.dumps(reply) + '\n').encode('utf-8'))
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def socket_in_use(path: str) -> bool:
+    """True if a daemon answers on `path` (a leftover socket file refuses connections)"""
+    try:
+        send_command('status', path, timeout=2)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return False
+    except (OSError, ValueError):
+        return True  # exists but busy or garbled - do not take it over
+    return True
+
+
+class ScannerDaemon:
+    """
+    Keeps one UltraScanner warm and scans on schedule or on demand
+    """
+
+    def __init__(self, scanner, interval: float = 30,
+                 socket_path: str = DEFAULT_SOCKET,
+                 output_file: str = 'network_data.json'):
+        self.scanner = scanner
+        self.interval = interval
+        self.socket_path = socket_path
+        self.output_file = output_file
+
+        self._trigger = threading.Event()
+        self._stop = threading.Event()
+        self._done = threading.Condition()
+        self._generation = 0
+        self._scanning = False
+        self._server = None
+        self._socket_id = None    # (st_dev, st_ino) of the socket file this process bound
+
+        self.last_result = {}
+        self.started_at = datetime.now().isoformat()
+
+    def _run_cycle(self) -> Dict:
+        """One scan with the warm scanner"""
+        start = time.time()
+        try:
+            devices = self.scanner.full_scan()
+            self.scanner.print_summary()
+            self.scanner.export_results(self.output_file)
+            result = {
+                'success': True,
+                'devices': len(devices),
+                'duration_s': round(time.time() - start, 2),
+                'finished_at': datetime.now().isoformat(),
+            }
+        except Exception as e:
+            print(f"⚠️  Scan cycle failed: {e}")
+            result = {
+                'success': False,
+                'error': str(e),
+                'duration_s': round(time.time() - start, 2),
+                'finished_at': datetime.now().isoformat(),
+            }
+        return result
+
+    def _scheduler(self):
+        """Scan every interval - or earlier when triggered"""
+        while not self._stop.is_set():
+            with self._done:
+                self._scanning = True
+            result = self._run_cycle()
+            with self._done:
+                self._scanning = False
+                self._generation += 1
+                self.last_result = result
+                self._done.notify_all()
+
+            self._trigger.wait(self.interval)
+            self._trigger.clear()
+
+    def request_scan(self, timeout: Optional[float] = 300) -> Dict:
+        """Trigger a scan and wait until a FRESH one has finished"""
+        with self._done:
+            # A scan already running started before this request
+            target = self._generation + (2 if self._scanning else 1)
+            self._trigger.set()
+            finished = self._done.wait_for(
+                lambda: self._generation >= target or self._stop.is_set(),
+                timeout
+            )
+            if not finished:
+                return {'success': False, 'error': 'scan timeout'}
+            return dict(self.last_result)
+
+    def status(self) -> Dict:
+        with self._done:
+            return {
+                'success': True,
+                'scanning': self._scanning,
+                'scans': self._generation,
+                'interval_s': self.interval,
+                'started_at': self.started_at,
+                'last_result': dict(self.last_result),
+                'devices_known': len(self.scanner.devices),
+            }
+
+    def handle_command(self, cmd: str, request: Dict) -> Dict:
+        if cmd == 'scan':
+            return self.request_scan()
+        elif cmd == 'status':
+            return self.status()
+        elif cmd == 'stop':
+            self.stop()
+            return {'success': True}
+        return {'success': False, 'error': f'unknown command: {cmd}'}
+
+    def _start_socket(self) -> bool:
+        """False if another daemon already answers on the socket"""
+        if os.path.exists(self.socket_path):
+            if socket_in_use(self.socket_path):
+                return False
+            os.unlink(self.socket_path)  # stale socket from a previous run
+
+        self._server = _UnixServer(self.socket_path, _TriggerHandler)
+        self._server.daemon = self
+        os.chmod(self.socket_path, 0o660)
+        info = os.stat(self.socket_path)
+        self._socket_id = (info.st_dev, info.st_ino)
+
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+        return True
+
+    def _remove_socket(self):
+        """Unlink the socket file - only if it is still the one this process created"""
+        try:
+            info = os.stat(self.socket_path)
+        except FileNotFoundError:
+            return
+        if (info.st_dev, info.st_ino) == self._socket_id:
+            os.unlink(self.socket_path)
+
+    def stop(self):
+        self._stop.set()
+        self._trigger.set()
+        with self._done:
+            self._done.notify_all()
+
+    def run(self) -> bool:
+        """Blocking: socket server + scheduler until stopped (False: another daemon runs)"""
+        if not self._start_socket():
+            print(f"❌ Another scanner daemon is running on {self.socket_path}")
+            return False
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        print(f"🛰️  Scanner daemon listening on {self.socket_path} "
+              f"(interval {self.interval:g}s)")
+
+        scheduler = threading.Thread(target=self._scheduler, daemon=True)
+        scheduler.start()
+
+        try:
+            while not self._stop.is_set():
+                self._stop.wait(1)
+        finally:
+            self._server.shutdown()
+            self._server.server_close()
+            self._remove_socket()
+            print("👋 Scanner daemon stopped")
+        return True
+
+
+def send_command(cmd: str = 'scan', socket_path: str = DEFAULT_SOCKET,
+                 timeout: float = 300) -> Dict:
+    """Client helper: send one command to a running daemon"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps({'cmd': cmd}) + '\n').encode('utf-8'))
+        reply = sock.makefile('r').readline()
+    return json.loads(reply)
+
+
+def main():
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else 'status'
+    socket_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_SOCKET
+    try:
+        print(json.dumps(send_command(cmd, socket_path), indent=2))
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ No scanner daemon on {socket_path}")
+        print("   Start with: python3 ultra_scanner.py --daemon")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@
  * - WebSocket for real-time updates
  * - Auto-reload on network_data.json changes
  * - REST API endpoints
+ * - Long-running scanner daemon (no Python startup per scan cycle)
  */
 
 const express = require('express');
@@ -13,6 +14,7 @@ const WebSocket = require('ws');
 const http = require('http');
 const fs = require('fs');
 const path = require('path');
+const net = require('net');
 const { spawn } = require('child_process');
 const chokidar = require('chokidar');
 const cors = require('cors');
@@ -23,6 +25,11 @@ const wss = new WebSocket.Server({ server });
 
 const PORT = process.env.PORT || 3000;
 const SCAN_INTERVAL = process.env.SCAN_INTERVAL || 30000; // 30 seconds
+const SCANNER_SOCKET = process.env.SCANNER_SOCKET || '/tmp/netmon-scanner.sock';
+const USE_SCANNER_DAEMON = process.env.SCANNER_DAEMON !== 'false';
+const SCANNER_SOCKET_IN_USE = 3; // ultra_scanner.py --daemon exit code: another daemon owns the socket
+const DAEMON_RESTART_MIN = 5000;
+const DAEMON_RESTART_MAX = 300000;
 
 // Middleware
 app.use(cors());
@@ -85,14 +92,21 @@ function sendNetworkData(target = null) {
 }
 
 // Watch network_data.json for changes
+// Scanners replace the file atomically (temp file + rename) and skip the
+// write when nothing changed - every event here is a complete, new snapshot
 const watcher = chokidar.watch('network_data.json', {
-    ignoreInitial: true
+    ignoreInitial: true,
+    atomic: true
 });
 
-watcher.on('change', (filepath) => {
+function onNetworkDataChanged() {
     console.log('🔄 Network data updated, broadcasting to clients...');
     sendNetworkData();
-});
+}
+
+// A rename over the file can be reported as 'add' instead of 'change'
+watcher.on('add', onNetworkDataChanged);
+watcher.on('change', onNetworkDataChanged);
 
 // REST API Endpoints
 
@@ -107,7 +121,9 @@ app.get('/api', (req, res) => {
             'GET /api/device/:ip': 'Get specific device by IP',
             'GET /api/stats': 'Get summary statistics',
             'POST /api/scan': 'Trigger manual scan',
-            'GET /api/health': 'Server health check'
+            'GET /api/health': 'Server health check',
+            'GET /api/telemetry': 'Per-phase and per-host timings of the last scan',
+            'GET /metrics': 'Prometheus metrics of the last scan'
         },
         examples: {
             network: `${req.protocol}://${req.get('host')}/api/network`,
@@ -137,6 +153,47 @@ app.get('/api/network', (req, res) => {
 app.post('/api/scan', (req, res) => {
     console.log('🔍 Manual scan triggered...');
     
+    // Preferred: ask the running scanner daemon (warm state, no startup cost)
+    sendScannerCommand('scan')
+        .then((reply) => {
+            if (reply.success) {
+                console.log('✅ Scan completed successfully (daemon)');
+                res.json({
+                    success: true,
+                    message: 'Scan completed',
+                    result: reply
+                });
+            } else {
+                console.error('❌ Scan failed:', reply.error);
+                res.status(500).json({
+                    success: false,
+                    error: reply.error || 'Scan failed'
+                });
+            }
+        })
+        .catch((error) => {
+            // No daemon listening: one-shot scanner instead
+            if (error.code === 'ENOENT' || error.code === 'ECONNREFUSED') {
+                spawnManualScan(res);
+            } else if (error.code === 'ETIMEDOUT') {
+                // Daemon busy - its scan keeps running, chokidar broadcasts the result
+                console.error('⏳ Scanner daemon did not answer in time');
+                res.status(504).json({
+                    success: false,
+                    error: 'Scanner daemon timeout (scan still running)'
+                });
+            } else {
+                console.error('❌ Scanner daemon error:', error.message);
+                res.status(502).json({
+                    success: false,
+                    error: error.message
+                });
+            }
+        });
+});
+
+// Fallback: one-shot scanner process
+function spawnManualScan(res) {
     const scanProcess = spawn('python3', ['ultra_scanner.py']);
     
     let output = '';
@@ -170,7 +227,7 @@ app.post('/api/scan', (req, res) => {
             });
         }
     });
-});
+}
 
 // Get device by IP
 app.get('/api/device/:ip', (req, res) => {
@@ -212,6 +269,24 @@ app.get('/api/stats', (req, res) => {
     }
 });
 
+// Scan telemetry (written by the scanner next to network_data.json)
+app.get('/api/telemetry', (req, res) => {
+    const telemetryPath = path.join(__dirname, 'network_data.telemetry.json');
+    if (!fs.existsSync(telemetryPath)) {
+        return res.status(404).json({ error: 'Telemetry not found' });
+    }
+    res.type('application/json').send(fs.readFileSync(telemetryPath, 'utf8'));
+});
+
+// Prometheus text exposition
+app.get('/metrics', (req, res) => {
+    const promPath = path.join(__dirname, 'network_data.prom');
+    if (!fs.existsSync(promPath)) {
+        return res.status(404).type('text/plain').send('# no scan telemetry yet\n');
+    }
+    res.type('text/plain; version=0.0.4').send(fs.readFileSync(promPath, 'utf8'));
+});
+
 // Health check
 app.get('/api/health', (req, res) => {
     res.json({ 
@@ -222,12 +297,84 @@ app.get('/api/health', (req, res) => {
     });
 });
 
+// Scanner daemon (ultra_scanner.py --daemon)
+let scannerDaemon = null;
+let shuttingDown = false;
+let daemonRestartDelay = DAEMON_RESTART_MIN;
+
+function startScannerDaemon() {
+    const intervalSec = String(SCAN_INTERVAL / 1000);
+    const startedAt = Date.now();
+    console.log(`🛰️  Starting scanner daemon: every ${intervalSec}s, socket ${SCANNER_SOCKET}`);
+    
+    scannerDaemon = spawn('python3', [
+        'ultra_scanner.py', '--daemon',
+        '--interval', intervalSec,
+        '--socket', SCANNER_SOCKET
+    ]);
+    
+    scannerDaemon.stdout.on('data', (data) => {
+        console.log(data.toString().trim());
+    });
+    
+    scannerDaemon.stderr.on('data', (data) => {
+        console.error(data.toString().trim());
+    });
+    
+    scannerDaemon.on('close', (code) => {
+        scannerDaemon = null;
+        if (shuttingDown) return;
+        if (code === SCANNER_SOCKET_IN_USE) {
+            // Another daemon answers on the socket - /api/scan talks to that one
+            console.log(`ℹ️  Scanner daemon already running on ${SCANNER_SOCKET}, not starting another`);
+            return;
+        }
+        // Crash loop: double the delay up to 5 min, reset after a minute of uptime
+        if (Date.now() - startedAt > 60000) daemonRestartDelay = DAEMON_RESTART_MIN;
+        console.error(`❌ Scanner daemon exited (${code}), restarting in ${daemonRestartDelay / 1000}s...`);
+        setTimeout(startScannerDaemon, daemonRestartDelay);
+        daemonRestartDelay = Math.min(daemonRestartDelay * 2, DAEMON_RESTART_MAX);
+    });
+}
+
+// Send one command to the daemon's Unix socket
+function sendScannerCommand(cmd, timeoutMs = 300000) {
+    return new Promise((resolve, reject) => {
+        const client = net.createConnection(SCANNER_SOCKET);
+        let reply = '';
+        
+        client.setTimeout(timeoutMs);
+        client.on('connect', () => client.write(JSON.stringify({ cmd }) + '\n'));
+        client.on('data', (data) => { reply += data.toString(); });
+        client.on('end', () => {
+            try {
+                resolve(JSON.parse(reply));
+            } catch (error) {
+                reject(error);
+            }
+        });
+        client.on('timeout', () => {
+            client.destroy();
+            const error = new Error('Scanner daemon timeout');
+            error.code = 'ETIMEDOUT';
+            reject(error);
+        });
+        client.on('error', reject);
+    });
+}
+
 // Auto-scan function
 let scanTimer = null;
 
 function startAutoScan() {
     console.log(`⏱️  Auto-scan enabled: every ${SCAN_INTERVAL/1000}s`);
     
+    // Daemon schedules its own scans; chokidar broadcasts the results
+    if (USE_SCANNER_DAEMON) {
+        startScannerDaemon();
+        return;
+    }
+    
     // Initial scan
     runScan();
     
@@ -261,7 +408,9 @@ function runScan() {
 // Graceful shutdown
 process.on('SIGTERM', () => {
     console.log('👋 Shutting down gracefully...');
+    shuttingDown = true;
     if (scanTimer) clearInterval(scanTimer);
+    if (scannerDaemon) scannerDaemon.kill('SIGTERM');
     watcher.close();
     server.close(() => {
         console.log('Server closed');
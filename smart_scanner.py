@@ -7,22 +7,39 @@ KEINE hardcodierten Device-Listen oder Fake-Metriken!
 
 import json
 import subprocess
-import socket
 import struct
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import ipaddress
 
-# SNMP (optional)
-try:
-    from pysnmp.hlapi import *
-    SNMP_AVAILABLE = True
-except ImportError:
-    SNMP_AVAILABLE = False
+from pinger import get_pinger
+from export_writer import atomic_write, write_snapshot
+from oui_db import get_oui_db
+from dns_resolver import get_resolver
+from network_ranges import local_network
+from lazy_imports import is_available
+from rate_governor import describe, get_governor, use_profile
+from snmp_session import get_snmp_pool
+from snmp_poller import DEFAULT_DEADLINE, DEFAULT_IN_FLIGHT, SWEEP_TIMEOUT, SnmpPoller
+from scan_telemetry import ScanTelemetry
+
+# SNMP (optional) - pysnmp wird erst beim ersten SNMP-Request geladen
+SNMP_AVAILABLE = is_available('pysnmp')
+if not SNMP_AVAILABLE:
     print("💡 Tipp: Installiere pysnmp für erweiterte Features")
     print("   pip3 install pysnmp --break-system-packages")
 
+# ifTable-Spalten der Interface-Liste - ifIndex bestimmt, welche Zeilen es gibt
+IF_TABLE_COLUMNS = {
+    'index': '1.3.6.1.2.1.2.2.1.1',
+    'ifDescr': '1.3.6.1.2.1.2.2.1.2',
+    'ifSpeed': '1.3.6.1.2.1.2.2.1.5',
+    'ifOperStatus': '1.3.6.1.2.1.2.2.1.8',
+    'ifInOctets': '1.3.6.1.2.1.2.2.1.10',
+    'ifOutOctets': '1.3.6.1.2.1.2.2.1.16',
+}
+
 
 class SmartScanner:
     """
@@ -34,12 +51,20 @@ class SmartScanner:
     
     def __init__(self, network_range: str = None, 
                  snmp_community: str = "public",
-                 cache_file: str = "discovered_devices.json"):
+                 cache_file: str = "discovered_devices.json",
+                 snmp_parallel: int = DEFAULT_IN_FLIGHT,
+                 snmp_deadline: float = DEFAULT_DEADLINE,
+                 snmp_sweep_timeout: float = SWEEP_TIMEOUT):
         self.network_range = network_range or self._detect_network_range()
         self.snmp_community = snmp_community
+        self.snmp_parallel = snmp_parallel      # Geräte gleichzeitig im SNMP-Walk
+        self.snmp_deadline = snmp_deadline      # Sekunden pro Gerät
+        self.snmp_sweep_timeout = snmp_sweep_timeout  # Sekunden pro Versuch im Agenten-Sweep
         self.cache_file = cache_file
         self.devices = {}
         self.device_cache = self._load_cache()
+        self.telemetry = ScanTelemetry()
+        self.scan_stats = {}
         
         # MIB Database laden (wenn vorhanden)
         self.mib_db = self._load_mib_database()
@@ -50,15 +75,8 @@ class SmartScanner:
         KEINE hardcodierte Range!
         """
         try:
-            # Hole lokale IP
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-            
-            # Konvertiere zu /24 Network
-            ip_parts = local_ip.split('.')
-            network = f"{ip_parts[0]}.{ip_parts[1]}.{ip_parts[2]}.0/24"
+            # Netzwerk der lokalen IP mit echtem Präfix (/20, /21, ... statt immer /24)
+            network = local_network()
             
             print(f"🔍 Auto-erkanntes Netzwerk: {network}")
             return network
@@ -79,8 +97,7 @@ class SmartScanner:
     
     def _save_cache(self):
         """Speichert erkannte Devices für zukünftige Scans"""
-        with open(self.cache_file, 'w') as f:
-            json.dump(self.device_cache, f, indent=2)
+        atomic_write(self.cache_file, json.dumps(self.device_cache, indent=2))
         print(f"💾 Device-Cache gespeichert: {self.cache_file}")
     
     def _load_mib_database(self) -> Dict:
@@ -117,12 +134,13 @@ class SmartScanner:
             print(f"✅ Ping-Sweep: {len(ping_devices)} Geräte gefunden")
         
         # Methode 3: Check Cache für bekannte Geräte
-        for ip, cached_info in self.device_cache.items():
-            if ip not in discovered:
-                # Teste ob noch online
-                if self._is_alive(ip):
-                    discovered[ip] = cached_info
-                    discovered[ip]['from_cache'] = True
+        # Teste ob noch online - ein Batch-Ping für alle
+        missing = [ip for ip in self.device_cache if ip not in discovered]
+        alive = get_pinger().ping_many(missing, timeout=1.0) if missing else {}
+        for ip in missing:
+            if alive[ip]['alive']:
+                discovered[ip] = self.device_cache[ip]
+                discovered[ip]['from_cache'] = True
         
         return discovered
     
@@ -130,9 +148,15 @@ class SmartScanner:
         """ARP-Scan für schnelle Discovery"""
         devices = {}
         try:
-            # Versuche arp-scan
+            # Versuche arp-scan (Paket-Abstand aus dem gemeinsamen Rate-Budget)
+            command = ['arp-scan', '--localnet', '--quiet']
+            governor = get_governor()
+            if governor.pps:
+                command.append(f"--interval={max(1, int(governor.interval() * 1e6))}u")
+            governor.record(ipaddress.ip_network(self.network_range, strict=False).num_addresses,
+                            'arp')
             result = subprocess.run(
-                ['arp-scan', '--localnet', '--quiet'],
+                command,
                 capture_output=True,
                 text=True,
                 timeout=30
@@ -146,6 +170,8 @@ class SmartScanner:
                     if self._is_valid_ip(ip):
                         devices[ip] = {
                             'mac': mac,
+                            # 'vendor' ist der SNMP-Vendor, MAC-Hersteller separat
+                            'mac_vendor': get_oui_db().lookup(mac) or 'Unknown',
                             'hostname': self._resolve_hostname(ip),
                             'discovery_method': 'arp'
                         }
@@ -161,65 +187,44 @@ class SmartScanner:
         
         try:
             network = ipaddress.ip_network(self.network_range)
+            hosts = [str(ip) for ip in network.hosts()]
             
-            print("⏳ Ping-Sweep läuft (kann 1-2 Min dauern)...")
-            print("   💡 Tipp: Drücke Ctrl+C zum Abbrechen")
+            print(f"⏳ Ping-Sweep läuft ({len(hosts)} IPs, ein ICMP-Batch)...")
             
-            count = 0
-            total = 0
+            results = get_pinger().ping_many(hosts, timeout=1.0)
             
-            for ip in network.hosts():
-                ip_str = str(ip)
-                total += 1
-                
-                # Progress indicator every 20 IPs
-                if total % 20 == 0:
-                    print(f"   Scanne... {total}/254 IPs ({count} gefunden)", end='\r')
-                
-                # Timeout protection - max 100 IPs to scan
-                if total > 100:
-                    print(f"\n   ⚠️  Scan limitiert auf erste 100 IPs (Performance)")
-                    break
-                
-                if self._is_alive(ip_str):
+            # PTR-Lookups aller aktiven Hosts parallel (füllt den Cache)
+            get_resolver().resolve_many(ip for ip in hosts if results[ip]['alive'])
+            
+            count = 0
+            for ip_str in hosts:
+                if results[ip_str]['alive']:
                     devices[ip_str] = {
                         'hostname': self._resolve_hostname(ip_str),
                         'discovery_method': 'ping'
                     }
                     count += 1
-                    print(f"   ✅ Gefunden: {ip_str} ({count} total)         ")
+                    print(f"   ✅ Gefunden: {ip_str} ({count} total)")
             
-            print(f"\n   Scan abgeschlossen: {count} Geräte in {total} IPs")
+            print(f"\n   Scan abgeschlossen: {count} Geräte in {len(hosts)} IPs")
                 
         except KeyboardInterrupt:
-            print(f"\n\n⚠️  Scan abgebrochen! {count} Geräte gefunden bis jetzt.")
+            print(f"\n\n⚠️  Scan abgebrochen! {len(devices)} Geräte gefunden bis jetzt.")
         except Exception as e:
             print(f"⚠️  Ping-Sweep Error: {e}")
         
         return devices
     
     def _is_alive(self, ip: str, timeout: int = 1) -> bool:
-        """Prüft ob Host antwortet"""
+        """Prüft ob Host antwortet (In-Process ICMP)"""
         try:
-            # Use faster ping with strict timeout
-            result = subprocess.run(
-                ['ping', '-c', '1', '-W', '1', ip],
-                capture_output=True,
-                timeout=2,  # Hard timeout after 2 seconds
-                check=False
-            )
-            return result.returncode == 0
-        except subprocess.TimeoutExpired:
-            return False
+            return get_pinger().is_alive(ip, timeout=timeout)
         except Exception:
             return False
     
     def _resolve_hostname(self, ip: str) -> str:
-        """Resolves Hostname via DNS"""
-        try:
-            return socket.gethostbyaddr(ip)[0]
-        except:
-            return f"device-{ip.split('.')[-1]}"
+        """Resolves Hostname via PTR (gemeinsamer Resolver mit Cache)"""
+        return get_resolver().resolve(ip) or f"device-{ip.split('.')[-1]}"
     
     def _is_valid_ip(self, ip: str) -> bool:
         """Validiert IP-Adresse"""
@@ -254,6 +259,10 @@ class SmartScanner:
             # 1. System Information
             sys_info = self._snmp_walk_system(ip)
             device_info.update(sys_info)
+            if not sys_info:
+                print(f"⚪ {ip}: keine Antwort auf die System-MIB")
+                device_info['snmp_available'] = False
+                return device_info
             
             # 2. Vendor Detection via SNMP
             vendor = self._detect_vendor_snmp(sys_info)
@@ -263,9 +272,12 @@ class SmartScanner:
             device_type = self._detect_device_type_snmp(ip, vendor)
             device_info['type'] = device_type
             
-            # 4. Interface Discovery
+            # 4. Interface Discovery (Round-Trips für die Telemetrie)
+            requests = get_snmp_pool().requests_to(ip)
             interfaces = self._snmp_walk_interfaces(ip)
             device_info['interfaces'] = interfaces
+            self.telemetry.host(ip, snmp_if_requests=get_snmp_pool().requests_to(ip) - requests,
+                                interfaces=len(interfaces))
             
             # 5. Performance Metrics (wenn verfügbar)
             metrics = self._snmp_get_metrics(ip, vendor, device_type)
@@ -296,8 +308,8 @@ class SmartScanner:
             'sysLocation': '1.3.6.1.2.1.1.6.0'
         }
         
-        for key, oid in system_oids.items():
-            value = self._snmp_get(ip, oid)
+        # Alle sechs OIDs in einem GET-Request
+        for key, value in self._snmp_get_many(ip, system_oids).items():
             if value:
                 info[key] = value
         
@@ -345,66 +357,59 @@ class SmartScanner:
     def _detect_device_type_snmp(self, ip: str, vendor: str) -> str:
         """
         Erkennt Device-Type via SNMP-Walk
-        Prüft verfügbare MIBs und Features
+        Prüft verfügbare MIBs und Features (ein GET-Request für alle Tests)
         """
+        probe = self._snmp_get_many(ip, {
+            'wireless': '1.3.6.1.4.1.41112.1.6.1.2.1.15',   # UniFi clientCount
+            'ip_forward': '1.3.6.1.2.1.4.1.0',
+            'bridge': '1.3.6.1.2.1.17.1.1.0',                # dot1dBaseBridgeAddress
+            'if_count': '1.3.6.1.2.1.2.1.0',
+        })
+        
         # Prüfe auf Wireless-Features
-        if self._has_wireless_mib(ip):
+        if self._has_wireless_mib(probe):
             return 'wlan_ap'
         
         # Prüfe auf Routing-Features
-        if self._has_routing_mib(ip):
+        if self._has_routing_mib(probe):
             return 'router'
         
         # Prüfe auf Switching-Features
-        if self._has_switching_mib(ip):
+        if self._has_switching_mib(probe):
             return 'switch'
         
         # Prüfe Interface-Count (viele = Switch)
-        if_count = self._snmp_get(ip, '1.3.6.1.2.1.2.1.0')
+        if_count = probe['if_count']
         if if_count and int(if_count) > 10:
             return 'switch'
         
         return 'unknown'
     
-    def _has_wireless_mib(self, ip: str) -> bool:
+    def _has_wireless_mib(self, probe: Dict) -> bool:
         """Prüft ob Wireless-MIB vorhanden"""
-        # Check für UniFi Wireless OID
-        test_oid = '1.3.6.1.4.1.41112.1.6.1.2.1.15'  # clientCount
-        return self._snmp_get(ip, test_oid) is not None
-    
-    def _has_routing_mib(self, ip: str) -> bool:
-        """Prüft ob Routing-MIB vorhanden"""
-        # Check IP Forwarding
-        ip_forward = self._snmp_get(ip, '1.3.6.1.2.1.4.1.0')
-        return ip_forward == '1' if ip_forward else False
-    
-    def _has_switching_mib(self, ip: str) -> bool:
-        """Prüft ob Switching-MIB vorhanden"""
-        # Check für Bridge MIB
-        test_oid = '1.3.6.1.2.1.17.1.1.0'  # dot1dBaseBridgeAddress
-        return self._snmp_get(ip, test_oid) is not None
+        return probe['wireless'] is not None
+    
+    def _has_routing_mib(self, probe: Dict) -> bool:
+        """Prüft ob Routing-MIB vorhanden (IP Forwarding)"""
+        return probe['ip_forward'] == '1'
+    
+    def _has_switching_mib(self, probe: Dict) -> bool:
+        """Prüft ob Switching-MIB vorhanden (Bridge MIB)"""
+        return probe['bridge'] is not None
     
     def _snmp_walk_interfaces(self, ip: str) -> List[Dict]:
         """
         Walk Interface Table - findet ALLE Interfaces dynamisch
         Erkennt automatisch 10G Uplinks!
+        Alle Spalten parallel per GETBULK, Zeilen über den ifIndex verbunden
+        (statt ifIndex-Walk + 5 GETs pro Interface)
         """
         interfaces = []
         
-        # Walk ifTable
-        if_indices = self._snmp_walk(ip, '1.3.6.1.2.1.2.2.1.1')  # ifIndex
-        
-        for if_index_oid, if_index in if_indices.items():
-            index = if_index
-            
-            interface = {
-                'index': index,
-                'ifDescr': self._snmp_get(ip, f'1.3.6.1.2.1.2.2.1.2.{index}'),
-                'ifSpeed': self._snmp_get(ip, f'1.3.6.1.2.1.2.2.1.5.{index}'),
-                'ifOperStatus': self._snmp_get(ip, f'1.3.6.1.2.1.2.2.1.8.{index}'),
-                'ifInOctets': self._snmp_get(ip, f'1.3.6.1.2.1.2.2.1.10.{index}'),
-                'ifOutOctets': self._snmp_get(ip, f'1.3.6.1.2.1.2.2.1.16.{index}')
-            }
+        for row in self._snmp_walk_table(ip, IF_TABLE_COLUMNS):
+            if row['index'] is None:
+                continue  # nur Zeilen mit ifIndex, wie im ifIndex-Walk
+            interface = dict(row)
             
             # Berechne Speed in Mbps
             if interface['ifSpeed']:
@@ -445,26 +450,16 @@ class SmartScanner:
         vendor_oids = self.mib_db.get('vendors', {}).get(vendor, {}).get('oids', {})
         perf_oids = vendor_oids.get('performance', {})
         
-        # CPU
-        cpu_oid = perf_oids.get('cpu_usage') or perf_oids.get('cpu_5sec')
-        if cpu_oid:
-            cpu = self._snmp_get(ip, cpu_oid)
-            if cpu:
-                metrics['cpu_usage'] = float(cpu)
-        
-        # Memory
-        mem_oid = perf_oids.get('memory_usage')
-        if mem_oid:
-            mem = self._snmp_get(ip, mem_oid)
-            if mem:
-                metrics['memory_usage'] = float(mem)
-        
-        # Temperature
-        temp_oid = perf_oids.get('temperature')
-        if temp_oid:
-            temp = self._snmp_get(ip, temp_oid)
-            if temp:
-                metrics['temperature'] = float(temp)
+        # CPU, Memory, Temperature - ein GET-Request
+        wanted = {
+            'cpu_usage': perf_oids.get('cpu_usage') or perf_oids.get('cpu_5sec'),
+            'memory_usage': perf_oids.get('memory_usage'),
+            'temperature': perf_oids.get('temperature'),
+        }
+        values = self._snmp_get_many(ip, {k: oid for k, oid in wanted.items() if oid})
+        for key, value in values.items():
+            if value:
+                metrics[key] = float(value)
         
         # Router-spezifisch: Uplink-Berechnung
         if device_type == 'router':
@@ -501,16 +496,18 @@ class SmartScanner:
         in_oid = f'1.3.6.1.2.1.2.2.1.10.{uplink_index}'
         out_oid = f'1.3.6.1.2.1.2.2.1.16.{uplink_index}'
         
-        # Erste Messung
-        in1 = int(self._snmp_get(ip, in_oid) or 0)
-        out1 = int(self._snmp_get(ip, out_oid) or 0)
+        counters = {'in': in_oid, 'out': out_oid}
+        
+        # Erste Messung (In + Out in einem Request)
+        first = self._snmp_get_many(ip, counters)
+        in1, out1 = int(first['in'] or 0), int(first['out'] or 0)
         time1 = time.time()
         
         time.sleep(2)  # Warte 2 Sekunden
         
         # Zweite Messung
-        in2 = int(self._snmp_get(ip, in_oid) or 0)
-        out2 = int(self._snmp_get(ip, out_oid) or 0)
+        second = self._snmp_get_many(ip, counters)
+        in2, out2 = int(second['in'] or 0), int(second['out'] or 0)
         time2 = time.time()
         
         # Berechnung
@@ -540,8 +537,7 @@ class SmartScanner:
             wireless_oids = self.mib_db.get('vendors', {}).get('ubiquiti', {}).get('oids', {}).get('wireless', {})
             
             wireless_data = {}
-            for key, oid in wireless_oids.items():
-                value = self._snmp_get(ip, oid)
+            for key, value in self._snmp_get_many(ip, wireless_oids).items():
                 if value:
                     try:
                         wireless_data[key] = int(value)
@@ -556,45 +552,58 @@ class SmartScanner:
     def _measure_ping_time(self, ip: str) -> float:
         """Misst Ping-Zeit"""
         try:
-            result = subprocess.run(
-                ['ping', '-c', '1', ip],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            
-            # Parse ping time
-            import re
-            match = re.search(r'time=([\d.]+)', result.stdout)
-            if match:
-                return float(match.group(1))
+            rtt = get_pinger().ping(ip, timeout=2.0)
+            if rtt is not None:
+                return rtt
         except:
             pass
         return 0.0
     
     def _snmp_get(self, ip: str, oid: str) -> Optional[str]:
-        """SNMP GET"""
+        """SNMP GET (gemeinsame Engine, Transport pro Gerät)"""
         if not SNMP_AVAILABLE:
             return None
         
         try:
-            iterator = getCmd(
-                SnmpEngine(),
-                CommunityData(self.snmp_community, mpModel=1),
-                UdpTransportTarget((ip, 161), timeout=2),
-                ContextData(),
-                ObjectType(ObjectIdentity(oid))
-            )
-            
-            errorIndication, errorStatus, errorIndex, varBinds = next(iterator)
-            
-            if not errorIndication and not errorStatus:
-                for varBind in varBinds:
-                    return str(varBind[1])
+            return get_snmp_pool().get(ip, oid, self.snmp_community, timeout=2)
+        except:
+            return None
+    
+    def _snmp_get_many(self, ip: str, oids: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """Mehrere GETs in so wenigen PDUs wie der Agent annimmt -> {key: Wert oder None}"""
+        if not SNMP_AVAILABLE or not oids:
+            return dict.fromkeys(oids)
+        
+        try:
+            return get_snmp_pool().get_many(ip, oids, self.snmp_community, timeout=2)
+        except:
+            return dict.fromkeys(oids)
+    
+    def _snmp_walk_table(self, ip: str, columns: Dict[str, str]) -> List[Dict]:
+        """
+        Spalten einer Tabelle parallel walken -> Zeilen nach Index sortiert
+        {Spaltenname: Wert}, fehlende Zellen None
+        """
+        if not SNMP_AVAILABLE:
+            return []
+        
+        prefixes = {oid + '.': name for name, oid in columns.items()}
+        rows = {}
+        
+        try:
+            walk = get_snmp_pool().walk_columns(ip, list(columns.values()),
+                                                self.snmp_community, timeout=2)
+            for oid, value in walk:
+                for prefix, name in prefixes.items():
+                    if oid.startswith(prefix):
+                        row_index = oid[len(prefix):]
+                        rows.setdefault(row_index, dict.fromkeys(columns))[name] = value
+                        break
         except:
             pass
         
-        return None
+        order = sorted(rows, key=lambda i: tuple(int(arc) for arc in i.split('.')))
+        return [rows[row_index] for row_index in order]
     
     def _snmp_walk(self, ip: str, oid: str, max_results: int = 100) -> Dict:
         """SNMP WALK"""
@@ -602,28 +611,12 @@ class SmartScanner:
             return {}
         
         results = {}
-        count = 0
         
         try:
-            iterator = nextCmd(
-                SnmpEngine(),
-                CommunityData(self.snmp_community, mpModel=1),
-                UdpTransportTarget((ip, 161), timeout=2),
-                ContextData(),
-                ObjectType(ObjectIdentity(oid)),
-                lexicographicMode=False
-            )
-            
-            for errorIndication, errorStatus, errorIndex, varBinds in iterator:
-                if errorIndication or errorStatus:
+            for oid_str, value in get_snmp_pool().walk(ip, oid, self.snmp_community, timeout=2):
+                results[oid_str] = value
+                if len(results) >= max_results:
                     break
-                
-                for varBind in varBinds:
-                    results[str(varBind[0])] = str(varBind[1])
-                    count += 1
-                    
-                    if count >= max_results:
-                        return results
         except:
             pass
         
@@ -639,26 +632,22 @@ class SmartScanner:
         print("\n" + "="*60)
         print("🤖 SMART SCANNER - Zero Configuration")
         print("="*60)
+        print(f"Rate-Limit: {describe(get_governor())}")
+        get_governor().reset_stats()
+        get_snmp_pool().reset_stats()
+        self.telemetry = ScanTelemetry()
         
         # Phase 1: Discovery
-        discovered = self.discover_devices()
+        with self.telemetry.phase('discovery'):
+            discovered = self.discover_devices()
         print(f"\n📊 Phase 1: {len(discovered)} Geräte discovered")
         
         # Phase 2: SNMP Deep-Dive
+        poller = None
         if SNMP_AVAILABLE:
             print("\n📊 Phase 2: SNMP Deep-Dive...")
-            for ip, basic_info in discovered.items():
-                print(f"\n{'─'*60}")
-                print(f"Analysiere {ip} ({basic_info.get('hostname', 'Unknown')})")
-                
-                snmp_info = self.snmp_walk_device(ip)
-                
-                # Merge Informationen
-                device_complete = {**basic_info, **snmp_info}
-                self.devices[ip] = device_complete
-                
-                # Update Cache
-                self.device_cache[ip] = device_complete
+            with self.telemetry.phase('snmp'):
+                poller = self._snmp_phase(discovered)
         else:
             print("\n⚠️  SNMP nicht verfügbar - nur Basic Discovery")
             self.devices = discovered
@@ -666,8 +655,51 @@ class SmartScanner:
         # Phase 3: Save Cache
         self._save_cache()
         
+        rate = get_governor().stats()
+        snmp = dict(get_snmp_pool().stats)
+        self.telemetry.hosts_from_engine(get_snmp_pool().host_stats)
+        if poller is not None:
+            snmp.update(poller.stats)
+            self.telemetry.hosts_from_engine(poller.host_stats)
+        self.telemetry.finish()
+        self.scan_stats = {'rate': rate, 'snmp': snmp}
+        print(f"\n🚦 Probe-Rate: {rate['achieved_pps']:.0f} Pakete/s im Schnitt, "
+              f"{rate['peak_pps']} Spitze ({rate['packets']} Pakete)")
+        if snmp['requests']:
+            print(f"📡 SNMP: {snmp['requests']} Requests ({snmp['bulk_requests']} GETBULK)")
+        if poller is not None:
+            print(f"⏱️  SNMP-Poll: {snmp['agents']}/{snmp['devices']} Agenten in {snmp['poll_s']}s, "
+                  f"max. {snmp['max_in_flight']} gleichzeitig, "
+                  f"{snmp['deadline_exceeded']} über der Deadline")
+        
         return self.devices
     
+    def _snmp_phase(self, discovered: Dict[str, Dict]) -> SnmpPoller:
+        """
+        Alle Geräte gleichzeitig walken (SnmpPoller), Ergebnis in self.devices
+        und im Cache - Geräte ohne Agent (kein sysDescr) werden nicht gewalkt
+        """
+        print(f"📡 {len(discovered)} Geräte, max. {self.snmp_parallel} gleichzeitig, "
+              f"Deadline {self.snmp_deadline:g}s pro Gerät")
+        poller = SnmpPoller(self.snmp_community, self.snmp_parallel, self.snmp_deadline,
+                            sweep_timeout=self.snmp_sweep_timeout)
+        results = poller.poll(discovered, self.snmp_walk_device)
+        
+        for ip, basic_info in discovered.items():
+            snmp_info = results[ip] or {'snmp_available': False}
+            if poller.host_stats.get(ip, {}).get('snmp_deadline'):
+                print(f"⏱️  {ip}: Deadline überschritten - Ergebnis unvollständig")
+                snmp_info['snmp_deadline_exceeded'] = True
+            
+            # Merge Informationen
+            device_complete = {**basic_info, **snmp_info}
+            self.devices[ip] = device_complete
+            
+            # Update Cache
+            self.device_cache[ip] = device_complete
+        
+        return poller
+    
     def export_to_json(self, filename: str = 'network_data.json'):
         """Exportiert im kompatiblen Format"""
         output = {
@@ -680,10 +712,12 @@ class SmartScanner:
             'auto_discovered': True
         }
         
-        with open(filename, 'w') as f:
-            json.dump(output, f, indent=2)
-        
-        print(f"\n💾 Exportiert: {filename}")
+        if write_snapshot(filename, output):
+            print(f"\n💾 Exportiert: {filename}")
+        else:
+            print(f"\n💾 Unverändert: {filename}")
+        json_path, prom_path = self.telemetry.write(filename, self.scan_stats)
+        print(f"📈 Telemetry: {json_path}, {prom_path}")
         return filename
     
     def _generate_summary(self) -> Dict:
@@ -722,6 +756,11 @@ class SmartScanner:
 
 
 def main():
+    import sys
+    if '--startup-profile' in sys.argv:
+        from startup_profile import main as startup_profile
+        sys.exit(startup_profile([]))
+    
     print("="*70)
     print("🤖 SMART SCANNER V2 - Zero Configuration, No Hardcoding!")
     print("="*70)
@@ -736,15 +775,23 @@ def main():
     print("  ✅ KEINE hardcodierten Devices!")
     print()
     
-    # Optionale Parameter
-    import sys
-    network_range = sys.argv[1] if len(sys.argv) > 1 else None
-    community = sys.argv[2] if len(sys.argv) > 2 else "public"
+    # Optionale Parameter (--quiet: Rate-Profil 'gaming', leise während gespielt wird;
+    # --snmp-parallel=N Geräte gleichzeitig, --snmp-deadline=S Sekunden pro Gerät,
+    # --snmp-sweep-timeout=S Sekunden pro Versuch im Agenten-Sweep)
+    options = dict(arg[2:].partition('=')[::2] for arg in sys.argv[1:] if arg.startswith('--'))
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    if 'quiet' in options:
+        use_profile('gaming')
+    network_range = args[0] if len(args) > 0 else None
+    community = args[1] if len(args) > 1 else "public"
     
     # Scanner starten
     scanner = SmartScanner(
         network_range=network_range,
-        snmp_community=community
+        snmp_community=community,
+        snmp_parallel=int(options.get('snmp-parallel') or DEFAULT_IN_FLIGHT),
+        snmp_deadline=float(options.get('snmp-deadline') or DEFAULT_DEADLINE),
+        snmp_sweep_timeout=float(options.get('snmp-sweep-timeout') or SWEEP_TIMEOUT)
     )
     
     # Full Scan
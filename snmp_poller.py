@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+SNMP Poller - all devices of a scan polled at the same time
+
+full_scan used to walk one device after the other, and a host without an
+agent cost every GET its full timeout (x retries) before the next device
+got its turn:
+- Agent sweep first: one SNMPv2c GET sysDescr.0 per host from the UDP
+  probe engine (one socket, all hosts at once) - hosts that do not answer
+  are not polled at all
+- Agents are polled concurrently, at most `max_in_flight` at a time; the
+  event loop hands every device to a worker thread, requests of
+  different devices overlap on the engines of the SNMP pool
+- Per-device deadline: requests of a device stop `deadline` seconds
+  after its poll started (snmp_session retries are cut to what fits),
+  the poll returns whatever it collected until then
+- Per host: poll time and whether the deadline hit (-> scan telemetry)
+
+Usage:
+    poller = SnmpPoller(community='public', max_in_flight=32, deadline=30, sweep_timeout=2)
+    results = poller.poll(hosts, scanner.snmp_walk_device)   # {ip: result or None}
+"""
+
+import asyncio
+import concurrent.futures
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from snmp_session import get_snmp_pool
+from udp_engine import SNMP_PORT, UdpProbeEngine
+
+DEFAULT_IN_FLIGHT = 32
+DEFAULT_DEADLINE = 30.0    # seconds per device
+SWEEP_TIMEOUT = 2.0       # per try, same as the per-device GETs: slow agents stay in
+
+
+class SnmpPoller:
+    """
+    One instance per scan
+    poll() -> {ip: fn(ip)}, None for hosts without an agent or a failed poll
+    """
+
+    def __init__(self, community: str = 'public', max_in_flight: int = DEFAULT_IN_FLIGHT,
+                 deadline: float = DEFAULT_DEADLINE, sweep: bool = True,
+                 sweep_timeout: float = SWEEP_TIMEOUT):
+        self.community = community
+        self.max_in_flight = max(1, max_in_flight)
+        self.deadline = max(0.1, deadline)
+        self.sweep = sweep
+        self.sweep_timeout = sweep_timeout
+        self._in_flight = 0
+        self.stats = self._empty_stats()
+        self.host_stats: Dict[str, Dict] = {}     # ip -> {'snmp_ms', 'snmp_deadline'}
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            'devices': 0,
+            'agents': 0,               # answered the sweep
+            'polled': 0,
+            'deadline_exceeded': 0,
+            'failed': 0,
+            'max_in_flight': 0,
+            'sweep_s': 0.0,
+            'poll_s': 0.0,
+        }
+
+    async def _agents(self, hosts: list) -> list:
+        """Hosts whose agent answers GET sysDescr.0 (community checked by the agent)"""
+        if not self.sweep:
+            return hosts
+        start = time.perf_counter()
+        engine = UdpProbeEngine(timeout=self.sweep_timeout, community=self.community)
+        answered = await engine.scan_async(hosts, [SNMP_PORT])
+        self.stats['sweep_s'] = round(time.perf_counter() - start, 3)
+        return [ip for ip in hosts if answered.get(ip)]
+
+    def _poll_device(self, fn: Callable, ip: str):
+        """Worker thread: fn(ip) under the device deadline"""
+        start = time.perf_counter()
+        with get_snmp_pool().deadline(self.deadline) as state:
+            try:
+                return fn(ip)
+            finally:
+                self.host_stats[ip] = {
+                    'snmp_ms': round((time.perf_counter() - start) * 1000, 1),
+                    'snmp_deadline': state['expired'],
+                }
+
+    async def _poll_one(self, executor, sem: asyncio.Semaphore, fn: Callable, ip: str):
+        async with sem:
+            self._in_flight += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self._in_flight)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    executor, self._poll_device, fn, ip)
+            except Exception:
+                self.stats['failed'] += 1
+                return None
+            finally:
+                self._in_flight -= 1
+                self.stats['polled'] += 1
+
+    async def poll_async(self, hosts: Iterable[str], fn: Callable) -> Dict[str, Optional[object]]:
+        hosts = list(hosts)
+        self.stats['devices'] += len(hosts)
+        agents = await self._agents(hosts)
+        self.stats['agents'] += len(agents)
+
+        start = time.perf_counter()
+        results = dict.fromkeys(hosts)
+        if agents:
+            sem = asyncio.Semaphore(self.max_in_flight)
+            workers = min(self.max_in_flight, len(agents))
+            with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix='snmp') as executor:
+                polled = await asyncio.gather(*(self._poll_one(executor, sem, fn, ip) for ip in agents))
+            results.update(zip(agents, polled))
+
+        self.stats['poll_s'] = round(self.stats['poll_s'] + time.perf_counter() - start, 3)
+        self.stats['deadline_exceeded'] = sum(1 for h in self.host_stats.values() if h['snmp_deadline'])
+        return results
+
+    def poll(self, hosts: Iterable[str], fn: Callable) -> Dict[str, Optional[object]]:
+        """Blocking wrapper around poll_async"""
+        return asyncio.run(self.poll_async(hosts, fn))
@@ -10,11 +10,13 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import re
 
-try:
-    from pysnmp.hlapi import *
-    SNMP_AVAILABLE = True
-except ImportError:
-    SNMP_AVAILABLE = False
+from lazy_imports import is_available
+from snmp_session import SnmpError, get_snmp_pool
+from export_writer import atomic_write, write_snapshot
+
+# pysnmp wird erst beim ersten Request geladen
+SNMP_AVAILABLE = is_available('pysnmp')
+if not SNMP_AVAILABLE:
     print("⚠️  pysnmp nicht installiert. Installiere mit:")
     print("    pip3 install pysnmp --break-system-packages")
 
@@ -54,33 +56,41 @@ class SNMPScanner:
             return None
             
         try:
-            iterator = getCmd(
-                SnmpEngine(),
-                CommunityData(community, mpModel=1),  # SNMPv2c
-                UdpTransportTarget((host, port), timeout=timeout),
-                ContextData(),
-                ObjectType(ObjectIdentity(oid))
-            )
-            
-            errorIndication, errorStatus, errorIndex, varBinds = next(iterator)
-            
-            if errorIndication:
-                print(f"❌ SNMP Error: {errorIndication}")
-                return None
-            elif errorStatus:
-                print(f"❌ SNMP Error: {errorStatus.prettyPrint()}")
-                return None
-            else:
-                for varBind in varBinds:
-                    return str(varBind[1])
-                    
+            # Gemeinsame Engine, ein Transport pro Gerät (snmp_session)
+            return get_snmp_pool().get(host, oid, community, port=port, timeout=timeout)
+        except SnmpError as e:
+            print(f"❌ SNMP Error: {e}")
+            return None
         except Exception as e:
             print(f"❌ Exception bei SNMP GET {host}:{oid} - {e}")
             return None
     
+    def snmp_get_many(self, host: str, oids: Dict[str, str], community: str = "public",
+                      port: int = 161, timeout: int = 5) -> Dict[str, Optional[str]]:
+        """
+        Mehrere SNMP GETs in so wenigen Requests wie der Agent annimmt
+        
+        Args:
+            oids: {Name: OID}
+            
+        Returns:
+            {Name: Value} - None für OIDs, die der Agent nicht kennt
+            (noSuchObject / noSuchInstance) oder bei Fehler
+        """
+        if not SNMP_AVAILABLE or not oids:
+            return dict.fromkeys(oids)
+        
+        try:
+            return get_snmp_pool().get_many(host, oids, community, port=port, timeout=timeout)
+        except SnmpError as e:
+            print(f"❌ SNMP Error: {e}")
+        except Exception as e:
+            print(f"❌ Exception bei SNMP GET {host} ({len(oids)} OIDs) - {e}")
+        return dict.fromkeys(oids)
+    
     def snmp_walk(self, host: str, oid: str, community: str = "public",
                   port: int = 161, timeout: int = 5, 
-                  max_results: int = 100) -> Dict[str, str]:
+                  max_results: int = 100, bulk: bool = True) -> Dict[str, str]:
         """
         SNMP WALK - Traversiert einen OID-Baum
         
@@ -89,7 +99,20 @@ class SNMPScanner:
             oid: Start-OID für Walk
             community: SNMP Community String
             max_results: Maximale Anzahl Results (Schutz vor zu vielen Ergebnissen)
+            bulk: GETBULK statt GETNEXT (viele OIDs pro Request)
             
+        Returns:
+            Dictionary mit {oid: value}
+        """
+        return self.snmp_walk_columns(host, [oid], community, port, timeout, max_results, bulk)
+    
+    def snmp_walk_columns(self, host: str, oids: List[str], community: str = "public",
+                          port: int = 161, timeout: int = 5,
+                          max_results: int = 100, bulk: bool = True) -> Dict[str, str]:
+        """
+        SNMP WALK über mehrere Spalten gleichzeitig (z.B. ifDescr + ifSpeed + ...)
+        Jeder Request holt die nächsten Zeilen aller Spalten
+        
         Returns:
             Dictionary mit {oid: value}
         """
@@ -100,38 +123,24 @@ class SNMPScanner:
         count = 0
         
         try:
-            print(f"🔍 SNMP Walk auf {host} - OID: {oid}")
-            
-            iterator = nextCmd(
-                SnmpEngine(),
-                CommunityData(community, mpModel=1),
-                UdpTransportTarget((host, port), timeout=timeout),
-                ContextData(),
-                ObjectType(ObjectIdentity(oid)),
-                lexicographicMode=False  # Stop at end of subtree
-            )
+            print(f"🔍 SNMP Walk auf {host} - OID: {', '.join(oids)}")
             
-            for errorIndication, errorStatus, errorIndex, varBinds in iterator:
-                if errorIndication:
-                    print(f"❌ Walk Error: {errorIndication}")
-                    break
-                elif errorStatus:
-                    print(f"❌ Walk Error: {errorStatus.prettyPrint()}")
-                    break
-                else:
-                    for varBind in varBinds:
-                        oid_str = str(varBind[0])
-                        value = str(varBind[1])
-                        results[oid_str] = value
-                        count += 1
-                        
-                        if count >= max_results:
-                            print(f"⚠️  Max results ({max_results}) erreicht, stoppe Walk")
-                            return results
+            walk = get_snmp_pool().walk_columns(host, oids, community, port=port,
+                                                timeout=timeout, bulk=bulk)
+            for oid_str, value in walk:
+                results[oid_str] = value
+                count += 1
+                
+                if count >= max_results:
+                    print(f"⚠️  Max results ({max_results}) erreicht, stoppe Walk")
+                    return results
             
             print(f"✅ Walk abgeschlossen: {count} OIDs gefunden")
             return results
             
+        except SnmpError as e:
+            print(f"❌ Walk Error: {e}")
+            return results
         except Exception as e:
             print(f"❌ Exception bei SNMP Walk: {e}")
             return results
@@ -145,9 +154,10 @@ class SNMPScanner:
         """
         print(f"🔎 Erkenne Vendor für {host}...")
         
-        # Hole sysObjectID und sysDescr
-        sys_object_id = self.snmp_get(host, "1.3.6.1.2.1.1.2.0", community)
-        sys_descr = self.snmp_get(host, "1.3.6.1.2.1.1.1.0", community)
+        # Hole sysObjectID und sysDescr (ein Request)
+        system = self.snmp_get_many(host, {'sysObjectID': "1.3.6.1.2.1.1.2.0",
+                                           'sysDescr': "1.3.6.1.2.1.1.1.0"}, community)
+        sys_object_id, sys_descr = system['sysObjectID'], system['sysDescr']
         
         if not sys_object_id and not sys_descr:
             print(f"⚠️  Keine SNMP-Antwort von {host}")
@@ -192,8 +202,7 @@ class SNMPScanner:
         vendor_oids = self.mib_db['vendors'].get(vendor, {}).get('oids', {})
         system_oids = vendor_oids.get('system', {})
         
-        for key, oid in system_oids.items():
-            value = self.snmp_get(host, oid, community)
+        for key, value in self.snmp_get_many(host, system_oids, community).items():
             if value:
                 info[key] = value
         
@@ -207,8 +216,21 @@ class SNMPScanner:
         """
         interfaces = []
         
-        # Walk interface table
-        if_table = self.snmp_walk(host, "1.3.6.1.2.1.2.2.1", community, max_results=200)
+        # Map field types (Spalten der ifTable)
+        field_mapping = {
+            '2': 'ifDescr',
+            '5': 'ifSpeed',
+            '8': 'ifOperStatus',
+            '10': 'ifInOctets',
+            '16': 'ifOutOctets',
+            '14': 'ifInErrors',
+            '20': 'ifOutErrors'
+        }
+        
+        # Nur die benötigten Spalten, alle parallel (bis 200 Interfaces)
+        if_table = self.snmp_walk_columns(
+            host, [f"1.3.6.1.2.1.2.2.1.{field}" for field in field_mapping], community,
+            max_results=200 * len(field_mapping))
         
         # Parse interface data
         interface_map = {}
@@ -217,23 +239,12 @@ class SNMPScanner:
             # X = field type, Y = interface index
             parts = oid.split('.')
             if len(parts) >= 11:
-                field_type = parts[10]
-                if_index = parts[11] if len(parts) > 11 else None
+                field_type = parts[9]
+                if_index = parts[10]
                 
                 if if_index not in interface_map:
                     interface_map[if_index] = {'index': if_index}
                 
-                # Map field types
-                field_mapping = {
-                    '2': 'ifDescr',
-                    '5': 'ifSpeed',
-                    '8': 'ifOperStatus',
-                    '10': 'ifInOctets',
-                    '16': 'ifOutOctets',
-                    '14': 'ifInErrors',
-                    '20': 'ifOutErrors'
-                }
-                
                 if field_type in field_mapping:
                     interface_map[if_index][field_mapping[field_type]] = value
         
@@ -269,8 +280,7 @@ class SNMPScanner:
         vendor_oids = self.mib_db['vendors'].get(vendor, {}).get('oids', {})
         perf_oids = vendor_oids.get('performance', {})
         
-        for key, oid in perf_oids.items():
-            value = self.snmp_get(host, oid, community)
+        for key, value in self.snmp_get_many(host, perf_oids, community).items():
             if value:
                 try:
                     metrics[key] = float(value)
@@ -288,8 +298,7 @@ class SNMPScanner:
         
         ubiquiti_oids = self.mib_db['vendors']['ubiquiti']['oids']['wireless']
         
-        for key, oid in ubiquiti_oids.items():
-            value = self.snmp_get(host, oid, community)
+        for key, value in self.snmp_get_many(host, ubiquiti_oids, community).items():
             if value:
                 try:
                     wireless[key] = int(value)
@@ -361,13 +370,17 @@ class SNMPScanner:
     
     def export_results(self, filename: str = "snmp_scan_results.json"):
         """Exportiert Scan-Ergebnisse als JSON"""
-        with open(filename, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        atomic_write(filename, json.dumps(self.results, indent=2))
         print(f"\n💾 Ergebnisse exportiert nach: {filename}")
 
 
 def main():
     """Beispiel-Verwendung"""
+    import sys
+    if '--startup-profile' in sys.argv:
+        from startup_profile import main as startup_profile
+        sys.exit(startup_profile([]))
+    
     
     if not SNMP_AVAILABLE:
         print("\n❌ pysnmp ist nicht installiert!")
@@ -447,8 +460,7 @@ def main():
                     network_data['devices'][ip]['snmp_enabled'] = True
                     print(f"✅ SNMP-Daten zu {ip} hinzugefügt")
             
-            with open('network_data.json', 'w') as f:
-                json.dump(network_data, f, indent=2)
+            write_snapshot('network_data.json', network_data)
             
             print("✅ network_data.json aktualisiert")
             
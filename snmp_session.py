@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+SNMP Session Pool - shared SnmpEngines, one transport per device
+
+Building a pysnmp SnmpEngine (MIB builder, dispatcher, security tables)
+costs far more than the request itself, and a UdpTransportTarget resolves
+its address when it is constructed. The scanners used to build both for
+every single GET:
+- Engines are created on first use and kept for the process; every
+  request checks one out, so concurrent requests (SnmpPoller) each run on
+  an engine of their own - at most `max_engines`, further requests wait
+- CommunityData per community, UdpTransportTarget per (host, port,
+  timeout, retries) - reused by every get and walk of a scan, so the
+  engine's target/auth tables are configured once per device
+- Every request draws one token from the shared packet budget ('snmp')
+- get_many(): named OIDs packed into as few GET PDUs as the agent
+  accepts - the batch size per device starts at `max_varbinds` and is
+  halved on every tooBig answer (remembered for the following polls)
+- noSuchObject / noSuchInstance values come back as None, per OID
+- Walks use GETBULK (SNMPv2c); the response size per device grows while
+  answers come back complete and fast, shrinks on tooBig, trimmed
+  responses and slow answers. walk_columns() advances several columns
+  (e.g. the whole ifTable) with every request
+- deadline(): requests of a thread stop at a point in time - retries are
+  cut to what still fits, then SnmpError('deadline exceeded')
+- Agent errors raise SnmpError, callers decide whether to log them
+
+Usage:
+    pool = get_snmp_pool()
+    pool.get('192.168.1.1', '1.3.6.1.2.1.1.1.0', community='public')
+    pool.get_many('192.168.1.1', {'sysName': '1.3.6.1.2.1.1.5.0', ...})
+    for oid, value in pool.walk('192.168.1.1', '1.3.6.1.2.1.2.2.1.2'):
+        ...
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from lazy_imports import load, load_hlapi
+from rate_governor import get_governor
+
+DEFAULT_PORT = 161
+DEFAULT_TIMEOUT = 2.0
+DEFAULT_RETRIES = 5        # pysnmp default
+MAX_TRANSPORTS = 1024      # cached devices (LRU)
+MAX_ENGINES = 8            # concurrent requests - an engine costs ~0.15s CPU until its first answer
+MAX_VARBINDS = 32          # OIDs per GET PDU until the agent says tooBig
+BULK_VARBINDS = 32         # first GETBULK response size per device (adapted, see _adapt_bulk)
+MAX_BULK_VARBINDS = 512
+
+# errorStatus values (RFC 3416)
+TOO_BIG = 1
+NO_SUCH_NAME = 2           # SNMPv1-style agents: errorIndex points at the missing OID
+
+
+class SnmpError(Exception):
+    """errorIndication (timeout, ...) or errorStatus (noSuchName, tooBig, ...) of a request"""
+
+
+def _text(value) -> Optional[str]:
+    """Varbind value -> string, None for noSuchObject / noSuchInstance / endOfMibView"""
+    hlapi = load_hlapi()
+    if isinstance(value, (hlapi.NoSuchObject, hlapi.NoSuchInstance, hlapi.EndOfMibView)):
+        return None
+    return str(value)
+
+
+class SnmpPool:
+    """
+    Shared engines + per-device transports
+    Thread-safe: a request runs on an engine nobody else uses meanwhile
+    (checkout), more than `max_engines` concurrent requests wait
+    """
+
+    def __init__(self, max_transports: int = MAX_TRANSPORTS, max_varbinds: int = MAX_VARBINDS,
+                 bulk_varbinds: int = BULK_VARBINDS, max_engines: int = MAX_ENGINES):
+        self.max_transports = max(1, max_transports)
+        self.max_engines = max(1, max_engines)
+        self.max_varbinds = max(1, max_varbinds)
+        self.bulk_varbinds = max(1, min(bulk_varbinds, MAX_BULK_VARBINDS))
+        self._batch_sizes: Dict[str, int] = {}    # host -> OIDs per PDU the agent accepted
+        self._bulk: Dict[str, List[int]] = {}     # host -> [GETBULK varbinds per response, limit]
+        self._lock = threading.RLock()
+        self._engine_returned = threading.Condition(self._lock)
+        self._idle: List = []                     # engines between two requests
+        self._engine_count = 0
+        self._local = threading.local()           # per-thread deadline
+        self._context = None
+        self._auth: Dict[Tuple[str, int], object] = {}
+        self._targets: 'OrderedDict[Tuple, object]' = OrderedDict()
+        self.stats = self._empty_stats()
+        self.host_stats: Dict[str, Dict] = {}     # ip -> {'snmp_requests'} (scan telemetry)
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            'requests': 0,
+            'errors': 0,
+            'engines_created': 0,
+            'transports_created': 0,
+            'transports_reused': 0,
+            'oids_requested': 0,
+            'bulk_requests': 0,
+            'too_big': 0,          # PDUs split because the answer did not fit
+        }
+
+    def reset_stats(self):
+        self.stats = self._empty_stats()
+        self.host_stats = {}
+
+    def _count_request(self, host: str):
+        """Caller holds the lock"""
+        self.stats['requests'] += 1
+        host_entry = self.host_stats.setdefault(host, {'snmp_requests': 0})
+        host_entry['snmp_requests'] += 1
+
+    def requests_to(self, host: str) -> int:
+        """Round trips to one device since the last reset_stats()"""
+        with self._lock:
+            return self.host_stats.get(host, {}).get('snmp_requests', 0)
+
+    # ---- pooled objects ----
+
+    @contextmanager
+    def checkout(self):
+        """An engine for one request (or one GETNEXT walk), created on first need"""
+        with self._engine_returned:
+            while not self._idle and self._engine_count >= self.max_engines:
+                self._engine_returned.wait()
+            engine = self._idle.pop() if self._idle else None
+            if engine is None:
+                self._engine_count += 1
+        if engine is None:
+            try:
+                engine = load_hlapi().SnmpEngine()
+            except Exception:
+                with self._engine_returned:
+                    self._engine_count -= 1
+                    self._engine_returned.notify()
+                raise
+            with self._lock:
+                self.stats['engines_created'] += 1
+        try:
+            yield engine
+        finally:
+            with self._engine_returned:
+                self._idle.append(engine)
+                self._engine_returned.notify()
+
+    def _auth_data(self, community: str, mp_model: int):
+        key = (community, mp_model)
+        if key not in self._auth:
+            self._auth[key] = load_hlapi().CommunityData(community, mpModel=mp_model)
+        return self._auth[key]
+
+    def _target(self, host: str, port: int, timeout: float, retries: int):
+        key = (host, port, timeout, retries)
+        target = self._targets.get(key)
+        if target is not None:
+            self._targets.move_to_end(key)
+            self.stats['transports_reused'] += 1
+            return target
+        target = load_hlapi().UdpTransportTarget((host, port), timeout=timeout, retries=retries)
+        self._targets[key] = target
+        self.stats['transports_created'] += 1
+        while len(self._targets) > self.max_transports:
+            self._targets.popitem(last=False)
+        return target
+
+    def session(self, host: str, community: str = 'public', port: int = DEFAULT_PORT,
+                timeout: float = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+                mp_model: int = 1) -> Tuple:
+        """(auth, target, context) - hlapi command arguments after the engine"""
+        retries = self._retries_left(timeout, retries)
+        with self._lock:
+            if self._context is None:
+                self._context = load_hlapi().ContextData()
+            return (self._auth_data(community, mp_model),
+                    self._target(host, port, timeout, retries), self._context)
+
+    def forget(self, host: str):
+        """Drop the cached transports and batch size of a device (e.g. after an IP change)"""
+        with self._lock:
+            self._batch_sizes.pop(host, None)
+            self._bulk.pop(host, None)
+            for key in [k for k in self._targets if k[0] == host]:
+                del self._targets[key]
+
+    # ---- deadline ----
+
+    @contextmanager
+    def deadline(self, seconds: float):
+        """
+        Requests of this thread end after `seconds` - yields {'expired'},
+        True once a request was refused
+        """
+        state = {'at': time.perf_counter() + seconds, 'expired': False}
+        previous = getattr(self._local, 'deadline', None)
+        self._local.deadline = state
+        try:
+            yield state
+        finally:
+            self._local.deadline = previous
+
+    def _retries_left(self, timeout: float, retries: int) -> int:
+        """Retries whose timeouts still fit before the deadline, SnmpError if not even one try"""
+        state = getattr(self._local, 'deadline', None)
+        if state is None:
+            return retries
+        tries = int((state['at'] - time.perf_counter()) / timeout)
+        if tries < 1:
+            state['expired'] = True
+            raise SnmpError('deadline exceeded')
+        return min(retries, tries - 1)
+
+    # ---- requests ----
+
+    def _check(self, error_indication, error_status, error_index):
+        if error_indication or error_status:
+            with self._lock:
+                self.stats['errors'] += 1
+            raise SnmpError(str(error_indication) if error_indication
+                            else error_status.prettyPrint())
+
+    def get(self, host: str, oid: str, community: str = 'public', port: int = DEFAULT_PORT,
+            timeout: float = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+            mp_model: int = 1) -> Optional[str]:
+        """One GET -> value as string (SnmpError on timeout / agent error)"""
+        return self.get_many(host, {oid: oid}, community, port, timeout, retries, mp_model)[oid]
+
+    def batch_size(self, host: str) -> int:
+        with self._lock:
+            return self._batch_sizes.get(host, self.max_varbinds)
+
+    def get_many(self, host: str, oids: Dict[str, str], community: str = 'public',
+                 port: int = DEFAULT_PORT, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, mp_model: int = 1) -> Dict[str, Optional[str]]:
+        """
+        {name: oid} -> {name: value or None}, as few GET PDUs as the agent accepts
+        SnmpError on timeout / agent error (nothing partial is returned)
+        """
+        hlapi = load_hlapi()
+        results: Dict[str, Optional[str]] = dict.fromkeys(oids)
+        pending = list(oids.items())
+        governor = get_governor()
+
+        while pending:
+            batch = pending[:self.batch_size(host)]
+            args = self.session(host, community, port, timeout, retries, mp_model)
+            governor.acquire(1, 'snmp')
+            with self._lock:
+                self._count_request(host)
+                self.stats['oids_requested'] += len(batch)
+            with self.checkout() as engine:
+                error_indication, error_status, error_index, var_binds = next(hlapi.getCmd(
+                    engine, *args,
+                    *(hlapi.ObjectType(hlapi.ObjectIdentity(oid)) for _, oid in batch)))
+
+            if error_status and not error_indication:
+                status, index = int(error_status), int(error_index)
+                if status == TOO_BIG:
+                    with self._lock:
+                        self.stats['too_big'] += 1
+                        if len(batch) > 1:
+                            self._batch_sizes[host] = len(batch) // 2
+                            continue
+                    pending = pending[1:]      # a single value larger than the agent's PDU
+                    continue
+                if status == NO_SUCH_NAME and 0 < index <= len(batch):
+                    pending.remove(batch[index - 1])
+                    continue
+            self._check(error_indication, error_status, error_index)
+
+            for (name, _), var_bind in zip(batch, var_binds):
+                results[name] = _text(var_bind[1])
+            pending = pending[len(batch):]
+        return results
+
+    def walk(self, host: str, oid: str, community: str = 'public', port: int = DEFAULT_PORT,
+             timeout: float = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES,
+             mp_model: int = 1, bulk: bool = True) -> Iterator[Tuple[str, str]]:
+        """Walk of a subtree -> (oid, value), SnmpError after a failed request"""
+        return self.walk_columns(host, [oid], community, port, timeout, retries, mp_model, bulk)
+
+    def walk_columns(self, host: str, oids: List[str], community: str = 'public',
+                     port: int = DEFAULT_PORT, timeout: float = DEFAULT_TIMEOUT,
+                     retries: int = DEFAULT_RETRIES, mp_model: int = 1,
+                     bulk: bool = True) -> Iterator[Tuple[str, str]]:
+        """
+        Several subtrees side by side (e.g. ifTable columns), every request
+        advances all of them -> (oid, value) in row order
+        GETBULK on SNMPv2c, GETNEXT on SNMPv1 or with bulk=False
+        """
+        params = (host, community, port, timeout, retries, mp_model)
+        if bulk and mp_model >= 1:
+            return self._walk_bulk(params, oids)
+        return self._walk_next(params, oids)
+
+    def _walk_next(self, params: Tuple, oids: List[str]) -> Iterator[Tuple[str, str]]:
+        """The hlapi iterator is bound to one engine - it stays checked out for the walk"""
+        hlapi = load_hlapi()
+        host, timeout = params[0], params[3]
+        governor = get_governor()
+        with self.checkout() as engine:
+            iterator = hlapi.nextCmd(engine, *self.session(*params),
+                                     *(hlapi.ObjectType(hlapi.ObjectIdentity(oid)) for oid in oids),
+                                     lexicographicMode=False)
+            while True:
+                self._retries_left(timeout, 0)
+                governor.acquire(1, 'snmp')
+                with self._lock:
+                    self._count_request(host)
+                try:
+                    error_indication, error_status, error_index, var_binds = next(iterator)
+                except StopIteration:
+                    return
+                self._check(error_indication, error_status, error_index)
+                for var_bind in var_binds:
+                    value = _text(var_bind[1])
+                    if value is not None:
+                        yield str(var_bind[0]), value
+
+    # ---- GETBULK ----
+
+    def bulk_size(self, host: str) -> int:
+        """Varbinds per GETBULK response for this device (max-repetitions x columns)"""
+        with self._lock:
+            return self._bulk.get(host, [self.bulk_varbinds, MAX_BULK_VARBINDS])[0]
+
+    def _adapt_bulk(self, host: str, size: int, returned: Optional[int], rtt: float,
+                    timeout: float):
+        """
+        Next response size from the last one:
+        - tooBig (returned None)           -> half, never that big again
+        - fewer varbinds than asked for    -> the agent trimmed to its PDU limit
+        - slow answer (> 1/4 of timeout)   -> half, a retransmit would cost a full timeout
+        - full and fast                    -> double up to the known limit
+        """
+        with self._lock:
+            state = self._bulk.setdefault(host, [self.bulk_varbinds, MAX_BULK_VARBINDS])
+            if returned is None:
+                state[1] = max(1, size - 1)
+                state[0] = max(1, size // 2)
+                self.stats['too_big'] += 1
+            elif returned < size:
+                state[0] = state[1] = max(1, returned)
+            elif rtt > timeout / 4:
+                state[0] = max(1, size // 2)
+            else:
+                state[0] = min(size * 2, state[1])
+
+    def _bulk_request(self, engine, args: Tuple, repetitions: int,
+                      oids: List[Tuple[int, ...]]) -> Tuple:
+        """One GETBULK PDU -> (errorIndication, errorStatus, errorIndex, varbinds in row order)"""
+        hlapi = load_hlapi()
+        response = {}
+
+        def on_response(engine, handle, error_indication, error_status, error_index,
+                        var_bind_table, context):
+            response['result'] = (error_indication, error_status, error_index,
+                                  [var_bind for row in var_bind_table for var_bind in row])
+            # returns None: no follow-up request, the walk decides what to ask next
+
+        load('pysnmp.hlapi.asyncore').bulkCmd(
+            engine, *args, 0, repetitions,
+            *(hlapi.ObjectType(hlapi.ObjectIdentity('.'.join(map(str, oid)))) for oid in oids),
+            cbFun=on_response, lookupMib=False)
+        engine.transportDispatcher.runDispatcher()
+        return response['result']
+
+    def _walk_bulk(self, params: Tuple, oids: List[str]) -> Iterator[Tuple[str, str]]:
+        hlapi = load_hlapi()
+        host, timeout = params[0], params[3]
+        prefixes = [tuple(int(arc) for arc in oid.strip('.').split('.')) for oid in oids]
+        current = list(prefixes)
+        active = list(range(len(oids)))
+        governor = get_governor()
+
+        while active:
+            size = self.bulk_size(host)
+            repetitions = max(1, size // len(active))
+            args = self.session(*params)
+            governor.acquire(1, 'snmp')
+            with self._lock:
+                self._count_request(host)
+                self.stats['bulk_requests'] += 1
+            with self.checkout() as engine:
+                start = time.perf_counter()
+                error_indication, error_status, error_index, var_binds = self._bulk_request(
+                    engine, args, repetitions, [current[column] for column in active])
+                rtt = time.perf_counter() - start
+
+            if error_status and not error_indication and int(error_status) == TOO_BIG \
+                    and repetitions * len(active) > 1:
+                self._adapt_bulk(host, repetitions * len(active), None, rtt, timeout)
+                continue
+            self._check(error_indication, error_status, error_index)
+            self._adapt_bulk(host, repetitions * len(active), len(var_binds), rtt, timeout)
+
+            ended = set()
+            for position, (name, value) in enumerate(var_binds):
+                column = active[position % len(active)]
+                if column in ended:
+                    continue
+                oid = tuple(name)
+                if (isinstance(value, hlapi.EndOfMibView) or oid <= current[column]
+                        or oid[:len(prefixes[column])] != prefixes[column]):
+                    ended.add(column)      # left the subtree (or a broken agent repeats itself)
+                    continue
+                current[column] = oid
+                text = _text(value)
+                if text is not None:
+                    yield str(name), text
+            active = [column for column in active if column not in ended]
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_snmp_pool() -> SnmpPool:
+    """Process-wide pool (engines and transports shared by all scanners)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SnmpPool()
+        return _shared
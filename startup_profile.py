@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Startup Profile - cold start cost per scanner
+
+Every scanner module is imported and constructed in a FRESH interpreter
+(like server.js spawning a scan), measuring:
+- Import time of the scanner module (incl. its dependencies)
+- Init time of the scanner class
+- Heaviest imports (python -X importtime)
+
+With --budget-ms the run fails (exit 1) when a scanner's cold start
+(import + init) exceeds the budget - used by `npm run verify:startup`.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+SCANNERS = {
+    'ultra_scanner': 'UltraScanner',
+    'smart_scanner': 'SmartScanner',
+    'snmp_scanner': 'SNMPScanner',
+    'advanced_scanner': 'AdvancedNetworkScanner',
+    'kali_scanner': 'KaliScanner',
+    'quick_scanner': 'QuickScanner',
+    'network_scanner_v3': 'NetworkScanner',
+}
+
+DEFAULT_BUDGET_MS = 400
+
+_PROBE = """
+import contextlib, io, json, time
+t0 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import {module} as m
+    t1 = time.perf_counter()
+    m.{cls}()
+t2 = time.perf_counter()
+import lazy_imports
+print(json.dumps({{
+    'import_ms': (t1 - t0) * 1000,
+    'init_ms': (t2 - t1) * 1000,
+    'lazy_loaded': lazy_imports.IMPORT_TIMES,
+}}))
+"""
+
+
+def _parse_importtime(stderr: str, module: str, top: int) -> List[Dict]:
+    """
+    Direct imports of `module`, heaviest first
+    -X importtime lines: 'import time: self | cumulative | <indent>name'
+    (children are printed before their parent, one indent level deeper)
+    """
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3:
+            continue
+        try:
+            cumulative_us = int(fields[1])
+        except ValueError:
+            continue
+
+        name = fields[2][1:]
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        name = name.strip()
+
+        if depth == 0:
+            if name == module:
+                break
+            children = []
+        elif depth == 1:
+            children.append({'module': name,
+                             'cumulative_ms': round(cumulative_us / 1000, 1)})
+
+    return sorted(children, key=lambda r: r['cumulative_ms'], reverse=True)[:top]
+
+
+def measure(module: str, cls: Optional[str] = None, top: int = 5) -> Dict:
+    """Cold import + init of one scanner in a fresh interpreter"""
+    cls = cls or SCANNERS[module]
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE.format(module=module, cls=cls)],
+        capture_output=True,
+        text=True,
+        cwd=here,
+        timeout=60
+    )
+
+    profile = {'module': module, 'class': cls}
+    try:
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        error = result.stderr.strip().splitlines()
+        profile['error'] = error[-1] if error else 'no output'
+        return profile
+
+    profile['import_ms'] = round(data['import_ms'], 1)
+    profile['init_ms'] = round(data['init_ms'], 1)
+    profile['total_ms'] = round(data['import_ms'] + data['init_ms'], 1)
+    profile['lazy_loaded'] = data['lazy_loaded']
+    profile['heaviest_imports'] = _parse_importtime(result.stderr, module, top)
+    return profile
+
+
+def print_profile(profiles: List[Dict], budget_ms: Optional[float] = None):
+    print("\n" + "="*70)
+    print("⏱️  STARTUP PROFILE (cold start per scanner)")
+    print("="*70)
+
+    for p in profiles:
+        if 'error' in p:
+            print(f"  ❌ {p['module']:20} | {p['error']}")
+            continue
+
+        over = budget_ms is not None and p['total_ms'] > budget_ms
+        icon = '❌' if over else '✅'
+        print(f"  {icon} {p['module']:20} | import {p['import_ms']:7.1f} ms | "
+              f"init {p['init_ms']:7.1f} ms | total {p['total_ms']:7.1f} ms")
+
+        for imp in p['heaviest_imports']:
+            print(f"       {imp['module']:30} {imp['cumulative_ms']:7.1f} ms")
+        for name, ms in p['lazy_loaded'].items():
+            print(f"       (lazy) {name:23} {ms:7.1f} ms")
+
+    if budget_ms is not None:
+        print(f"\nBudget: {budget_ms:g} ms per scanner")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Scanner startup profile')
+    parser.add_argument('modules', nargs='*', default=list(SCANNERS),
+                        help='Scanner modules (default: all)')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help=f'Fail if import+init exceeds this (e.g. {DEFAULT_BUDGET_MS})')
+    parser.add_argument('--json', action='store_true', help='JSON output')
+    args = parser.parse_args(argv)
+
+    profiles = [measure(m) for m in args.modules]
+
+    if args.json:
+        print(json.dumps(profiles, indent=2))
+    else:
+        print_profile(profiles, args.budget_ms)
+
+    failed = [p for p in profiles if 'error' in p]
+    if args.budget_ms is not None:
+        failed += [p for p in profiles if p.get('total_ms', 0) > args.budget_ms]
+
+    if failed:
+        print(f"\n❌ {len(failed)} scanner(s) failed the startup check")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
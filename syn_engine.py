@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+SYN Scan Engine - half-open TCP scanning from one raw socket
+
+Instead of a full connect() handshake per port (one socket each):
+- SYN probes for ALL host/port pairs from ONE raw socket
+- Paced at a fixed packet rate (no bursts that overflow switch buffers),
+  and never faster than the shared packet budget (rate_governor)
+- Replies collected asynchronously by a receiver thread:
+  SYN/ACK = open, RST = closed, nothing = filtered (after retries)
+- Probes carry a per-scan cookie in the sequence number, stray or
+  spoofed replies are dropped; the kernel RSTs the half-open SYN/ACKs
+
+Needs raw sockets (root / CAP_NET_RAW - same privilege as Scapy ARP).
+Callers fall back to AsyncPortEngine when `raw_sockets_available()` is False.
+"""
+
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pinger import _checksum
+from rate_governor import get_governor
+
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_ACK = 0x10
+
+
+def raw_sockets_available() -> bool:
+    try:
+        socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP).close()
+        return True
+    except OSError:
+        return False
+
+
+def _source_ip(dst: str) -> str:
+    """Local address the kernel would use towards dst (no packet sent)"""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect((dst, 9))
+        return s.getsockname()[0]
+    finally:
+        s.close()
+
+
+class SynScanEngine:
+    """
+    Half-open scanner with the same interface as AsyncPortEngine.scan()
+    Usage: SynScanEngine(rate=5000).scan(hosts, ports) -> {ip: [open ports]}
+    """
+
+    def __init__(self, rate: int = 5000, wait: float = 0.5, retries: int = 1):
+        self.rate = max(1, rate)          # packets per second
+        self.wait = wait                  # grace period for late replies
+        self.retries = retries            # re-sends for unanswered probes
+        self._secret = random.getrandbits(32)
+        self.stats = self._empty_stats()
+        self.host_stats: Dict[str, Dict] = {}   # ip -> per-host telemetry
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            'engine': 'syn',
+            'hosts': 0,
+            'probes': 0,
+            'packets_sent': 0,
+            'open': 0,
+            'closed': 0,
+            'filtered': 0,
+            'retransmits': 0,
+            'errors': 0,
+            'elapsed_s': 0.0,
+            'packets_per_sec': 0.0,
+        }
+
+    def _cookie(self, ip: str, port: int) -> int:
+        ip_int = struct.unpack('!I', socket.inet_aton(ip))[0]
+        return ((ip_int * 2654435761) ^ (port * 40503) ^ self._secret) & 0xFFFFFFFF
+
+    @staticmethod
+    def _build_syn(src: str, dst: str, sport: int, dport: int, seq: int) -> bytes:
+        options = struct.pack('!BBH', 2, 4, 1460)  # MSS - bare SYNs get dropped by some stacks
+        header = struct.pack('!HHIIBBHHH', sport, dport, seq, 0,
+                             6 << 4, TCP_SYN, 1024, 0, 0) + options
+        pseudo = (socket.inet_aton(src) + socket.inet_aton(dst)
+                  + struct.pack('!BBH', 0, socket.IPPROTO_TCP, len(header)))
+        checksum = _checksum(pseudo + header)
+        return header[:16] + struct.pack('!H', checksum) + header[18:]
+
+    def _receive(self, sock: socket.socket, sport: int, probes: Dict[Tuple[str, int], int],
+                 answered: Dict[Tuple[str, int], bool], stop: threading.Event):
+        """Receiver thread: match SYN/ACK and RST replies to probes"""
+        poller = select.poll()   # no FD_SETSIZE limit, unlike select()
+        poller.register(sock, select.POLLIN)
+        while not stop.is_set():
+            if not poller.poll(50):
+                continue
+            while True:
+                try:
+                    packet = sock.recv(65535)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError:
+                    return
+
+                ihl = (packet[0] & 0x0F) * 4
+                if len(packet) < ihl + 14:
+                    continue
+                src_port, dst_port, _, ack = struct.unpack_from('!HHII', packet, ihl)
+                if dst_port != sport:
+                    continue
+
+                key = (socket.inet_ntoa(packet[12:16]), src_port)
+                cookie = probes.get(key)
+                if cookie is None or key in answered or ack != (cookie + 1) & 0xFFFFFFFF:
+                    continue
+
+                flags = packet[ihl + 13]
+                if flags & (TCP_SYN | TCP_ACK) == TCP_SYN | TCP_ACK:
+                    answered[key] = True
+                elif flags & TCP_RST:
+                    answered[key] = False
+
+    def _send_paced(self, sock: socket.socket, todo: List[Tuple[str, int]],
+                    probes: Dict[Tuple[str, int], int], sources: Dict[str, str], sport: int):
+        """Send in 1ms ticks at self.rate packets/s"""
+        per_tick = max(1, self.rate // 1000)
+        tick = per_tick / self.rate
+        next_send = time.perf_counter()
+        governor = get_governor()
+
+        for i in range(0, len(todo), per_tick):
+            batch = todo[i:i + per_tick]
+            governor.acquire(len(batch), 'syn')
+            for ip, port in batch:
+                packet = self._build_syn(sources[ip], ip, sport, port, probes[(ip, port)])
+                try:
+                    sock.sendto(packet, (ip, 0))
+                    self.stats['packets_sent'] += 1
+                except OSError:
+                    self.stats['errors'] += 1
+
+            next_send += tick
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def scan(self, hosts: Iterable[str], ports: List[int],
+             plan: Optional[Dict[str, List[int]]] = None) -> Dict[str, List[int]]:
+        """Blocking: all SYN probes paced, replies collected, retries for silence"""
+        plan = plan or {}
+        hosts = list(dict.fromkeys(hosts))
+        self.stats = self._empty_stats()
+        self.host_stats = {}
+        self.stats['hosts'] = len(hosts)
+        start = time.perf_counter()
+
+        sources = {}
+        for ip in hosts:
+            try:
+                sources[ip] = _source_ip(ip)
+            except OSError:
+                self.stats['errors'] += 1
+        probes = {(ip, port): self._cookie(ip, port)
+                  for ip in sources for port in plan.get(ip, ports)}
+        self.stats['probes'] = len(probes)
+
+        send_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+        recv_sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+        recv_sock.setblocking(False)
+        sport = random.randint(40000, 60000)
+
+        answered: Dict[Tuple[str, int], bool] = {}
+        stop = threading.Event()
+        receiver = threading.Thread(target=self._receive, daemon=True,
+                                    args=(recv_sock, sport, probes, answered, stop))
+        receiver.start()
+
+        try:
+            for attempt in range(self.retries + 1):
+                todo = [key for key in probes if key not in answered]
+                if not todo:
+                    break
+                if attempt:
+                    self.stats['retransmits'] += len(todo)
+                self._send_paced(send_sock, todo, probes, sources, sport)
+
+                deadline = time.perf_counter() + self.wait
+                while time.perf_counter() < deadline and len(answered) < len(probes):
+                    time.sleep(0.01)
+        finally:
+            stop.set()
+            receiver.join(1)
+            send_sock.close()
+            recv_sock.close()
+
+        results = {ip: [] for ip in hosts}
+        for (ip, port), is_open in list(answered.items()):
+            if is_open:
+                results[ip].append(port)
+        for ip in results:
+            results[ip].sort()
+        for ip in sources:
+            host_ports = plan.get(ip, ports)
+            answers = sum(1 for port in host_ports if (ip, port) in answered)
+            self.host_stats[ip] = {'port_probes': len(host_ports),
+                                   'port_timeouts': len(host_ports) - answers,
+                                   'open_ports': len(results[ip])}
+
+        self.stats['open'] = sum(1 for v in answered.values() if v)
+        self.stats['closed'] = len(answered) - self.stats['open']
+        self.stats['filtered'] = len(probes) - len(answered)
+        elapsed = time.perf_counter() - start
+        self.stats['elapsed_s'] = round(elapsed, 3)
+        if elapsed > 0:
+            self.stats['packets_per_sec'] = round(self.stats['packets_sent'] / elapsed, 1)
+        return results
+
+
+def main():
+    import ipaddress
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: sudo python3 syn_engine.py <ip|cidr> [ports] [rate]")
+        sys.exit(1)
+    if not raw_sockets_available():
+        print("❌ Raw sockets not available (needs root / CAP_NET_RAW)")
+        sys.exit(1)
+
+    target = sys.argv[1]
+    ports = [int(p) for p in sys.argv[2].split(',')] if len(sys.argv) > 2 else [22, 80, 443]
+    rate = int(sys.argv[3]) if len(sys.argv) > 3 else 5000
+    hosts = [str(h) for h in ipaddress.ip_network(target, strict=False).hosts()] or [target]
+
+    engine = SynScanEngine(rate=rate)
+    results = engine.scan(hosts, ports)
+
+    for ip, open_ports in results.items():
+        if open_ports:
+            print(f"  {ip:15} | {open_ports}")
+
+    s = engine.stats
+    print(f"✅ {s['packets_sent']} SYNs to {s['hosts']} hosts in {s['elapsed_s']}s "
+          f"({s['packets_per_sec']} pkts/s) | open {s['open']} | closed {s['closed']} | "
+          f"filtered {s['filtered']}")
+
+
+if __name__ == "__main__":
+    main()
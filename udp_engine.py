@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+UDP Probe Engine - service probes for UDP-only ports on one event loop
+
+A TCP connect to 53, 161 or 3478 says nothing about the UDP service
+behind it. Here every probe is a protocol-correct request from ONE shared
+UDP socket, replies are matched by (source address, transaction id):
+- 53    DNS query (root NS)                -> any DNS reply = open
+- 161   SNMPv2c GET sysDescr.0             -> GetResponse with our request-id
+- 3478  STUN binding request (RFC 5389)    -> binding response with our transaction id
+- No reply after retries = closed or filtered (UDP cannot tell apart)
+
+All hosts are probed concurrently, every datagram draws from the shared
+packet budget (rate_governor).
+"""
+
+import asyncio
+import os
+import random
+import socket
+import struct
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from rate_governor import get_governor
+
+DNS_PORT = 53
+SNMP_PORT = 161
+STUN_PORT = 3478
+UDP_PORTS = frozenset({DNS_PORT, SNMP_PORT, STUN_PORT})
+
+STUN_MAGIC = 0x2112A442
+STUN_BINDING_REQUEST = 0x0001
+STUN_BINDING_RESPONSES = (0x0101, 0x0111)   # success / error response
+SYS_DESCR_OID = b'\x2b\x06\x01\x02\x01\x01\x01\x00'   # 1.3.6.1.2.1.1.1.0
+SNMP_GET_RESPONSE = 0xA2
+
+RECV_BUFFER = 4 << 20
+
+
+# ---- payloads: (token, datagram); token identifies the reply ----
+
+def _dns_probe(_: str) -> Tuple[bytes, bytes]:
+    qid = struct.pack('>H', random.getrandbits(16))
+    # RD, one question: "." IN NS
+    return qid, qid + struct.pack('>HHHHH', 0x0100, 1, 0, 0, 0) + b'\x00' + struct.pack('>HH', 2, 1)
+
+
+def _dns_match(token: bytes, data: bytes) -> bool:
+    return len(data) >= 12 and data[:2] == token and bool(data[2] & 0x80)
+
+
+def _ber(tag: int, body: bytes) -> bytes:
+    length = len(body)
+    if length < 0x80:
+        return bytes([tag, length]) + body
+    raw = length.to_bytes((length.bit_length() + 7) // 8, 'big')
+    return bytes([tag, 0x80 | len(raw)]) + raw + body
+
+
+def _ber_int(value: int) -> bytes:
+    return _ber(0x02, value.to_bytes(max(1, (value.bit_length() + 8) // 8), 'big', signed=True))
+
+
+def _ber_read(data: bytes, offset: int) -> Tuple[int, int, int]:
+    """-> (tag, value start, value end)"""
+    tag, length = data[offset], data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        count = length & 0x7F
+        length = int.from_bytes(data[offset:offset + count], 'big')
+        offset += count
+    if offset + length > len(data):
+        raise ValueError("truncated BER")
+    return tag, offset, offset + length
+
+
+def _snmp_probe(community: str) -> Tuple[bytes, bytes]:
+    request_id = random.getrandbits(31)
+    varbind = _ber(0x30, _ber(0x30, _ber(0x06, SYS_DESCR_OID) + b'\x05\x00'))
+    pdu = _ber(0xA0, _ber_int(request_id) + _ber_int(0) + _ber_int(0) + varbind)
+    message = _ber(0x30, _ber_int(1) + _ber(0x04, community.encode()) + pdu)
+    return request_id.to_bytes(4, 'big'), message
+
+
+def _snmp_match(token: bytes, data: bytes) -> bool:
+    """Message -> version -> community -> GetResponse -> request-id"""
+    try:
+        _, offset, _ = _ber_read(data, 0)
+        _, _, offset = _ber_read(data, offset)          # version
+        _, _, offset = _ber_read(data, offset)          # community
+        tag, offset, _ = _ber_read(data, offset)        # PDU
+        if tag != SNMP_GET_RESPONSE:
+            return False
+        tag, start, end = _ber_read(data, offset)       # request-id
+        return tag == 0x02 and int.from_bytes(data[start:end], 'big') == int.from_bytes(token, 'big')
+    except (IndexError, ValueError):
+        return False
+
+
+def _stun_probe(_: str) -> Tuple[bytes, bytes]:
+    transaction = os.urandom(12)
+    return transaction, struct.pack('>HHI', STUN_BINDING_REQUEST, 0, STUN_MAGIC) + transaction
+
+
+def _stun_match(token: bytes, data: bytes) -> bool:
+    if len(data) < 20:
+        return False
+    msg_type, _, magic = struct.unpack('>HHI', data[:8])
+    return msg_type in STUN_BINDING_RESPONSES and magic == STUN_MAGIC and data[8:20] == token
+
+
+# port -> (build(community) -> (token, datagram), match(token, reply))
+PROBES: Dict[int, Tuple[Callable, Callable]] = {
+    DNS_PORT: (_dns_probe, _dns_match),
+    SNMP_PORT: (_snmp_probe, _snmp_match),
+    STUN_PORT: (_stun_probe, _stun_match),
+}
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, engine: 'UdpProbeEngine'):
+        self.engine = engine
+
+    def datagram_received(self, data, addr):
+        self.engine._on_reply(data, addr)
+
+    def error_received(self, exc):
+        pass  # ICMP errors are not reported per destination on an unconnected socket
+
+
+class UdpProbeEngine:
+    """
+    Usage:
+        UdpProbeEngine(community='public').scan(hosts, [53, 161, 3478]) -> {ip: [open ports]}
+        await engine.scan_host(ip, ports)   # inside a running loop (scan pipeline)
+    """
+
+    def __init__(self, timeout: float = 0.5, retries: int = 1,
+                 max_in_flight: int = 1024, community: str = 'public'):
+        self.timeout = timeout
+        self.retries = retries
+        self.max_in_flight = max(1, max_in_flight)
+        self.community = community
+        self._transport = None
+        self._loop = None
+        self._opening = None      # task creating the socket (shared by concurrent probes)
+        self._sem = None
+        self._pending: Dict[Tuple[str, int], Tuple[asyncio.Future, bytes]] = {}
+        self.stats = self._empty_stats()
+        self.host_stats: Dict[str, Dict] = {}
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            'engine': 'udp',
+            'hosts': 0,
+            'probes': 0,
+            'datagrams_sent': 0,
+            'open': 0,
+            'no_reply': 0,
+            'unmatched': 0,        # replies from probed ports with a wrong id
+            'errors': 0,
+            'elapsed_s': 0.0,
+        }
+
+    def reset_stats(self):
+        self.stats = self._empty_stats()
+        self.host_stats = {}
+
+    async def _endpoint(self):
+        """Shared socket + in-flight budget, bound to the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._opening is None or self._loop is not loop:
+            # Set up synchronously: probes starting together all await the same socket
+            self.close()
+            self._loop = loop
+            self._sem = asyncio.Semaphore(self.max_in_flight)
+            self._pending = {}
+            self._opening = loop.create_task(self._open(loop))
+        return await self._opening
+
+    async def _open(self, loop):
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _UdpProtocol(self), family=socket.AF_INET)
+        sock = self._transport.get_extra_info('socket')
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+        except OSError:
+            pass
+        return self._transport
+
+    def close(self):
+        if self._transport is not None:
+            try:
+                self._transport.close()
+            except RuntimeError:
+                pass  # loop already closed
+        self._transport = None
+        self._loop = None
+        self._opening = None
+
+    def _on_reply(self, data: bytes, addr):
+        key = (addr[0], addr[1])
+        entry = self._pending.get(key)
+        if entry is None:
+            return
+        future, token = entry
+        if PROBES[key[1]][1](token, data):
+            if not future.done():
+                future.set_result(True)
+        else:
+            self.stats['unmatched'] += 1
+
+    async def probe(self, ip: str, port: int) -> bool:
+        """One service probe (with retries) - True if the service answered"""
+        transport = await self._endpoint()
+        build, _ = PROBES[port]
+        self.stats['probes'] += 1
+        host = self.host_stats.setdefault(ip, {'udp_probes': 0, 'udp_open': 0})
+        host['udp_probes'] += 1
+
+        # One token for all retries: a late reply to the first datagram still matches
+        token, datagram = build(self.community)
+        async with self._sem:
+            future = self._loop.create_future()
+            self._pending[(ip, port)] = (future, token)
+            try:
+                for _ in range(self.retries + 1):
+                    await get_governor().acquire_async(1, 'udp')
+                    try:
+                        transport.sendto(datagram, (ip, port))
+                        self.stats['datagrams_sent'] += 1
+                        # shield: a timeout must not cancel the future a late reply resolves
+                        await asyncio.wait_for(asyncio.shield(future), self.timeout)
+                        self.stats['open'] += 1
+                        host['udp_open'] += 1
+                        return True
+                    except asyncio.TimeoutError:
+                        continue
+                    except OSError:
+                        self.stats['errors'] += 1
+                        return False
+            finally:
+                self._pending.pop((ip, port), None)
+
+        self.stats['no_reply'] += 1
+        return False
+
+    async def scan_host(self, ip: str, ports: Iterable[int]) -> List[int]:
+        ports = [p for p in ports if p in PROBES]
+        if not ports:
+            return []
+        answers = await asyncio.gather(*(self.probe(ip, port) for port in ports))
+        self.stats['hosts'] += 1
+        return sorted(port for port, is_open in zip(ports, answers) if is_open)
+
+    async def scan_async(self, hosts: Iterable[str], ports: List[int],
+                         plan: Optional[Dict[str, List[int]]] = None) -> Dict[str, List[int]]:
+        """All hosts concurrently - {ip: [open UDP ports]} (plan: per-host port lists)"""
+        start = time.perf_counter()
+        hosts = list(hosts)
+        try:
+            results = await asyncio.gather(*(
+                self.scan_host(ip, plan.get(ip, ports) if plan else ports) for ip in hosts))
+        finally:
+            self.close()
+        self.stats['elapsed_s'] = round(self.stats['elapsed_s'] + time.perf_counter() - start, 3)
+        return dict(zip(hosts, results))
+
+    def scan(self, hosts: Iterable[str], ports: List[int],
+             plan: Optional[Dict[str, List[int]]] = None) -> Dict[str, List[int]]:
+        """Blocking wrapper around scan_async"""
+        return asyncio.run(self.scan_async(hosts, ports, plan))
+
+
+def main():
+    import ipaddress
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python3 udp_engine.py <ip|cidr> [ports] [community]")
+        sys.exit(1)
+
+    target = sys.argv[1]
+    ports = [int(p) for p in sys.argv[2].split(',')] if len(sys.argv) > 2 else sorted(UDP_PORTS)
+    hosts = [str(h) for h in ipaddress.ip_network(target, strict=False).hosts()] or [target]
+
+    engine = UdpProbeEngine(community=sys.argv[3] if len(sys.argv) > 3 else 'public')
+    for ip, open_ports in engine.scan(hosts, ports).items():
+        if open_ports:
+            print(f"  {ip:15} | {open_ports}")
+
+    s = engine.stats
+    print(f"✅ {s['probes']} UDP probes ({s['datagrams_sent']} datagrams) to {s['hosts']} hosts "
+          f"in {s['elapsed_s']}s - {s['open']} answered")
+
+
+if __name__ == "__main__":
+    main()
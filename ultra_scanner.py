@@ -5,31 +5,42 @@ Zero-Config | Optimized for Speed | Production-Ready
 
 Performance Optimizations:
 - Parallel ARP scanning  
-- Async port checking with ThreadPoolExecutor
+- Async port checking on one event loop (AsyncPortEngine)
 - Reduced timeout values (0.3s per port)
-- Smart device limits (top 20 devices)
+- Global + per-host connect budgets (no device cap)
 - Minimal dependencies
 
 All data is LIVE - NO fake/demo/example data!
 """
 
+import asyncio
 import json
+import multiprocessing
+import os
 import subprocess
 import socket
 import time
-import re
 import concurrent.futures
 from datetime import datetime
 from typing import Dict, List, Optional
 import ipaddress
 
-# Optional: Scapy for fast ARP
-try:
-    from scapy.all import ARP, Ether, srp, conf
-    conf.verb = 0  # Suppress output
-    SCAPY_AVAILABLE = True
-except ImportError:
-    SCAPY_AVAILABLE = False
+from port_engine import AsyncPortEngine
+from syn_engine import SynScanEngine, raw_sockets_available
+from pinger import get_pinger
+from oui_db import get_oui_db
+from dns_resolver import get_resolver
+from network_ranges import local_network, local_networks, is_local, parse_ranges, shard_ranges
+from device_classifier import BitmaskClassifier
+from scan_telemetry import ScanTelemetry, ping_fields
+from export_writer import write_snapshot
+from rate_governor import describe, get_governor, merge_rate_stats, use_profile
+from port_cache import PortCache, merge_cache_stats
+from udp_engine import UDP_PORTS, UdpProbeEngine
+from lazy_imports import is_available, load_scapy
+
+# Optional: Scapy for fast ARP (loaded lazily in the ARP phase)
+SCAPY_AVAILABLE = is_available('scapy')
 
 
 class UltraScanner:
@@ -38,33 +49,114 @@ class UltraScanner:
     Target: Complete scan in <20 seconds
     """
     
-    def __init__(self, network_range: str = None):
-        self.network_range = network_range or self._detect_network()
+    def __init__(self, network_range: str = None, incremental: bool = None):
+        self.config = self._load_config()
+        configured = self.config['network_range']
+        if configured == 'auto':
+            configured = None
+        
+        # One or more CIDRs of any size, split into shards for the process pool
+        self.networks = parse_ranges(network_range or configured or self._detect_network())
+        self.network_range = ', '.join(str(n) for n in self.networks)
+        self.shards = [str(n) for n in shard_ranges(self.networks, self.config['shard_prefix'])]
+        self.incremental = self.config['incremental'] if incremental is None else incremental
+        self.host_ttl = self.config['host_ttl']
+        self.pipeline = self.config['pipeline']
         self.devices = {}
+        self._previous = None  # MAC -> last probed device (incremental mode)
         self.mac_vendors = self._init_mac_vendors()
         self.port_signatures = self._init_port_signatures()
+        self.classifier = BitmaskClassifier(self.port_signatures)
+        self.port_engine = AsyncPortEngine(max_in_flight=512, per_host=32, timeout=0.3)
+        self.syn_engine = None  # half-open scanning (opt-in, needs raw sockets)
+        self.port_cache = None  # MAC -> open ports (sample revalidation between full scans)
+        self._save_port_cache = True  # shard workers hand entries to the parent instead
+        if self.config['port_cache']:
+            self.port_cache = PortCache(self.config['port_cache_file'],
+                                        ttl=self.config['port_cache_ttl'],
+                                        max_entries=self.config['port_cache_size'],
+                                        sample_size=self.config['port_cache_sample'])
+        # UDP-only services (53, 161, 3478) go to the UDP engine, the rest to TCP
+        self.udp_engine = None
+        if self.config['udp_scan']:
+            self.udp_engine = UdpProbeEngine(timeout=self.config['udp_timeout'],
+                                             community=self.config['snmp_community'])
+        self.important_ports = [
+            21, 22, 23, 53, 80, 139, 161, 443, 445, 515, 631,
+            3074, 3306, 3389, 3478, 5000, 8000, 8080, 8443,
+            9100, 10001
+        ]
+        self.scan_stats = {}
+        self.telemetry = ScanTelemetry()
         self._last_scan_time = 0
         
         print("🚀 Ultra Network Scanner (Optimized)")
         print(f"   Network: {self.network_range}")
+        if len(self.shards) > 1:
+            print(f"   Shards: {len(self.shards)} x /{self.config['shard_prefix']} (process pool)")
         print(f"   Scapy: {'✅' if SCAPY_AVAILABLE else '❌ (using fallback)'}")
+        if self.incremental:
+            print(f"   Incremental: ✅ (host TTL {self.host_ttl}s)")
+        print(f"   Rate limit: {describe(get_governor())}")
+        if self.config['syn_scan']:
+            self.enable_syn_scan()
     
-    def _detect_network(self) -> str:
-        """Auto-detect local network - FAST"""
+    def _load_config(self, config_file: str = 'monitor_config.json') -> Dict:
+        """Scanner settings from monitor_config.json ('scanner' section)"""
+        defaults = {
+            'incremental': True,
+            'host_ttl': 300,
+            'pipeline': True,
+            'pipeline_queue': 64,
+            'shard_prefix': 24,
+            'shard_workers': 0,       # 0 = one process per core
+            'syn_scan': False,        # half-open SYN scan (root / CAP_NET_RAW)
+            'syn_rate': 5000,         # SYN packets per second
+            'telemetry': True,        # <export>.telemetry.json + <export>.prom
+            'port_cache': True,       # open ports per MAC, sample revalidation
+            'port_cache_file': 'port_cache.json',
+            'port_cache_ttl': 3600,   # full port rescan after this many seconds
+            'port_cache_size': 4096,  # entries (LRU)
+            'port_cache_sample': 4,   # ports re-probed for a fresh entry
+            'udp_scan': True,         # DNS / SNMP / STUN service probes
+            'udp_timeout': 0.5,
+            'snmp_community': 'public',  # from the 'snmp' section
+            'network_range': 'auto',  # top-level key, string or list of CIDRs
+        }
+        
         try:
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.settimeout(1)
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-            
-            parts = local_ip.split('.')
-            return f"{parts[0]}.{parts[1]}.{parts[2]}.0/24"
-        except:
-            return "192.168.1.0/24"
+            with open(config_file, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return defaults
+        
+        return {**defaults, 'network_range': data.get('network_range', 'auto'),
+                'snmp_community': data.get('snmp', {}).get('community', 'public'),
+                **data.get('scanner', {})}
+    
+    def enable_syn_scan(self) -> bool:
+        """Use the SYN engine for port scans - connect engine if no raw sockets"""
+        if raw_sockets_available():
+            self.syn_engine = SynScanEngine(rate=self.config['syn_rate'])
+            print(f"   SYN scan: ✅ ({self.config['syn_rate']} pkts/s)")
+            return True
+        self.syn_engine = None
+        print("   SYN scan: ❌ no raw sockets (needs root), using connect engine")
+        return False
+    
+    def _detect_network(self) -> str:
+        """Auto-detect local network with its real prefix (/20, /21, ...)"""
+        return local_network()
+    
+    def _is_routed(self) -> bool:
+        """No local interface in any target range -> ARP can't reach it"""
+        interfaces = local_networks()
+        if not interfaces:
+            return False  # unknown (no `ip` tool) - try ARP as before
+        return not any(is_local(n, interfaces) for n in self.networks)
     
     def _init_mac_vendors(self) -> Dict:
-        """MAC OUI Database - 100+ Vendors"""
+        """Curated short names (classification keys) - rest via oui_db"""
         return {
             # Networking
             '00:1F:CA': 'Cisco', '00:24:C3': 'Cisco', '00:0A:B8': 'Cisco',
@@ -140,7 +232,10 @@ class UltraScanner:
         
         devices = {}
         
-        if SCAPY_AVAILABLE:
+        if self._is_routed():
+            print("Method: ICMP sweep (routed range, no ARP)")
+            devices = self._icmp_discovery()
+        elif SCAPY_AVAILABLE:
             print("Method: Scapy ARP (Parallel)")
             devices = self._arp_scapy_fast()
         else:
@@ -156,12 +251,16 @@ class UltraScanner:
         start_time = time.time()
         
         try:
-            arp = ARP(pdst=self.network_range)
-            ether = Ether(dst="ff:ff:ff:ff:ff:ff")
+            scapy = load_scapy()
+            arp = scapy.ARP(pdst=self.network_range)
+            ether = scapy.Ether(dst="ff:ff:ff:ff:ff:ff")
             packet = ether/arp
             
-            # OPTIMIZED: timeout=2s, retry=2
-            result = srp(packet, timeout=2, verbose=0, retry=2)[0]
+            # OPTIMIZED: timeout=2s, retry=2 (inter: paced to the rate budget)
+            governor = get_governor()
+            result, unanswered = scapy.srp(packet, timeout=2, verbose=0, retry=2,
+                                           inter=governor.interval())
+            governor.record(len(result) + 3 * len(unanswered), 'arp')
             
             for sent, received in result:
                 ip = received.psrc
@@ -174,6 +273,8 @@ class UltraScanner:
                     'vendor': vendor,
                     'method': 'arp'
                 }
+                if getattr(sent, 'sent_time', None):
+                    devices[ip]['rtt_ms'] = round((received.time - sent.sent_time) * 1000, 3)
                 
                 print(f"  {ip:15} | {mac:17} | {vendor}")
         
@@ -190,29 +291,17 @@ class UltraScanner:
         
         try:
             result = subprocess.run(
-                ['arp-scan', '--localnet', '--quiet', '--retry=2'],
+                self._arp_scan_command(),
                 capture_output=True,
                 text=True,
                 timeout=8
             )
             
             for line in result.stdout.split('\n'):
-                parts = line.split('\t')
-                if len(parts) >= 2:
-                    ip = parts[0].strip()
-                    mac = parts[1].strip().upper()
-                    
-                    try:
-                        ipaddress.ip_address(ip)
-                        devices[ip] = {
-                            'ip': ip,
-                            'mac': mac,
-                            'vendor': self._lookup_vendor(mac),
-                            'method': 'arp'
-                        }
-                        print(f"  {ip:15} | {mac:17} | {devices[ip]['vendor']}")
-                    except:
-                        pass
+                device = self._parse_arp_scan_line(line)
+                if device:
+                    devices[device['ip']] = device
+                    print(f"  {device['ip']:15} | {device['mac']:17} | {device['vendor']}")
         
         except Exception as e:
             print(f"  ⚠️  arp-scan failed: {e}")
@@ -220,71 +309,291 @@ class UltraScanner:
         self._last_scan_time = time.time() - start_time
         return devices
     
+    def _icmp_discovery(self) -> Dict:
+        """Routed ranges: ONE ICMP batch over all addresses (no MAC/vendor)"""
+        devices = {}
+        start_time = time.time()
+        
+        hosts = [str(h) for network in self.networks for h in network.hosts()]
+        results = get_pinger().ping_many(hosts, timeout=1.0)
+        
+        for ip in hosts:
+            if results[ip]['alive']:
+                devices[ip] = {'ip': ip, 'mac': '', 'vendor': 'Unknown', 'method': 'icmp',
+                               'rtt_ms': results[ip]['rtt_ms']}
+                print(f"  {ip:15} | {'-':17} | Unknown")
+        
+        self._last_scan_time = time.time() - start_time
+        return devices
+    
+    def _parse_arp_scan_line(self, line: str) -> Optional[Dict]:
+        """arp-scan output: IP<tab>MAC<tab>..."""
+        parts = line.split('\t')
+        if len(parts) < 2:
+            return None
+        
+        ip = parts[0].strip()
+        mac = parts[1].strip().upper()
+        try:
+            ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+        
+        return {
+            'ip': ip,
+            'mac': mac,
+            'vendor': self._lookup_vendor(mac),
+            'method': 'arp'
+        }
+    
+    def arp_stream(self, on_host) -> int:
+        """
+        Streaming ARP: on_host(ip, device) is called for EACH reply
+        as soon as it arrives (pipeline mode). Returns host count.
+        """
+        start_time = time.time()
+        count = 0
+        
+        if self._is_routed():
+            for ip, device in self._icmp_discovery().items():
+                on_host(ip, device)
+                count += 1
+        elif SCAPY_AVAILABLE:
+            try:
+                count = self._arp_scapy_stream(on_host)
+            except Exception as e:
+                # No sniffer available - batch ARP, then hand over
+                print(f"  ⚠️  Scapy streaming failed ({e}), using batch ARP")
+                for ip, device in self._arp_scapy_fast().items():
+                    on_host(ip, device)
+                    count += 1
+        else:
+            count = self._arp_system_stream(on_host)
+        
+        self._last_scan_time = time.time() - start_time
+        return count
+    
+    def _arp_scapy_stream(self, on_host) -> int:
+        """Sniff replies while sending - same budget as srp(timeout=2, retry=2)"""
+        import threading
+        
+        scapy = load_scapy()
+        network = ipaddress.ip_network(self.network_range, strict=False)
+        seen = set()
+        started = threading.Event()
+        
+        def _handle(pkt):
+            if scapy.ARP not in pkt or pkt[scapy.ARP].op != 2:  # is-at
+                return
+            ip = pkt[scapy.ARP].psrc
+            if ip in seen or ipaddress.ip_address(ip) not in network:
+                return
+            seen.add(ip)
+            mac = pkt[scapy.ARP].hwsrc.upper()
+            vendor = self._lookup_vendor(mac)
+            print(f"  {ip:15} | {mac:17} | {vendor}")
+            on_host(ip, {'ip': ip, 'mac': mac, 'vendor': vendor, 'method': 'arp'})
+        
+        sniffer = scapy.AsyncSniffer(filter='arp', prn=_handle, store=False,
+                                     started_callback=started.set)
+        sniffer.start()
+        started.wait(2)
+        
+        try:
+            targets = [str(h) for h in network.hosts()] or [str(network.network_address)]
+            for attempt in range(3):  # initial + retry=2
+                pending = [ip for ip in targets if ip not in seen]
+                if not pending:
+                    break
+                for chunk in get_governor().paced(pending, 'arp'):
+                    scapy.sendp(scapy.Ether(dst="ff:ff:ff:ff:ff:ff") / scapy.ARP(pdst=chunk),
+                                verbose=0)
+                time.sleep(0.7 if attempt < 2 else 2)
+        finally:
+            sniffer.stop()
+        
+        return len(seen)
+    
+    def _arp_system_stream(self, on_host) -> int:
+        """arp-scan, line by line while it runs"""
+        count = 0
+        try:
+            process = subprocess.Popen(
+                self._arp_scan_command(),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True
+            )
+            deadline = time.time() + 8
+            for line in process.stdout:
+                device = self._parse_arp_scan_line(line.rstrip('\n'))
+                if device:
+                    print(f"  {device['ip']:15} | {device['mac']:17} | {device['vendor']}")
+                    on_host(device['ip'], device)
+                    count += 1
+                if time.time() > deadline:
+                    process.kill()
+                    break
+            process.wait(timeout=2)
+        except Exception as e:
+            print(f"  ⚠️  arp-scan failed: {e}")
+        
+        return count
+    
+    def _arp_scan_command(self) -> List[str]:
+        """arp-scan paces itself - interval from the rate budget, packets counted up front"""
+        command = ['arp-scan', '--quiet', '--retry=2']
+        governor = get_governor()
+        if governor.pps:
+            command.append(f"--interval={max(1, int(governor.interval() * 1e6))}u")
+        governor.record(sum(n.num_addresses for n in self.networks), 'arp')
+        return command + [str(n) for n in self.networks]
+    
     def port_scan_parallel(self, devices: Dict) -> Dict:
-        """Parallel Port Scan - FAST (5-10s)"""
+        """Parallel Port Scan - SYN or async connect engine, ALL devices"""
+        engine = self.syn_engine or self.port_engine
         print("\n" + "="*70)
-        print("🔎 PHASE 2: PORT SCANNING (Parallel)")
+        print(f"🔎 PHASE 2: PORT SCANNING ({'SYN, raw socket' if self.syn_engine else 'Async'})")
         print("="*70)
         
         start_time = time.time()
         
-        # Important ports
-        important_ports = [
-            21, 22, 23, 53, 80, 139, 443, 445, 515, 631,
-            3074, 3306, 3389, 3478, 5000, 8000, 8080, 8443,
-            9100, 10001
-        ]
+        for ip, device in devices.items():
+            self._seed_rtt(ip, device)
         
-        # Limit to 20 devices for speed
-        target_devices = list(devices.keys())[:20]
+        results = self._scan_ports(engine, devices)
         
-        # Parallel scan
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {
-                executor.submit(self._scan_device_ports, ip, important_ports): ip
-                for ip in target_devices
-            }
-            
-            for future in concurrent.futures.as_completed(futures):
-                ip = futures[future]
-                try:
-                    open_ports = future.result()
-                    if open_ports:
-                        devices[ip]['open_ports'] = open_ports
-                        devices[ip]['port_count'] = len(open_ports)
-                        devices[ip]['device_type'] = self._classify_by_ports(open_ports)
-                        print(f"  {ip:15} | {len(open_ports):2} ports | {devices[ip]['device_type']}")
-                except:
-                    pass
-        
-        print(f"✅ Port scan done in {time.time() - start_time:.1f}s")
+        # All hosts with open ports classified in ONE batch
+        found = [(ip, ports) for ip, ports in results.items() if ports]
+        types = self.classifier.classify_batch([ports for _, ports in found])
+        
+        for (ip, open_ports), device_type in zip(found, types):
+            devices[ip]['open_ports'] = open_ports
+            devices[ip]['port_count'] = len(open_ports)
+            devices[ip]['device_type'] = device_type
+            print(f"  {ip:15} | {len(open_ports):2} ports | {device_type}")
+        
+        stats = self.scan_stats['port_scan']
+        if self.syn_engine:
+            print(f"✅ Port scan done in {time.time() - start_time:.1f}s "
+                  f"({stats['hosts']} hosts, {stats['packets_sent']} SYNs, "
+                  f"{stats['packets_per_sec']:.0f} pkts/s, {stats['filtered']} filtered)")
+        else:
+            print(f"✅ Port scan done in {time.time() - start_time:.1f}s "
+                  f"({stats['hosts']} hosts, {stats['connects']} connects, "
+                  f"{stats['connects_per_sec']:.0f} connects/s)")
+            self._print_rtt_stats(stats)
+        if self.udp_engine is not None:
+            udp = self.udp_engine.stats
+            print(f"📨 UDP services: {udp['probes']} probes (DNS/SNMP/STUN), {udp['open']} answered")
         return devices
     
-    def _scan_device_ports(self, ip: str, ports: List[int]) -> List[int]:
-        """Scan ports for single device - PARALLEL"""
-        open_ports = []
+    def _scan_ports(self, engine, devices: Dict) -> Dict[str, List[int]]:
+        """Engine scan with the port cache: samples for cached hosts, full rescan if they disagree"""
+        plan = {ip: self._ports_to_probe(ip, device) for ip, device in devices.items()}
+        results = self._scan_tcp_udp(engine, plan)
+        stats = dict(engine.stats)
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-            futures = {
-                executor.submit(self._check_port, ip, port): port
-                for port in ports
-            }
-            
-            for future in concurrent.futures.as_completed(futures):
-                port = futures[future]
-                try:
-                    if future.result():
-                        open_ports.append(port)
-                except:
-                    pass
+        rescan = []
+        for ip, open_now in results.items():
+            open_ports = self._cached_ports(ip, devices[ip], plan[ip], open_now)
+            if open_ports is None:
+                rescan.append(ip)
+            else:
+                results[ip] = open_ports
+        
+        if rescan:
+            again = self._scan_tcp_udp(engine, {ip: list(self.important_ports) for ip in rescan})
+            stats = self._merge_port_stats(stats, engine.stats)
+            for ip, open_ports in again.items():
+                results[ip] = self._cached_ports(ip, devices[ip], self.important_ports, open_ports)
+        
+        self.scan_stats['port_scan'] = stats
+        return results
+    
+    def _split_ports(self, ports: List[int]) -> tuple:
+        """-> (TCP ports, UDP service ports); all TCP without the UDP engine"""
+        if self.udp_engine is None:
+            return list(ports), []
+        return ([p for p in ports if p not in UDP_PORTS],
+                [p for p in ports if p in UDP_PORTS])
+    
+    def _scan_tcp_udp(self, engine, plan: Dict[str, List[int]]) -> Dict[str, List[int]]:
+        """TCP engine and UDP probes side by side (UDP on its own loop in a thread)"""
+        split = {ip: self._split_ports(ports) for ip, ports in plan.items()}
+        tcp_plan = {ip: tcp for ip, (tcp, _) in split.items()}
+        udp_plan = {ip: udp for ip, (_, udp) in split.items() if udp}
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            udp_job = (executor.submit(self.udp_engine.scan, list(udp_plan), [], udp_plan)
+                       if udp_plan else None)
+            results = engine.scan(list(plan), self.important_ports, tcp_plan)
+            udp_results = udp_job.result() if udp_job else {}
         
-        return sorted(open_ports)
+        self.telemetry.hosts_from_engine(engine.host_stats)
+        for ip, open_udp in udp_results.items():
+            results[ip] = sorted(results.get(ip, []) + open_udp)
+        return results
+    
+    async def _probe_host(self, ip: str, ports: List[int]) -> List[int]:
+        """One host, TCP and UDP concurrently (scan pipeline)"""
+        tcp, udp = self._split_ports(ports)
+        if not udp:
+            return await self.port_engine.scan_host(ip, tcp)
+        tcp_open, udp_open = await asyncio.gather(self.port_engine.scan_host(ip, tcp),
+                                                  self.udp_engine.scan_host(ip, udp))
+        return sorted(tcp_open + udp_open)
     
-    def _check_port(self, ip: str, port: int, timeout: float = 0.3) -> bool:
-        """TCP port check - OPTIMIZED (0.3s timeout)"""
+    def _ports_to_probe(self, ip: str, device: Dict) -> List[int]:
+        """All ports, or a revalidation sample for a fresh cache entry (incremental mode)"""
+        if self.port_cache is None or not self.incremental:
+            return list(self.important_ports)
+        return self.port_cache.plan(device.get('mac'), ip, self.important_ports)[1]
+    
+    def _cached_ports(self, ip: str, device: Dict, probed: List[int],
+                      open_now: List[int]) -> Optional[List[int]]:
+        """Probe result -> open ports (full scans update the cache), None = rescan all ports"""
+        if self.port_cache is None:
+            return sorted(open_now)
+        return self.port_cache.resolve(device.get('mac'), ip, self.important_ports,
+                                       probed, open_now)
+    
+    @staticmethod
+    def _merge_port_stats(first: Dict, second: Dict) -> Dict:
+        """Engine stats of two passes (sample + rescan) -> one entry"""
+        merged = dict(first)
+        for key, value in second.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if key in ('max_in_flight', 'rtt_hosts'):
+                merged[key] = max(merged.get(key, 0), value)
+            elif key not in ('connects_per_sec', 'packets_per_sec'):
+                merged[key] = round(merged.get(key, 0) + value, 3)
+        elapsed = merged.get('elapsed_s') or 0
+        for rate, count in (('connects_per_sec', 'connects'), ('packets_per_sec', 'packets_sent')):
+            if rate in merged and elapsed:
+                merged[rate] = round(merged[count] / elapsed, 1)
+        return merged
+    
+    def _seed_rtt(self, ip: str, device: Dict):
+        """First RTT estimate: ARP/ICMP reply of this scan, else last scan's latency"""
+        rtt_ms = device.get('rtt_ms')
+        if rtt_ms is None and self._previous:
+            rtt_ms = self._previous.get(device.get('mac') or ip, {}).get('latency_ms')
+        self.port_engine.seed_rtt(ip, rtt_ms)
+    
+    def _print_rtt_stats(self, stats: Dict):
+        if stats.get('adaptive_probes'):
+            print(f"⏱️  Adaptive timeouts: {stats['adaptive_probes']} probes, "
+                  f"{stats['probe_wait_saved_s']:.1f}s wait saved, "
+                  f"{stats['retransmissions_avoided']} retransmissions avoided")
+    
+    def _check_port(self, ip: str, port: int, timeout: Optional[float] = None) -> bool:
+        """TCP port check - timeout from the host's measured RTT (0.3s if unknown)"""
+        get_governor().acquire(1, 'tcp')
         try:
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
+            sock.settimeout(timeout or self.port_engine.timeout_for(ip))
             result = sock.connect_ex((ip, port))
             sock.close()
             return result == 0
@@ -292,63 +601,55 @@ class UltraScanner:
             return False
     
     def _classify_by_ports(self, open_ports: List[int]) -> str:
-        """Device type by port signature"""
-        open_set = set(open_ports)
-        scores = {}
-        
-        for device_type, sig in self.port_signatures.items():
-            required = sum(1 for p in sig['required'] if p in open_set)
-            if required == 0:
-                continue
-            
-            optional = sum(1 for p in sig['optional'] if p in open_set)
-            scores[device_type] = required * 10 + optional
-        
-        if not scores:
-            return 'unknown'
-        
-        return max(scores.items(), key=lambda x: x[1])[0]
+        """Device type by port signature (bitmask scoring)"""
+        return self.classifier.classify_ports(open_ports)
     
     def enrich_devices(self, devices: Dict) -> Dict:
-        """Device enrichment - PARALLEL (3-5s)"""
+        """Device enrichment - batched ICMP + PTR, ALL devices"""
         print("\n" + "="*70)
-        print("🏷️  PHASE 3: ENRICHMENT (Parallel)")
+        print("🏷️  PHASE 3: ENRICHMENT (Batched)")
         print("="*70)
         
         start_time = time.time()
+        ips = list(devices.keys())
         
-        target_devices = list(devices.items())[:20]
+        # Latency and hostnames: ONE ICMP batch + ONE DNS socket for all targets
+        dns_ms = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            ping_job = executor.submit(get_pinger().ping_many, ips, timeout=1.0)
+            self.telemetry.sample('enrich')
+            names = get_resolver().resolve_many(ips, timings=dns_ms)
+            pings = ping_job.result()
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {
-                executor.submit(self._enrich_device, ip, device): ip
-                for ip, device in target_devices
-            }
-            
-            for future in concurrent.futures.as_completed(futures):
-                ip = futures[future]
-                try:
-                    enriched = future.result()
-                    devices[ip].update(enriched)
-                    
-                    icon = self._get_icon(devices[ip]['final_type'])
-                    print(f"  {icon} {ip:15} | {devices[ip]['final_type']:15} | "
-                          f"{devices[ip]['hostname']}")
-                except:
-                    pass
+        for ip in ips:
+            rtt = pings.get(ip, {}).get('rtt_ms')
+            self.telemetry.host(ip, dns_ms=dns_ms.get(ip), **ping_fields(rtt))
+            devices[ip].update(self._enrich_device(
+                ip, devices[ip], rtt,
+                names.get(ip) or self._default_hostname(ip),
+                ping=False    # batch miss = no ICMP answer, no second ping
+            ))
+            icon = self._get_icon(devices[ip]['final_type'])
+            print(f"  {icon} {ip:15} | {devices[ip]['final_type']:15} | "
+                  f"{devices[ip]['hostname']}")
         
+        self.scan_stats['dns'] = get_resolver().cache_stats()
         print(f"✅ Enrichment done in {time.time() - start_time:.1f}s")
         return devices
     
-    def _enrich_device(self, ip: str, device: Dict) -> Dict:
-        """Enrich single device"""
+    def _enrich_device(self, ip: str, device: Dict,
+                       latency: Optional[float] = None,
+                       hostname: Optional[str] = None,
+                       ping: bool = True) -> Dict:
+        """Enrich single device - ping=False: latency is final (batch result)"""
         enriched = {}
         
-        # Hostname (1s timeout)
-        enriched['hostname'] = self._resolve_hostname(ip)
+        # Hostname (from batch lookup, or cached PTR resolver)
+        enriched['hostname'] = hostname or self._resolve_hostname(ip)
         
-        # Latency (quick ping)
-        latency = self._measure_latency_fast(ip)
+        # Latency (from batch ping, or quick single ping)
+        if latency is None and ping:
+            latency = self._measure_latency_fast(ip)
         if latency:
             enriched['latency_ms'] = latency
         
@@ -358,69 +659,31 @@ class UltraScanner:
         return enriched
     
     def _resolve_hostname(self, ip: str) -> str:
-        """DNS with timeout"""
-        try:
-            socket.setdefaulttimeout(1)
-            hostname = socket.gethostbyaddr(ip)[0]
-            socket.setdefaulttimeout(None)
-            return hostname
-        except:
-            socket.setdefaulttimeout(None)
-            return f"device-{ip.split('.')[-1]}"
+        """PTR lookup (async resolver, cached - no global socket timeout)"""
+        return get_resolver().resolve(ip) or self._default_hostname(ip)
+    
+    def _default_hostname(self, ip: str) -> str:
+        return f"device-{ip.split('.')[-1]}"
     
     def _measure_latency_fast(self, ip: str) -> Optional[float]:
-        """Fast ping"""
+        """Fast ping (in-process ICMP)"""
         try:
-            result = subprocess.run(
-                ['ping', '-c', '1', '-W', '1', ip],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            
-            match = re.search(r'time=([\d.]+)', result.stdout)
-            if match:
-                return float(match.group(1))
+            rtt = get_pinger().ping(ip, timeout=1.0)
+            if rtt is not None:
+                return round(rtt, 2)
         except:
             pass
         
         return None
     
     def _multi_factor_classify(self, device: Dict) -> str:
-        """Multi-factor classification"""
-        vendor = device.get('vendor', '').lower()
-        
-        # Vendor first
-        vendor_map = {
-            'cisco': 'router', 'juniper': 'router',
-            'ubiquiti': 'wlan_ap', 'mikrotik': 'router',
-            'playstation': 'gaming_console', 'xbox': 'gaming_console',
-            'nintendo': 'gaming_console',
-            'synology': 'nas', 'qnap': 'nas',
-            'raspberry': 'raspberry_pi',
-        }
-        
-        for key, val in vendor_map.items():
-            if key in vendor:
-                return val
-        
-        # Port-based
-        if device.get('device_type', 'unknown') != 'unknown':
-            return device['device_type']
-        
-        # Hostname
-        hostname = device.get('hostname', '').lower()
-        if any(x in hostname for x in ['router', 'gw']):
-            return 'router'
-        elif 'ap' in hostname or 'unifi' in hostname:
-            return 'wlan_ap'
-        
-        return 'unknown'
+        """Multi-factor classification: vendor -> ports -> hostname"""
+        return self.classifier.final_type(device)
     
     def _lookup_vendor(self, mac: str) -> str:
-        """MAC lookup"""
+        """MAC lookup - curated names first, then the full IEEE registry"""
         oui = mac[:8].upper()
-        return self.mac_vendors.get(oui, 'Unknown')
+        return self.mac_vendors.get(oui) or get_oui_db().lookup(mac) or 'Unknown'
     
     def _get_icon(self, device_type: str) -> str:
         """Device icon"""
@@ -438,31 +701,280 @@ class UltraScanner:
         print("="*70)
         print(f"Network: {self.network_range}")
         print(f"Time: {datetime.now().strftime('%H:%M:%S')}")
+        if self.syn_engine:
+            mode = 'phased (SYN scan)'  # one paced SYN batch for all hosts
+        else:
+            mode = 'pipeline (streaming)' if self.pipeline else 'phased'
+        if len(self.shards) > 1:
+            mode = f"sharded, {mode} per shard"
+        print(f"Mode: {mode}")
         
         total_start = time.time()
+        self.scan_stats = {}
+        self.telemetry = ScanTelemetry()
+        get_governor().reset_stats()
+        if self.port_cache is not None:
+            self.port_cache.reset_stats()
+        if self.udp_engine is not None:
+            self.udp_engine.reset_stats()
         
-        # Phase 1: ARP (2-3s)
-        devices = self.arp_discovery()
-        
-        # Phase 2: Ports (5-10s)
-        if devices:
-            devices = self.port_scan_parallel(devices)
+        if len(self.shards) > 1:
+            with self.telemetry.phase('shards'):
+                devices = self._sharded_scan()
+        elif self.pipeline and not self.syn_engine:
+            from scan_pipeline import ScanPipeline
+            with self.telemetry.phase('pipeline'):
+                devices = ScanPipeline(self, queue_size=self.config['pipeline_queue']).run()
+        else:
+            devices = self._phased_scan()
         
-        # Phase 3: Enrich (3-5s)
-        if devices:
-            devices = self.enrich_devices(devices)
+        self._remember(devices)
+        if 'rate' not in self.scan_stats:
+            self.scan_stats['rate'] = get_governor().stats()
+        if self.udp_engine is not None:
+            self.scan_stats.setdefault('udp_scan', dict(self.udp_engine.stats))
+            self.telemetry.hosts_from_engine(self.udp_engine.host_stats)
+        if self.port_cache is not None:
+            self.scan_stats.setdefault('port_cache', self.port_cache.summary())
+            if self._save_port_cache:
+                self.port_cache.save()
+        self.telemetry.finish()
         
         total_time = time.time() - total_start
+        rate = self.scan_stats['rate']
         
         print("\n" + "="*70)
         print(f"⚡ TOTAL: {total_time:.1f}s")
+        print(f"🚦 Probe rate: {rate['achieved_pps']:.0f} pkts/s avg, {rate['peak_pps']} peak "
+              f"({rate['packets']} packets, profile {rate['profile']}"
+              + (f", limit {rate['pps_limit']:g}/s" if rate['pps_limit'] else '') + ")")
+        cache = self.scan_stats.get('port_cache')
+        if cache:
+            print(f"🗃️  Port cache: {cache['hits']} hits, {cache['misses']} misses, "
+                  f"{cache['expired']} expired, {cache['moved']} moved, "
+                  f"{cache['invalidated']} invalidated ({cache['port_probes_saved']} probes saved)")
+        slowest = self.telemetry.slowest_hosts(top=1)
+        if slowest:
+            print(f"🐢 Slowest host: {slowest[0][0]} ({slowest[0][1]:.0f} ms port scan)")
         print("="*70)
         
         self.devices = devices
         return devices
     
-    def export_results(self, filename: str = 'network_data.json'):
-        """Export results"""
+    def _sharded_scan(self) -> Dict:
+        """Shards on a process pool (one process per core), results merged"""
+        workers = min(len(self.shards), self.config['shard_workers'] or os.cpu_count() or 1)
+        
+        print("\n" + "="*70)
+        print(f"🧩 SHARDED SCAN: {len(self.shards)} shards on {workers} processes")
+        print("="*70)
+        
+        if self.incremental and self._previous is None:
+            self._previous = self._load_previous_snapshot()
+        options = {
+            'incremental': self.incremental,
+            'pipeline': self.pipeline,
+            'syn_scan': self.syn_engine is not None,
+            'previous': (self._previous or {}) if self.incremental else {},
+            # The packet budget and the SYN rate are split across the worker processes
+            'rate_profile': get_governor().profile,
+            'rate_share': 1.0 / workers,
+            'syn_rate': max(1, int(self.config['syn_rate'] / workers)),
+        }
+        
+        start_time = time.time()
+        devices, timings = {}, []
+        totals = dict.fromkeys(['hosts', 'connects', 'open', 'refused', 'timeouts', 'errors',
+                                'adaptive_probes', 'probe_wait_saved_s',
+                                'retransmissions_avoided'], 0)
+        probed = carried = 0
+        rates, caches = [], []
+        udp_totals = {}
+        
+        # spawn: forked children would inherit the resolver/pinger without their threads
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_shard_worker,
+                initargs=(options,)) as pool:
+            futures = [pool.submit(_scan_shard, shard) for shard in self.shards]
+            
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                devices.update(result['devices'])
+                
+                port_stats = result['stats'].get('port_scan', {})
+                for key in totals:
+                    totals[key] += port_stats.get(key, 0)
+                incremental = result['stats'].get('incremental', {})
+                probed += incremental.get('hosts_probed', 0)
+                carried += incremental.get('hosts_carried', 0)
+                if 'rate' in result['stats']:
+                    rates.append(result['stats']['rate'])
+                if 'port_cache' in result['stats']:
+                    caches.append(result['stats']['port_cache'])
+                for key, value in result['stats'].get('udp_scan', {}).items():
+                    if isinstance(value, (int, float)):
+                        udp_totals[key] = round(udp_totals.get(key, 0) + value, 3)
+                if self.port_cache is not None and result.get('port_cache'):
+                    self.port_cache.merge(result['port_cache'])
+                
+                self.telemetry.merge(result.get('telemetry', {}), prefix=f"{result['shard']}:")
+                
+                timing = {key: result[key] for key in ('shard', 'discovery_s', 'elapsed_s')}
+                timing['devices'] = len(result['devices'])
+                if 'error' in result:
+                    timing['error'] = result['error']
+                timings.append(timing)
+                
+                icon = '❌' if 'error' in result else '✅'
+                print(f"  {icon} {result['shard']:18} | {timing['devices']:4} devices | "
+                      f"discovery {timing['discovery_s']:5.1f}s | total {timing['elapsed_s']:5.1f}s")
+        
+        elapsed = time.time() - start_time
+        timings.sort(key=lambda t: ipaddress.ip_network(t['shard']))
+        
+        self.scan_stats['port_scan'] = {
+            **totals,
+            'elapsed_s': round(elapsed, 3),
+            'connects_per_sec': round(totals['connects'] / elapsed, 1) if elapsed else 0,
+        }
+        self.scan_stats['shards'] = timings
+        self.scan_stats['rate'] = merge_rate_stats(rates, elapsed) or get_governor().stats()
+        if udp_totals:
+            self.scan_stats['udp_scan'] = {'engine': 'udp', **udp_totals}
+        if self.port_cache is not None and caches:
+            self.scan_stats['port_cache'] = {**merge_cache_stats(caches),
+                                             'entries': len(self.port_cache)}
+        if self.incremental:
+            self._incremental_stats(probed, carried)
+        
+        slowest = max(timings, key=lambda t: t['elapsed_s'])
+        print(f"✅ {len(timings)} shards merged: {len(devices)} devices in {elapsed:.1f}s "
+              f"(slowest: {slowest['shard']} {slowest['elapsed_s']:.1f}s)")
+        return devices
+    
+    def _phased_scan(self) -> Dict:
+        """ARP -> ports -> enrichment, each phase a barrier"""
+        # Phase 1: ARP (2-3s)
+        with self.telemetry.phase('arp'):
+            devices = self.arp_discovery()
+        
+        # Incremental: only new / changed / expired hosts get probed
+        carried = {}
+        if devices and self.incremental:
+            devices, carried = self._split_incremental(devices)
+        
+        # Phase 2: Ports (5-10s)
+        if devices:
+            with self.telemetry.phase('ports'):
+                devices = self.port_scan_parallel(devices)
+        
+        # Phase 3: Enrich (3-5s)
+        if devices:
+            with self.telemetry.phase('enrich'):
+                devices = self.enrich_devices(devices)
+        
+        if carried:
+            with self.telemetry.phase('refresh'):
+                self._refresh_carried(carried)
+        
+        probed_at = time.time()
+        for device in devices.values():
+            device['probed_at'] = probed_at
+        devices.update(carried)
+        return devices
+    
+    def _carry_forward(self, ip: str, device: Dict, now: float) -> Optional[Dict]:
+        """Previous results if host is unchanged, else None (= probe it)"""
+        if self._previous is None:
+            self._previous = self._load_previous_snapshot()
+        
+        prev = self._previous.get(device.get('mac') or ip)
+        
+        if (prev is None                                   # new MAC
+                or prev.get('ip') != ip                    # moved to a new IP
+                or now - prev.get('probed_at', 0) > self.host_ttl):  # expired
+            return None
+        return {**prev, **device}
+    
+    def _incremental_stats(self, probed: int, carried: int) -> Dict:
+        skipped_ports = carried * len(self.important_ports)
+        self.scan_stats['incremental'] = {
+            'hosts_probed': probed,
+            'hosts_carried': carried,
+            'port_probes_skipped': skipped_ports,
+            'dns_lookups_skipped': carried,
+        }
+        
+        print(f"♻️  Incremental: {probed} probed, {carried} unchanged "
+              f"({skipped_ports} port probes + {carried} DNS lookups skipped)")
+        return self.scan_stats['incremental']
+    
+    def _split_incremental(self, devices: Dict) -> tuple:
+        """Split ARP result into (to probe, carried forward) by MAC"""
+        now = time.time()
+        to_probe, carried = {}, {}
+        
+        for ip, device in devices.items():
+            previous = self._carry_forward(ip, device, now)
+            if previous is None:
+                to_probe[ip] = device
+            else:
+                carried[ip] = previous
+        
+        self._incremental_stats(len(to_probe), len(carried))
+        return to_probe, carried
+    
+    def _refresh_carried(self, carried: Dict):
+        """Unchanged hosts: keep results, only refresh latency (one ICMP batch)"""
+        pings = get_pinger().ping_many(list(carried.keys()), timeout=1.0)
+        for ip, device in carried.items():
+            rtt = pings.get(ip, {}).get('rtt_ms')
+            self.telemetry.host(ip, carried=True, **ping_fields(rtt))
+            if rtt is not None:
+                device['latency_ms'] = round(rtt, 2)
+    
+    def _remember(self, devices: Dict):
+        """Snapshot for the next incremental run"""
+        self._previous = {
+            (device.get('mac') or ip): {**device, 'ip': ip}
+            for ip, device in devices.items()
+        }
+    
+    def _load_previous_snapshot(self, filename: str = 'network_data.json') -> Dict:
+        """Seed incremental state from the last export (one-shot runs)"""
+        try:
+            with open(filename, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        
+        if data.get('scan_method') != 'ultra_scanner_optimized':
+            return {}
+        
+        previous = {}
+        for ip, dev in data.get('devices', {}).items():
+            if 'last_probed' not in dev:
+                continue
+            open_ports = dev.get('open_ports', [])
+            entry = {
+                'ip': ip,
+                'mac': dev.get('mac', ''),
+                'hostname': dev.get('hostname'),
+                'final_type': dev.get('type', 'unknown'),
+                'probed_at': dev['last_probed'],
+            }
+            if open_ports:
+                entry['open_ports'] = open_ports
+                entry['port_count'] = len(open_ports)
+                entry['device_type'] = self._classify_by_ports(open_ports)
+            previous[entry['mac'] or ip] = entry
+        
+        return previous
+    
+    def export_results(self, filename: str = 'network_data.json', history: bool = True):
+        """Export results (history=False: no samples in the history ring)"""
         output = {
             'timestamp': datetime.now().isoformat(),
             'network_range': self.network_range,
@@ -486,13 +998,22 @@ class UltraScanner:
                     'latency_ms': device.get('latency_ms', 0),
                     'port_count': device.get('port_count', 0)
                 },
-                'discovery_method': 'ultra_scanner'
+                'discovery_method': 'ultra_scanner',
+                'last_probed': device.get('probed_at', 0)
             }
         
-        with open(filename, 'w') as f:
-            json.dump(output, f, indent=2)
+        if 'incremental' in self.scan_stats:
+            output['incremental'] = self.scan_stats['incremental']
+        if 'shards' in self.scan_stats:
+            output['shards'] = self.scan_stats['shards']
         
-        print(f"\n💾 Results: {filename}")
+        if write_snapshot(filename, output, history=history):
+            print(f"\n💾 Results: {filename}")
+        else:
+            print(f"\n💾 Results unchanged, {filename} not rewritten")
+        if self.config['telemetry']:
+            json_path, prom_path = self.telemetry.write(filename, self.scan_stats)
+            print(f"📈 Telemetry: {json_path}, {prom_path}")
         return filename
     
     def _generate_summary(self) -> Dict:
@@ -530,18 +1051,109 @@ class UltraScanner:
             print(f"  {vendor:25} : {count}")
 
 
+_shard_options = {}
+
+
+def _init_shard_worker(options: Dict):
+    """Process-pool initializer: shared options + previous snapshot, once per process"""
+    _shard_options.update(options)
+    if options.get('rate_profile'):
+        try:
+            use_profile(options['rate_profile'], share=options.get('rate_share', 1.0))
+        except ValueError:
+            pass  # ad-hoc profile of the parent (not in monitor_config.json)
+
+
+def _scan_shard(shard: str) -> Dict:
+    """Process-pool worker: complete scan of ONE shard (output suppressed)"""
+    import contextlib
+    import io
+    
+    start_time = time.time()
+    result = {'shard': shard, 'devices': {}, 'stats': {}, 'discovery_s': 0}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            scanner = UltraScanner(shard, incremental=_shard_options.get('incremental'))
+            scanner.pipeline = _shard_options.get('pipeline', scanner.pipeline)
+            if _shard_options.get('syn_rate'):
+                scanner.config['syn_rate'] = _shard_options['syn_rate']
+            if _shard_options.get('syn_scan'):
+                scanner.enable_syn_scan()   # (again, __init__ may have) at this worker's share
+            scanner._previous = _shard_options.get('previous') or {}
+            scanner._save_port_cache = False  # one writer: the parent merges and saves
+            result['devices'] = scanner.full_scan()
+        result['stats'] = scanner.scan_stats
+        if scanner.port_cache is not None:
+            result['port_cache'] = scanner.port_cache.changed_entries()
+        result['telemetry'] = scanner.telemetry.to_dict()
+        result['discovery_s'] = round(scanner._last_scan_time, 2)
+    except Exception as e:
+        result['error'] = str(e)
+    
+    result['elapsed_s'] = round(time.time() - start_time, 2)
+    return result
+
+
 def main():
+    import argparse
     import sys
     
+    parser = argparse.ArgumentParser(description='Ultra Network Scanner')
+    parser.add_argument('network', nargs='*', default=None,
+                        help='Network range(s), any prefix, e.g. 10.10.0.0/21 10.20.0.0/24 '
+                             '(default: monitor_config.json or auto-detect)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Stay running, scan on schedule and on socket triggers')
+    parser.add_argument('--interval', type=float, default=30,
+                        help='Daemon scan interval in seconds (default: 30)')
+    parser.add_argument('--socket', default=None,
+                        help='Daemon Unix socket path')
+    parser.add_argument('--full', action='store_true',
+                        help='Disable incremental mode, re-probe every host')
+    parser.add_argument('--syn', action='store_true',
+                        help='Half-open SYN port scan (root), falls back to connect scan')
+    parser.add_argument('--quiet', action='store_true',
+                        help="Quiet while gaming: use the 'gaming' rate profile")
+    parser.add_argument('--rate-profile', default=None,
+                        help="Packet rate profile from monitor_config.json 'rate_limit'")
+    parser.add_argument('--phased', action='store_true',
+                        help='Run ARP, ports and enrichment as separate phases (no pipeline)')
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='Report import and init time per scanner module, then exit')
+    args = parser.parse_args()
+    
+    if args.startup_profile:
+        from startup_profile import main as startup_profile
+        sys.exit(startup_profile([]))
+    
     print("="*70)
     print("🚀 ULTRA NETWORK SCANNER - THE ONLY SCANNER")
     print("   Optimized | Parallel | Production-Ready")
     print("="*70)
     print()
     
-    network = sys.argv[1] if len(sys.argv) > 1 else None
+    profile = 'gaming' if args.quiet else args.rate_profile
+    if profile:
+        try:
+            use_profile(profile)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    scanner = UltraScanner(','.join(args.network) or None,
+                           incremental=False if args.full else None)
+    if args.phased:
+        scanner.pipeline = False
+    if args.syn and not scanner.syn_engine:
+        scanner.enable_syn_scan()
+    
+    if args.daemon:
+        from scanner_daemon import ScannerDaemon, DEFAULT_SOCKET, EXIT_SOCKET_IN_USE
+        daemon = ScannerDaemon(scanner, interval=args.interval,
+                               socket_path=args.socket or DEFAULT_SOCKET)
+        if not daemon.run():
+            sys.exit(EXIT_SOCKET_IN_USE)
+        return
     
-    scanner = UltraScanner(network)
     devices = scanner.full_scan()
     scanner.print_summary()
     scanner.export_results()